@@ -0,0 +1,122 @@
+"""
+Alokasi sumber daya terbatas (tim SAR, logistik, jembatan Bailey, tim medis) ke wilayah.
+
+Setiap wilayah punya kebutuhan per sumber daya (dari kolom dampak) dan skor
+prioritas. Unit ke-k yang dikirim ke wilayah i bernilai
+`skor_i * (1 - (k - 1) / kebutuhan_i)`: unit pertama paling berharga dan
+nilainya menurun hingga kebutuhan terpenuhi. Karena fungsi nilai ini cekung dan
+terpisah per wilayah, alokasi greedy (unit berikutnya ke nilai marginal
+tertinggi) optimal. Greedy tersebut dihitung tanpa loop per unit: ambang nilai
+marginal dicari dengan bisection ter-vektorisasi untuk semua sumber daya
+sekaligus, lalu sisa unit pada ambang dibagi lewat heap. Kedua tahap dibatasi
+anggaran waktu; unit yang belum terbagi saat waktu habis menjadi cadangan.
+"""
+import heapq
+import time
+from collections import namedtuple
+
+import numpy as np
+
+Resource = namedtuple('Resource', ['unit', 'need', 'supply'])
+
+# Sumber daya: satuan, kebutuhan per wilayah sebagai {kolom: unit per nilai kolom}, dan stok bawaan
+RESOURCES = {
+    'Tim SAR': Resource('Tim', {'Total_Meninggal': 1 / 3, 'Mengungsi_Jiwa': 1 / 5000}, 40),
+    # 2,5 kg bantuan per pengungsi per hari selama 72 jam pertama
+    'Logistik': Resource('Ton', {'Mengungsi_Jiwa': 2.5 * 3 / 1000}, 600),
+    'Jembatan Bailey': Resource('Unit', {'Jembatan_Rusak': 1.0}, 12),
+    'Tim Medis': Resource('Tim', {'Faskes_Rusak': 1.0, 'Mengungsi_Jiwa': 1 / 5000}, 30),
+}
+
+# Anggaran waktu satu perhitungan alokasi (detik)
+ALLOCATION_TIME_BUDGET_S = 0.25
+
+_BISECTION_STEPS = 60
+
+AllocationPlan = namedtuple('AllocationPlan', ['allocation', 'need', 'reserve', 'complete'])
+
+
+def resource_needs(df, resources=RESOURCES):
+    """Kebutuhan bulat [wilayah x sumber daya] dari kolom dampak `df`."""
+    need = np.zeros((len(df), len(resources)))
+    for r, resource in enumerate(resources.values()):
+        for column, per_value in resource.need.items():
+            need[:, r] += df[column].to_numpy(dtype=float) * per_value
+    return np.ceil(need - 1e-9).clip(min=0).astype(np.int64)
+
+
+def _counts(priority, need, threshold):
+    """Jumlah unit per wilayah yang nilai marginalnya >= `threshold` [sumber daya]."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(priority[:, None] > 0, 1 - threshold[None, :] / priority[:, None], -1.0)
+    counts = np.floor(need * ratio + 1e-9).astype(np.int64) + 1
+    counts[ratio < 0] = 0
+    return np.clip(counts, 0, need)
+
+
+def allocate(priority, need, supply, time_budget_s=ALLOCATION_TIME_BUDGET_S):
+    """
+    Alokasi [wilayah x sumber daya] untuk skor `priority` [wilayah], kebutuhan `need`
+    [wilayah x sumber daya], dan stok `supply` [sumber daya]. Alokasi tidak pernah melebihi
+    kebutuhan maupun stok; wilayah dengan skor nol tidak menerima unit, dan stok yang tidak
+    dibutuhkan (atau belum terbagi saat anggaran waktu habis) menjadi cadangan.
+    """
+    deadline = time.perf_counter() + time_budget_s
+    priority = np.asarray(priority, dtype=float)
+    need = np.asarray(need, dtype=np.int64)
+    supply = np.asarray(supply, dtype=np.int64)
+    n_resources = need.shape[1]
+    need = np.where(priority[:, None] > 0, need, 0)
+
+    # Bisection ambang nilai marginal untuk semua sumber daya sekaligus: counts(hi) <= stok
+    lo = np.zeros(n_resources)
+    hi = np.full(n_resources, priority.max(initial=0.0) + 1.0)
+    scarce = need.sum(axis=0) > supply
+    lo[~scarce] = hi[~scarce] = 0.0
+    complete = True
+    for _ in range(_BISECTION_STEPS):
+        if not scarce.any():
+            break
+        if time.perf_counter() > deadline:
+            complete = False
+            break
+        mid = (lo + hi) / 2
+        fits = _counts(priority, need, mid).sum(axis=0) <= supply
+        hi = np.where(scarce & fits, mid, hi)
+        lo = np.where(scarce & ~fits, mid, lo)
+        scarce &= (hi - lo) > 1e-9 * np.maximum(hi, 1.0)
+    allocation = _counts(priority, need, hi)
+
+    # Sisa unit di sekitar ambang: greedy dengan heap pada nilai unit berikutnya setiap wilayah
+    remaining = supply - allocation.sum(axis=0)
+    for r in range(n_resources):
+        open_rows = np.flatnonzero(allocation[:, r] < need[:, r])
+        if remaining[r] <= 0 or not len(open_rows):
+            continue
+        gains = priority[open_rows] * (1 - allocation[open_rows, r] / need[open_rows, r])
+        heap = list(zip((-gains).tolist(), open_rows.tolist()))
+        heapq.heapify(heap)
+        while remaining[r] > 0 and heap:
+            if time.perf_counter() > deadline:
+                complete = False
+                break
+            _, i = heapq.heappop(heap)
+            allocation[i, r] += 1
+            remaining[r] -= 1
+            if allocation[i, r] < need[i, r]:
+                heapq.heappush(heap, (-priority[i] * (1 - allocation[i, r] / need[i, r]), i))
+    return AllocationPlan(allocation, need, supply - allocation.sum(axis=0), complete)
+
+
+def coverage(plan):
+    """Persentase kebutuhan yang terpenuhi per sumber daya (100 jika tidak ada kebutuhan)."""
+    total_need = plan.need.sum(axis=0)
+    allocated = plan.allocation.sum(axis=0)
+    return np.divide(allocated * 100.0, total_need, out=np.full(len(total_need), 100.0), where=total_need > 0)
+
+
+def share(allocation, supply):
+    """Persentase stok yang dialokasikan ke setiap baris `allocation` [wilayah x sumber daya]."""
+    supply = np.asarray(supply, dtype=float)
+    return np.divide(allocation * 100.0, supply, out=np.zeros(allocation.shape), where=supply > 0)
+
@@ -0,0 +1,286 @@
+"""
+API JSON baca-saja untuk sistem lain di pusat komando.
+
+    python api.py --port 8600                  # sidecar, membaca feed & store yang sama
+    BENCANA_API_PORT=8600 streamlit run app.py # di dalam proses dashboard
+
+Angka disajikan dari kubus snapshot yang sama dengan dashboard (`pipeline.build_snapshot`)
+lewat fungsi yang sama dengan kartu metrik dan tabel prioritas (`pipeline.selection_metrics`,
+`pipeline.priority_ranking`), termasuk cache roll-up per filter di kubus. Di dalam proses
+dashboard, API memakai kubus yang diterbitkan `BackgroundRefresher`, sehingga keduanya
+berbagi satu objek kubus; sebagai sidecar, snapshot versi yang sudah ditulis dashboard
+dimuat dari store tanpa menghitung ulang.
+
+Setiap respons diberi ETag dari versi data dan parameter permintaan. Polling dengan
+`If-None-Match` yang cocok dijawab 304 tanpa membaca kubus maupun menyusun JSON. Body
+JSON di-cache per (versi, permintaan) dalam LRU milik API sendiri, terpisah dari memo
+kubus, sehingga polling banyak kombinasi filter tidak mengusir cache dashboard.
+
+    GET /api/versi
+    GET /api/total
+    GET /api/agregat?tanggal=2025-12-03&wilayah=Agam&wilayah=Solok&jenis=Banjir
+    GET /api/prioritas?k=5&tanggal=...&wilayah=...&jenis=...
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from cube import ALL_DATES, ALL_JENIS, ALL_WILAYAH
+from ingest import MultiSourceFeed
+from pipeline import TOP_PRIORITIES, build_snapshot, feed_snapshot, priority_ranking, selection_metrics, snapshot_version
+from refresher import BackgroundRefresher, HttpFeedMirror, mirror_path
+from scoring import DEFAULT_WEIGHTS, SCORE_COLUMN
+from storage import ColumnarStore, data_version
+from timeseries import TimeSeriesEngine
+
+_LOGGER = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent
+FEED_PATH = os.environ.get('BENCANA_FEED_PATH', str(ROOT / 'data' / 'feed_laporan.csv'))
+WILAYAH_PATH = os.environ.get('BENCANA_WILAYAH_PATH', str(ROOT / 'data' / 'wilayah_basis.csv'))
+STORE_PATH = os.environ.get('BENCANA_STORE_PATH', str(ROOT / 'data' / 'store'))
+# Endpoint HTTP pengganti feed BPBD, sama seperti dashboard: feed disalin ke store dan dibaca dari salinan itu
+FEED_URL = os.environ.get('BENCANA_FEED_URL')
+
+# Jumlah body JSON (versi, permintaan) yang disimpan di cache respons API
+RESPONSE_CACHE_SIZE = 256
+
+# Kolom daftar prioritas (sama dengan tabel Top 5 di tab 3)
+PRIORITY_COLUMNS = ['Kabupaten_Kota', 'Jenis_Bencana', *DEFAULT_WEIGHTS, SCORE_COLUMN]
+
+
+class ApiError(Exception):
+    """Permintaan yang tidak dapat dilayani; `status` adalah kode HTTP."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _single(params, name, default):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def parse_selection(cube, params):
+    """Parameter `tanggal`, `wilayah` (boleh berulang), dan `jenis` -> `Selection` kubus."""
+    tanggal = _single(params, 'tanggal', ALL_DATES)
+    wilayah = params.get('wilayah') or [ALL_WILAYAH]
+    jenis = _single(params, 'jenis', ALL_JENIS)
+    if tanggal != ALL_DATES and tanggal not in cube.date_index:
+        raise ApiError(400, f'tanggal tidak dikenal: {tanggal}')
+    unknown = [w for w in wilayah if w != ALL_WILAYAH and w not in cube.region_index]
+    if unknown:
+        raise ApiError(400, f'wilayah tidak dikenal: {", ".join(unknown)}')
+    if jenis != ALL_JENIS and jenis not in cube.jenis_index:
+        raise ApiError(400, f'jenis tidak dikenal: {jenis}')
+    filters = {'tanggal': tanggal, 'wilayah': wilayah, 'jenis': jenis}
+    return cube.select(tanggal, wilayah, jenis), filters
+
+
+def _versi(version, cube, params):
+    return {'versi': version, 'tanggal_akhir': cube.date_labels[-1]}
+
+
+def _total(version, cube, params):
+    totals = {name: cube.meta[name] for name in ('TOTAL_MENINGGAL', 'TOTAL_MENGUNGSI', 'TOTAL_KERUGIAN', 'TOTAL_UNIT_RUSAK')}
+    return {'versi': version, 'tanggal_akhir': cube.date_labels[-1], 'total': totals}
+
+
+def _agregat(version, cube, params):
+    selection, filters = parse_selection(cube, params)
+    return {
+        'versi': version,
+        'filter': filters,
+        'jumlah_wilayah': len(selection.rows),
+        'metrik': selection_metrics(cube, selection),
+        'jumlah': {metric: float(cube.sum(selection, metric)) for metric in cube.metrics},
+    }
+
+
+def _prioritas(version, cube, params):
+    selection, filters = parse_selection(cube, params)
+    try:
+        k = int(_single(params, 'k', TOP_PRIORITIES))
+    except ValueError:
+        raise ApiError(400, 'k harus bilangan bulat') from None
+    if k < 1:
+        raise ApiError(400, 'k harus >= 1')
+    rows = []
+    if len(selection.rows):
+        _, df_prioritas = priority_ranking(cube, selection, k=min(k, len(selection.rows)))
+        rows = json.loads(df_prioritas[PRIORITY_COLUMNS].to_json(orient='records'))
+        for peringkat, row in enumerate(rows, start=1):
+            row['Peringkat'] = peringkat
+    return {'versi': version, 'filter': filters, 'wilayah': rows}
+
+
+ROUTES = {
+    '/api/versi': _versi,
+    '/api/total': _total,
+    '/api/agregat': _agregat,
+    '/api/prioritas': _prioritas,
+}
+
+
+class ResponseCache:
+    """LRU berbatas untuk body respons, aman dipakai dari banyak thread server."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+
+_RESPONSES = ResponseCache()
+
+
+def etag_matches(if_none_match, etag):
+    """True jika header `If-None-Match` memuat `etag` (atau `*`); prefiks lemah `W/` diabaikan."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
+
+def respond(source, target, if_none_match=None, cache=_RESPONSES):
+    """
+    Menjawab satu permintaan GET: `(status, header, body)`.
+    `source()` mengembalikan `(versi, kubus)` terkini, mis. `BackgroundRefresher.current`.
+    """
+    url = urllib.parse.urlsplit(target)
+    handler = ROUTES.get(url.path.rstrip('/'))
+    if handler is None:
+        return _error(404, f'endpoint tidak dikenal: {url.path}')
+    version, cube = source()
+    if cube is None:
+        return _error(503, 'snapshot data belum tersedia')
+
+    params = urllib.parse.parse_qs(url.query)
+    request_key = (url.path.rstrip('/'), tuple(sorted((name, tuple(values)) for name, values in params.items())))
+    etag = f'"{version}-{data_version(request_key)}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, etag):
+        return 304, headers, b''
+    try:
+        # Satu body per (versi, permintaan): polling berulang tanpa ETag pun tidak menyusun JSON ulang
+        body = cache.get((version, request_key), lambda: json.dumps(
+            handler(version, cube, params), ensure_ascii=False
+        ).encode('utf-8'))
+    except ApiError as e:
+        return _error(e.status, str(e))
+    return 200, {**headers, 'Content-Type': 'application/json; charset=utf-8'}, body
+
+
+def _error(status, message):
+    body = json.dumps({'galat': message}, ensure_ascii=False).encode('utf-8')
+    return status, {'Content-Type': 'application/json; charset=utf-8'}, body
+
+
+class ApiServer:
+    """Server HTTP berulir untuk `respond`, berjalan di thread latar belakang (daemon)."""
+
+    def __init__(self, source, host='127.0.0.1', port=8600):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = respond(source, self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                _LOGGER.debug('%s - %s', self.address_string(), format % args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, name='bencana-api', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def sidecar_refresher(feed_path=FEED_PATH, wilayah_path=WILAYAH_PATH, store_path=STORE_PATH, interval=2.0,
+                      feed_url=FEED_URL):
+    """
+    Refresher untuk mode sidecar: membaca feed sendiri, snapshot dari/ke store yang sama dengan dashboard.
+    Dengan `feed_url`, feed disalin dari endpoint HTTP ke path salinan yang sama dengan dashboard.
+    """
+    mirror = None
+    if feed_url:
+        feed_path = mirror_path(store_path, feed_url)
+        mirror = HttpFeedMirror(feed_url, feed_path)
+    reader = MultiSourceFeed(feed_path)
+    deret = TimeSeriesEngine()
+    reader.subscribe(deret.ingest, on_reset=deret.reset)
+    store = ColumnarStore(store_path)
+    return BackgroundRefresher(
+        reader,
+        lambda snapshot: snapshot_version(snapshot.records, wilayah_path),
+        lambda version, snapshot: build_snapshot(store, version, snapshot.records, wilayah_path, snapshot.trend),
+        mirror=mirror,
+        interval=interval,
+        read=lambda: feed_snapshot(reader, deret),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--interval', type=float, default=2.0, help='Interval pemeriksaan feed (detik)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    refresher = sidecar_refresher(interval=args.interval).start()
+    server = ApiServer(refresher.current, args.host, args.port)
+    host, port = server.address
+    print(f'API JSON di http://{host}:{port}/api/total (versi {refresher.version})')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        refresher.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,32 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import altair as alt
-from io import StringIO
 import datetime
+import functools
+import os
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from lazy import LazyModule
+from storage import ColumnarStore, data_version, file_signature
+from timeseries import TimeSeriesEngine
+from pipeline import (
+    FORECAST_HORIZONS_H, FORECAST_METRICS, FORECAST_WINDOW_DAYS, TREND_GROWTH_WINDOW_DAYS, build_snapshot, feed_snapshot,
+    priority_ranking, selection_metrics, snapshot_version
+)
+from api import ApiServer
+from allocation import RESOURCES, allocate, coverage, resource_needs, share
+from charts import trend_chart, trend_long
+from ingest import MultiSourceFeed
+from geo import DETAIL_LEVELS, KECAMATAN_NAME_FIELDS, build_levels
+from instrumentation import TimingSink, start_rerun
+from refresher import BackgroundRefresher, HttpFeedMirror, mirror_path, request_session_rerun
+from scoring import DEFAULT_WEIGHTS, vary_weight
+from table import PAGE_SIZES, page_count, page_rows, query_order, threshold_styles
+
+# pandas & altair baru di-import saat tab pertama dirender; kartu metrik cukup dengan NumPy
+pd = LazyModule('pandas')
+alt = LazyModule('altair')
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(
@@ -13,6 +36,17 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# --- INSTRUMENTASI WAKTU (SPAN PER RERUN) ---
+# Jika diisi (*.jsonl atau *.prom), setiap span juga ditulis ke file ini
+TIMING_LOG_PATH = os.environ.get('BENCANA_TIMING_LOG')
+
+@st.cache_resource
+def get_timing_sink(path):
+    """Satu penampung span per proses, dipakai bersama oleh semua sesi."""
+    return TimingSink(path)
+
+tracer = start_rerun(st.session_state, get_timing_sink(TIMING_LOG_PATH))
+
 # --- FUNGSI FORMATTING BESAR ---
 def format_rupiah(value):
     """Mengubah nilai Rupiah (dalam Miliar) menjadi format yang mudah dibaca (T/M)."""
@@ -22,138 +56,163 @@ def format_rupiah(value):
     else:
         return f"Rp {value:,.0f} M"
 
-def highlight_priority(val):
-    """Fungsi untuk highlight sel di DataFrame berdasarkan nilai."""
-    if val > 50:
-        color = '#ffe0e0' # Merah Muda untuk nilai tinggi
-    elif val > 10:
-        color = '#fffbe0' # Kuning Muda untuk nilai sedang
-    else:
-        color = ''
-    return f'background-color: {color}'
-
-# --- DATA AKURAT (DARI CSV - TOTAL OTORITATIF) ---
-csv_string = """Kategori,Sub_Kategori,Satuan,Nilai
-Korbang Jiwa,Meninggal Total,Jiwa,176
-Korbang Jiwa,Meninggal Teridentifikasi,Jiwa,140
-Korbang Jiwa,Hilang,Jiwa,117
-Korbang Jiwa,Luka-Luka,Jiwa,112
-Korbang Jiwa,Mengungsi,Jiwa,137383
-Kerusakan Rumah,Rusak Ringan,Unit,1827
-Kerusakan Rumah,Rusak Sedang,Unit,660
-Kerusakan Rumah,Rusak Berat,Unit,1092
-Fasilitas Publik,Rumah Ibadah,Unit,86
-Fasilitas Publik,Fasilitas Kesehatan,Unit,13
-Fasilitas Publik,Kantor,Unit,16
-Fasilitas Publik,Sekolah,Unit,110
-Prasarana Vital,Jalan Rusak,Unit,7
-Prasarana Vital,Jembatan Rusak,Unit,121
-Dampak Ekonomi,Sawah,Ha,3473
-Kerugian Finansial,Taksiran Kerugian Total,Rupiah,1072779241505
-"""
-
-# --- FUNGSI LOADING DATA HYBRID DENGAN WILAYAH LENGKAP ---
-@st.cache_data
-def load_updated_data(csv_data_string):
+# Ambang highlight skor: > 50 Merah Muda (tinggi), > 10 Kuning Muda (sedang)
+PRIORITY_THRESHOLDS = [(50, '#ffe0e0'), (10, '#fffbe0')]
+
+def highlight_priority(values):
+    """Highlight sel kolom skor; satu panggilan tervektorisasi per kolom, bukan per sel."""
+    return threshold_styles(values, PRIORITY_THRESHOLDS)
+
+# --- PENYIMPANAN KOLUMNAR (MEMORY-MAPPED, DIBAGI SEMUA WORKER) ---
+STORE_PATH = os.environ.get('BENCANA_STORE_PATH', str(Path(__file__).parent / 'data' / 'store'))
+@st.cache_resource
+def get_store(path):
+    """Satu handle store per proses; halaman memori dibagi lewat page cache OS."""
+    return ColumnarStore(path)
+
+# --- DATA AKURAT (DARI FEED LAPORAN - TOTAL OTORITATIF) ---
+# Feed append-only (CSV/JSONL), satu baris per laporan per kab/kota per jam. Boleh berupa direktori
+# berisi satu file per sumber (bnpb*, bpbd*, pos*), direkonsiliasi oleh `ingest.MultiSourceFeed`.
+FEED_PATH = os.environ.get('BENCANA_FEED_PATH', str(Path(__file__).parent / 'data' / 'feed_laporan.csv'))
+# Endpoint HTTP lokal pengganti feed BPBD; jika diisi, feed disalin ke store dan dibaca dari salinan itu
+FEED_URL = os.environ.get('BENCANA_FEED_URL')
+if FEED_URL:
+    FEED_PATH = mirror_path(STORE_PATH, FEED_URL)
+
+# --- API JSON BACA-SAJA (OPSIONAL, DI PROSES YANG SAMA) ---
+# Jika port diisi, API melayani kubus yang diterbitkan refresher, sehingga mode pembaruan langsung ikut aktif
+API_PORT = os.environ.get('BENCANA_API_PORT')
+API_HOST = os.environ.get('BENCANA_API_HOST', '127.0.0.1')
+
+# --- MODE PEMBARUAN LANGSUNG (SATU REFRESHER LATAR BELAKANG PER PROSES) ---
+LIVE_UPDATE = bool(FEED_URL) or bool(API_PORT) or os.environ.get('BENCANA_LIVE_UPDATE', '') not in ('', '0')
+LIVE_INTERVAL_S = float(os.environ.get('BENCANA_LIVE_INTERVAL', '2'))
+# Sesi diberi tahu langsung oleh refresher; pengecekan berkala per sesi hanya cadangan jika pemberitahuan gagal
+LIVE_FALLBACK_INTERVAL_S = float(os.environ.get('BENCANA_LIVE_FALLBACK_INTERVAL', '30'))
+LIVE_DEBOUNCE_S = float(os.environ.get('BENCANA_LIVE_DEBOUNCE', '1'))
+
+def feed_checkpoint_name(path):
+    """Nama checkpoint pembaca feed di store, unik per path feed."""
+    return f'feed_{data_version(os.path.abspath(path))}'
+
+# Checkpoint feed (posisi baca + deret waktu) ditulis paling sering sekali per interval ini
+FEED_CHECKPOINT_INTERVAL_S = float(os.environ.get('BENCANA_FEED_CHECKPOINT_INTERVAL', '30'))
+
+@st.cache_resource
+def get_feed(path):
     """
-    Memuat data bencana alam Sumatera Barat dengan daftar wilayah yang lebih lengkap 
-    dan total yang disesuaikan dengan data otoritatif.
+    Satu pembaca feed (semua sumber) dan satu mesin deret waktu per proses, dibagi oleh semua sesi.
+    Setiap potongan feed baru yang lolos validasi & dedupe langsung ditambahkan ke deret waktu
+    (tanpa membaca ulang riwayat). Proses baru melanjutkan dari checkpoint terakhir di store.
     """
-    df_raw = pd.read_csv(StringIO(csv_data_string)).set_index('Sub_Kategori')
-    
-    # Dapatkan Total Otoritatif dari CSV
-    rupiah_total_raw = float(df_raw.loc['Taksiran Kerugian Total', 'Nilai'])
-    TOTAL_KERUGIAN_BARU_M = rupiah_total_raw / 1_000_000_000 # Dalam Miliar Rupiah (~1072.7 M)
-    TOTAL_MENINGGAL_BARU = float(df_raw.loc['Meninggal Total', 'Nilai'])
-    TOTAL_MENGUNGSI_BARU = float(df_raw.loc['Mengungsi', 'Nilai'])
-    TOTAL_JEMBATAN_RUSAK_BARU = float(df_raw.loc['Jembatan Rusak', 'Nilai'])
-    TOTAL_SEKOLAH_RUSAK_BARU = float(df_raw.loc['Sekolah', 'Nilai'])
-    TOTAL_FASKES_RUSAK_BARU = float(df_raw.loc['Fasilitas Kesehatan', 'Nilai'])
-    TOTAL_UNIT_RUSAK_BARU = TOTAL_JEMBATAN_RUSAK_BARU + TOTAL_SEKOLAH_RUSAK_BARU + TOTAL_FASKES_RUSAK_BARU
-    
-    # Daftar 15 Kab/Kota di Sumatera Barat
-    kab_kota_list = [
-        'Agam', 'Lima Puluh Kota', 'Pesisir Selatan', 'Tanah Datar', 'Padang Pariaman', 
-        'Solok Selatan', 'Pasaman Barat', 'Pasaman', 'Sijunjung', 'Dharmasraya', 
-        'Kota Padang', 'Kota Solok', 'Kota Bukittinggi', 'Kota Pariaman', 'Kota Sawahlunto'
-    ]
-    
-    # Data Basis Simulasi Awal (Weighted Scores - Lebih tinggi = dampak lebih parah)
-    # Total score harus 100 untuk memudahkan proporsionalitas awal
-    base_scores = {
-        'Agam': 15, 'Lima Puluh Kota': 20, 'Pesisir Selatan': 18, 'Tanah Datar': 12, 
-        'Padang Pariaman': 8, 'Solok Selatan': 5, 'Pasaman Barat': 4, 'Pasaman': 3, 
-        'Sijunjung': 3, 'Dharmasraya': 2, 'Kota Padang': 5, 'Kota Solok': 2, 
-        'Kota Bukittinggi': 1, 'Kota Pariaman': 1, 'Kota Sawahlunto': 1
-    }
-
-    # Distribusi jenis bencana (simulasi)
-    jenis_bencana = [
-        'Tanah Longsor', 'Banjir Bandang', 'Banjir', 'Tanah Longsor', 'Banjir', 
-        'Tanah Longsor', 'Banjir', 'Banjir', 'Tanah Longsor', 'Banjir', 
-        'Banjir', 'Tanah Longsor', 'Banjir', 'Banjir', 'Tanah Longsor'
-    ]
-    
-    # Buat DataFrame Basis
-    df_base = pd.DataFrame({'Kabupaten_Kota': kab_kota_list})
-    df_base['Base_Score'] = df_base['Kabupaten_Kota'].map(base_scores)
-    df_base['Jenis_Bencana'] = jenis_bencana
-    
-    # Hitung faktor skala (total score adalah 100)
-    score_factor = df_base['Base_Score'] / 100
-    
-    # Aplikasikan faktor skala ke total otoritatif
-    df_bencana = df_base.copy()
-    
-    # Korbang Jiwa
-    df_bencana['Total_Meninggal'] = (score_factor * TOTAL_MENINGGAL_BARU).round().astype(int)
-    df_bencana['Mengungsi_Jiwa'] = (score_factor * TOTAL_MENGUNGSI_BARU).round().astype(int)
-    
-    # Finansial & Infrastruktur (Skala yang berbeda untuk variasi visual)
-    df_bencana['Kerugian_Rupiah_Miliar'] = score_factor * TOTAL_KERUGIAN_BARU_M
-    df_bencana['Jembatan_Rusak'] = (score_factor * TOTAL_JEMBATAN_RUSAK_BARU).round().astype(int)
-    df_bencana['Sekolah_Rusak'] = (score_factor * TOTAL_SEKOLAH_RUSAK_BARU).round().astype(int)
-    df_bencana['Faskes_Rusak'] = (score_factor * TOTAL_FASKES_RUSAK_BARU).round().astype(int)
-
-    # Penyesuaian Pembulatan Terakhir (Untuk memastikan total akhir SAMA PERSIS)
-    df_bencana.loc[df_bencana.index[-1], 'Total_Meninggal'] += int(TOTAL_MENINGGAL_BARU) - df_bencana['Total_Meninggal'].sum()
-    df_bencana.loc[df_bencana.index[-1], 'Mengungsi_Jiwa'] += int(TOTAL_MENGUNGSI_BARU) - df_bencana['Mengungsi_Jiwa'].sum()
-    df_bencana.loc[df_bencana.index[-1], 'Jembatan_Rusak'] += int(TOTAL_JEMBATAN_RUSAK_BARU) - df_bencana['Jembatan_Rusak'].sum()
-    df_bencana.loc[df_bencana.index[-1], 'Sekolah_Rusak'] += int(TOTAL_SEKOLAH_RUSAK_BARU) - df_bencana['Sekolah_Rusak'].sum()
-    df_bencana.loc[df_bencana.index[-1], 'Faskes_Rusak'] += int(TOTAL_FASKES_RUSAK_BARU) - df_bencana['Faskes_Rusak'].sum()
-    
-    df_bencana['Total_Unit_Rusak'] = df_bencana['Jembatan_Rusak'] + df_bencana['Sekolah_Rusak'] + df_bencana['Faskes_Rusak']
-    df_bencana = df_bencana.drop(columns=['Base_Score'])
-    
-    # Data Trend Harian (Simulasi 7 hari)
-    start_date = datetime.date(2025, 12, 1)
-    days = pd.date_range(start_date, periods=7, freq='D')
-    
-    # Basis lama trend (untuk scaling)
-    trend_base_meninggal = [10, 25, 40, 55, 65, 80, 100]
-    trend_base_mengungsi = [5000, 15000, 25000, 35000, 40000, 60000, 80000]
-    trend_base_kerugian = [50, 150, 250, 400, 600, 800, 1000] # Dalam Miliar
-    
-    trend_data = pd.DataFrame({
-        'Tanggal': days,
-        # Skala trend
-        'Meninggal_Kumulatif': (np.array(trend_base_meninggal) * (TOTAL_MENINGGAL_BARU / trend_base_meninggal[-1])).round().astype(int), 
-        'Mengungsi_Kumulatif': (np.array(trend_base_mengungsi) * (TOTAL_MENGUNGSI_BARU / trend_base_mengungsi[-1])).round().astype(int), 
-        'Kerugian_Kumulatif_Miliar': (np.array(trend_base_kerugian) * (TOTAL_KERUGIAN_BARU_M / trend_base_kerugian[-1])),
-    })
-    
-    # Penyesuaian nilai akhir trend agar sama persis dengan total CSV
-    trend_data.loc[trend_data.index[-1], 'Meninggal_Kumulatif'] = int(TOTAL_MENINGGAL_BARU)
-    trend_data.loc[trend_data.index[-1], 'Mengungsi_Kumulatif'] = int(TOTAL_MENGUNGSI_BARU)
-    trend_data.loc[trend_data.index[-1], 'Kerugian_Kumulatif_Miliar'] = TOTAL_KERUGIAN_BARU_M
-    
-    return df_bencana, trend_data, TOTAL_KERUGIAN_BARU_M, TOTAL_MENINGGAL_BARU, TOTAL_MENGUNGSI_BARU, TOTAL_UNIT_RUSAK_BARU
+    store = get_store(STORE_PATH)
+    name = feed_checkpoint_name(path)
+    reader = MultiSourceFeed(path)
+    deret = TimeSeriesEngine()
+    state = store.load_checkpoint(name)
+    arrays = store.load_checkpoint_arrays(name, state)
+    # Posisi baca & indeks dedupe hanya dipulihkan bersama deret waktunya, agar semuanya tetap konsisten
+    restored = None if arrays is None else TimeSeriesEngine.from_state(arrays, state['deret'])
+    if restored is not None and reader.restore(state, arrays):
+        deret = restored
+    reader.subscribe(deret.ingest, on_reset=deret.reset)
+    return reader, deret
+
+def save_feed_checkpoint(reader, deret, force=False):
+    if force or reader.checkpoint_due(FEED_CHECKPOINT_INTERVAL_S):
+        # Deret, posisi baca, dan indeks dedupe diambil dalam satu bagian kritis (RLock) agar konsisten
+        _, (arrays, meta), state, index_arrays = reader.snapshot(deret.state, reader.checkpoint, reader.checkpoint_arrays)
+        get_store(STORE_PATH).save_checkpoint(
+            feed_checkpoint_name(reader.path), {**state, 'deret': meta}, arrays={**arrays, **index_arrays}
+        )
+
+# Data basis simulasi: daftar wilayah beserta bobot dampak & jenis bencana
+WILAYAH_PATH = os.environ.get('BENCANA_WILAYAH_PATH', str(Path(__file__).parent / 'data' / 'wilayah_basis.csv'))
 
-df_bencana, df_trend, TOTAL_KERUGIAN, TOTAL_MENINGGAL, TOTAL_MENGUNGSI, TOTAL_UNIT_RUSAK = load_updated_data(csv_string)
+def current_data_version(totals_records):
+    return snapshot_version(totals_records, WILAYAH_PATH)
+
+# --- GEOMETRI PETA (BATAS KAB/KOTA & KECAMATAN) ---
+GEO_KABKOTA_PATH = os.environ.get('BENCANA_GEO_KABKOTA_PATH', str(Path(__file__).parent / 'data' / 'geo' / 'sumbar_kabkota.geojson'))
+GEO_KECAMATAN_PATH = os.environ.get('BENCANA_GEO_KECAMATAN_PATH', str(Path(__file__).parent / 'data' / 'geo' / 'sumbar_kecamatan.geojson'))
+# Disajikan oleh static file serving Streamlit (lihat .streamlit/config.toml)
+GEO_STATIC_DIR = Path(__file__).parent / 'static' / 'geo'
+GEO_STATIC_URL = 'app/static/geo'
+
+@st.cache_resource(max_entries=4)
+def get_map_layers(path, signature, kecamatan=False):
+    """
+    File GeoJSON per tingkat detail, disederhanakan sekali per versi file batas.
+    Browser mengambil poligon lewat URL; rerun hanya mengirim nilai atribut.
+    """
+    if kecamatan:
+        return build_levels(path, GEO_STATIC_DIR, name_fields=KECAMATAN_NAME_FIELDS)
+    return build_levels(path, GEO_STATIC_DIR)
+
+def map_layers(path, kecamatan=False):
+    """Lapisan peta untuk `path`, atau None jika file batas tidak tersedia."""
+    if not os.path.exists(path):
+        return None
+    return get_map_layers(path, file_signature(path), kecamatan)
+
+def build_filter_cube(data_version, snapshot):
+    """Kubus versi data ini dari snapshot store (dibangun sekali jika belum ada, lihat `build_snapshot`)."""
+    return build_snapshot(get_store(STORE_PATH), data_version, snapshot.records, WILAYAH_PATH, snapshot.trend)
+
+@st.cache_resource(max_entries=4)
+def get_filter_cube(data_version, _snapshot):
+    """Kubus per versi data, dibagi semua sesi; argumen berawalan `_` sudah diwakili oleh `data_version`."""
+    return build_filter_cube(data_version, _snapshot)
+
+@st.cache_resource
+def get_refresher(feed_path, feed_url):
+    """
+    Satu refresher per proses: hanya thread ini yang membaca feed dan menghitung ulang kubus
+    (sekali per versi data) dan menerbitkan versinya setelah debounce.
+    """
+    reader, deret = get_feed(feed_path)
+    return BackgroundRefresher(
+        reader,
+        lambda snapshot: current_data_version(snapshot.records),
+        build_filter_cube,
+        mirror=HttpFeedMirror(feed_url, feed_path) if feed_url else None,
+        interval=LIVE_INTERVAL_S,
+        debounce=LIVE_DEBOUNCE_S,
+        on_poll=lambda reader: save_feed_checkpoint(reader, deret),
+        read=lambda: feed_snapshot(reader, deret),
+    ).start()
+
+@st.cache_resource
+def get_api_server(host, port, _refresher):
+    """Satu server API per proses, membaca kubus terbitan refresher (tanpa perhitungan sendiri)."""
+    return ApiServer(_refresher.current, host, port).start()
+
+if LIVE_UPDATE:
+    # Sesi tidak membaca feed sendiri; cukup mengambil snapshot terbit terakhir
+    refresher = get_refresher(FEED_PATH, FEED_URL)
+    feed_reader = refresher.reader
+    if API_PORT:
+        get_api_server(API_HOST, int(API_PORT), refresher)
+    with tracer.span('data:kubus_filter'):
+        DATA_VERSION, cube = refresher.current()
+else:
+    # Hanya byte yang ditambahkan sejak pembacaan terakhir yang di-parsing
+    feed_reader, deret = get_feed(FEED_PATH)
+    with tracer.span('data:feed'):
+        if feed_reader.poll():
+            save_feed_checkpoint(feed_reader, deret)
+        # Total dan deret trend dari state yang sama, meski sesi lain sedang membaca feed
+        snapshot = feed_snapshot(feed_reader, deret)
+    DATA_VERSION = current_data_version(snapshot.records)
+    with tracer.span('data:kubus_filter'):
+        cube = get_filter_cube(DATA_VERSION, snapshot)
+TOTAL_KERUGIAN, TOTAL_MENINGGAL, TOTAL_MENGUNGSI, TOTAL_UNIT_RUSAK = (
+    cube.meta['TOTAL_KERUGIAN'], cube.meta['TOTAL_MENINGGAL'], cube.meta['TOTAL_MENGUNGSI'], cube.meta['TOTAL_UNIT_RUSAK']
+)
 
 # --- JUDUL UTAMA ---
 st.title("⚡ Pusat Komando 5D: Dashboard Prioritas Bencana Sumbar")
-st.markdown(f"***Data Agregat Akurat (Total Akhir): {df_trend['Tanggal'].iloc[-1].strftime('%d %B %Y')}***")
+st.markdown(f"***Data Agregat Akurat (Total Akhir): {datetime.date.fromisoformat(cube.date_labels[-1]).strftime('%d %B %Y')}***")
 st.divider()
 
 # ====================================================================
@@ -162,55 +221,83 @@ st.divider()
 
 st.sidebar.header("Filter Data Analisis")
 
-# Filter 1: Hari/Tanggal (dengan opsi Semua Hari)
-date_options = ['Semua Hari'] + df_trend['Tanggal'].dt.date.astype(str).tolist()
-selected_date_str = st.sidebar.selectbox(
-    'Pilih Tanggal Data Kumulatif',
-    options=date_options,
-    index=len(date_options) - 1 # Default ke tanggal terakhir
+# Fragment: setiap bagian dapat di-rerun sendiri tanpa menjalankan ulang seluruh skrip
+fragment = getattr(st, 'fragment', None) or st.experimental_fragment
+
+if LIVE_UPDATE:
+    st.session_state['_data_version'] = DATA_VERSION
+    # Refresher meminta rerun sesi ini sekali per versi terbit; sesi yang sudah ditutup terhapus sendiri
+    script_ctx = get_script_run_ctx()
+    if script_ctx is not None:
+        session_id = script_ctx.session_id
+        refresher.subscribe(session_id, lambda _version: request_session_rerun(session_id))
+
+    @fragment(run_every=LIVE_FALLBACK_INTERVAL_S)
+    def live_status():
+        """Cadangan jarang per sesi: rerun penuh jika versi terbit terlewat (mis. pemberitahuan gagal)."""
+        if refresher.version != st.session_state.get('_data_version'):
+            st.rerun()
+        st.caption(
+            f"🔴 Pembaruan langsung · versi `{DATA_VERSION[:8]}` · diterbitkan "
+            f"{datetime.datetime.fromtimestamp(refresher.published_at).strftime('%H:%M:%S')} · "
+            f"{refresher.listener_count()} sesi"
+        )
+
+    with st.sidebar:
+        live_status()
+# Salinan statistik (Counter) di bawah kunci pembaca: thread refresher dapat memperbaruinya bersamaan
+ingest_stats = feed_reader.snapshot(lambda: feed_reader.stats.copy())[1]
+n_ditolak = sum(n for reason, n in ingest_stats.items() if reason.startswith('ditolak_'))
+st.sidebar.caption(
+    f"📥 {len(feed_reader.sources)} sumber · {ingest_stats['diterima']:,} laporan diterima · "
+    f"{ingest_stats['koreksi']:,} koreksi · {ingest_stats['duplikat']:,} duplikat · {n_ditolak:,} ditolak"
 )
 
+# Filter 1: Hari/Tanggal (dengan opsi Semua Hari)
+with tracer.span('filter:tanggal'):
+    date_options = ['Semua Hari'] + cube.date_labels
+    selected_date_str = st.sidebar.selectbox(
+        'Pilih Tanggal Data Kumulatif',
+        options=date_options,
+        index=len(date_options) - 1 # Default ke tanggal terakhir
+    )
+
 # Terapkan filter tanggal
 if selected_date_str == 'Semua Hari':
-    df_trend_filtered = df_trend
     current_date_display = 'Semua Hari'
 else:
-    selected_date = datetime.date.fromisoformat(selected_date_str)
-    date_index = df_trend[df_trend['Tanggal'].dt.date == selected_date].index[0]
-    df_trend_filtered = df_trend.iloc[:date_index + 1]
-    current_date_display = selected_date.strftime('%d %B %Y')
+    current_date_display = datetime.date.fromisoformat(selected_date_str).strftime('%d %B %Y')
 
 
 # Filter 2: Wilayah
-all_kab_kota = df_bencana['Kabupaten_Kota'].unique().tolist()
-selected_wilayah = st.sidebar.multiselect(
-    'Pilih Kabupaten/Kota',
-    options=['Semua Wilayah'] + all_kab_kota,
-    default='Semua Wilayah'
-)
-if 'Semua Wilayah' in selected_wilayah:
-    df_filtered_wilayah = df_bencana
-else:
-    df_filtered_wilayah = df_bencana[df_bencana['Kabupaten_Kota'].isin(selected_wilayah)]
+with tracer.span('filter:wilayah'):
+    all_kab_kota = cube.regions.tolist()
+    selected_wilayah = st.sidebar.multiselect(
+        'Pilih Kabupaten/Kota',
+        options=['Semua Wilayah'] + all_kab_kota,
+        default='Semua Wilayah'
+    )
 
 # Filter 3: Jenis Bencana
-all_jenis_bencana = df_bencana['Jenis_Bencana'].unique().tolist()
-selected_jenis = st.sidebar.selectbox(
-    'Pilih Jenis Bencana',
-    options=['Semua Jenis'] + all_jenis_bencana
-)
-if selected_jenis == 'Semua Jenis':
-    df_filtered = df_filtered_wilayah
-else:
-    df_filtered = df_filtered_wilayah[df_filtered_wilayah['Jenis_Bencana'] == selected_jenis]
+with tracer.span('filter:jenis'):
+    all_jenis_bencana = cube.jenis_labels.tolist()
+    selected_jenis = st.sidebar.selectbox(
+        'Pilih Jenis Bencana',
+        options=['Semua Jenis'] + all_jenis_bencana
+    )
+
+# Semua filter diterjemahkan sekali menjadi indeks kubus (tanpa isin / perbandingan string)
+with tracer.span('filter:kubus'):
+    selection = cube.select(selected_date_str, selected_wilayah, selected_jenis)
 
 # --- APLIKASIKAN FILTER HARI KE METRIK (HANYA UNTUK METRIK UTAMA DARI TREND) ---
-current_meninggal = df_trend_filtered['Meninggal_Kumulatif'].iloc[-1]
-current_mengungsi = df_trend_filtered['Mengungsi_Kumulatif'].iloc[-1]
-current_kerugian_kumulatif = df_trend_filtered['Kerugian_Kumulatif_Miliar'].iloc[-1] 
 # Kerusakan Infrastruktur TIDAK dihitung kumulatif harian karena tidak ada data detail, 
-# menggunakan total dari filter wilayah/jenis bencana
-current_unit_rusak = df_filtered['Total_Unit_Rusak'].sum()
+# menggunakan total dari filter wilayah/jenis bencana (angka yang sama disajikan API JSON)
+current_metrics = selection_metrics(cube, selection)
+current_meninggal = current_metrics['Meninggal_Kumulatif']
+current_mengungsi = current_metrics['Mengungsi_Kumulatif']
+current_kerugian_kumulatif = current_metrics['Kerugian_Kumulatif_Miliar']
+current_unit_rusak = current_metrics['Total_Unit_Rusak']
 
 # Metrik Utama (Di luar tab agar selalu terlihat)
 col1, col2, col3, col4 = st.columns(4)
@@ -226,69 +313,302 @@ with col4:
 
 st.divider()
 
-# ====================================================================
-# TABBED DASHBOARD
-# ====================================================================
-
-tab1, tab2, tab3, tab4 = st.tabs([
+def traced_fragment(func):
+    """
+    `fragment` dengan tracer sendiri saat hanya fragment yang di-rerun: span-nya mendapat ID rerun
+    baru (bukan masuk ke tracer rerun penuh sebelumnya), file `.prom` di-flush di akhir fragment,
+    dan ringkasannya disimpan untuk panel debug pada rerun penuh berikutnya.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        global tracer
+        ctx = get_script_run_ctx()
+        if ctx is None or not ctx.fragment_ids_this_run:
+            return func(*args, **kwargs)
+        tracer = start_rerun(st.session_state, get_timing_sink(TIMING_LOG_PATH))
+        try:
+            with tracer.span(f'fragment:{func.__name__}'):
+                return func(*args, **kwargs)
+        finally:
+            st.session_state['_timing_last_fragment'] = (tracer.rerun_id, tracer.total_ms(), tracer.spans)
+            tracer.sink.flush()
+    return fragment(run)
+
+TAB_LABELS = [
     "📊 Ringkasan Eksekutif & Trend", 
     "💰 Analisis Finansial & Infrastruktur", 
     "📍 Prioritas Aksi Cepat",
     "✅ Rekomendasi Tindakan Detail"
-])
+]
+
+def get_prioritas(selection):
+    """Scorer & top-5 prioritas di-cache per kombinasi filter (dipakai tab 3 & 4, dibagi dengan API JSON)."""
+    return priority_ranking(cube, selection)
 
 # ====================================================================
 # TAB 1: RINGKASAN EKSEKUTIF & TREND
 # ====================================================================
-with tab1:
+def steepest_rise(df_trend, peaks, metrics=('Meninggal', 'Mengungsi')):
+    """
+    Per metrik: (tanggal kenaikan harian tertinggi, besar kenaikan, pertumbuhan bergulir terakhir %).
+    Puncak seluruh deret dibaca dari state inkremental mesin deret (`PUNCAK_KENAIKAN` di meta kubus);
+    hanya jika puncak itu jatuh setelah tanggal terpilih, kolom tambahan harian hingga tanggal itu dipindai.
+    """
+    result = {}
+    tanggal_akhir = df_trend['Tanggal'].iloc[-1]
+    for metric in metrics:
+        pertumbuhan = df_trend[f'{metric}_Pertumbuhan_Persen'].iloc[-1]
+        peak = peaks.get(metric)
+        if peak is not None and pd.Timestamp(peak[0]) <= tanggal_akhir:
+            result[metric] = (pd.Timestamp(peak[0]), peak[1], pertumbuhan)
+            continue
+        harian = df_trend[f'{metric}_Harian'].to_numpy()
+        i = int(harian.argmax())
+        result[metric] = (df_trend['Tanggal'].iloc[i], harian[i], pertumbuhan)
+    return result
+
+@traced_fragment
+def render_trend_section(selection, current_date_display):
     st.subheader(f"Visual 1.1: Trend Kumulatif Dampak Kemanusiaan ({current_date_display})")
     
-    trend_chart = alt.Chart(df_trend_filtered).transform_fold(
-        ['Meninggal_Kumulatif', 'Mengungsi_Jiwa'],
-        as_=['Metrik', 'Jumlah']
-    ).mark_line(point=True).encode(
-        x=alt.X('Tanggal:T', title='Tanggal Update Data'),
-        y=alt.Y('Jumlah:Q', title='Jumlah Kumulatif'),
-        color='Metrik:N',
-        tooltip=['Tanggal:T', 'Metrik:N', alt.Tooltip('Jumlah:Q', format=',')]
-    ).properties(
-        title=f'Trend Dampak Kemanusiaan Hingga {df_trend_filtered["Tanggal"].iloc[-1].strftime("%d %B %Y")}'
-    ).interactive()
+    df_trend_filtered = cube.trend(selection)
+    # Fold & downsampling dilakukan di server, di-cache per tanggal terpilih (titik per seri tetap)
+    df_trend_long = cube.memo('trend_long', ('tanggal', selection.date_end), lambda: trend_long(
+        df_trend_filtered, ['Meninggal_Kumulatif', 'Mengungsi_Kumulatif']
+    ))
     
-    st.altair_chart(trend_chart, use_container_width=True)
+    chart_trend = trend_chart(df_trend_long, df_trend_filtered['Tanggal'].iloc[-1])
+    
+    with tracer.span('chart:trend'):
+        st.altair_chart(chart_trend, use_container_width=True)
+
+    # Kenaikan paling curam hingga tanggal terpilih, dari puncak inkremental mesin deret (di-memo per tanggal)
+    kenaikan = cube.memo('kenaikan_curam', ('tanggal', selection.date_end), lambda: steepest_rise(
+        df_trend_filtered, cube.meta.get('PUNCAK_KENAIKAN', {})
+    ))
+    kenaikan_cols = st.columns(4)
+    for i, (metric, satuan) in enumerate([('Meninggal', 'Jiwa'), ('Mengungsi', 'Jiwa')]):
+        tanggal, besar, pertumbuhan = kenaikan[metric]
+        kenaikan_cols[2 * i].metric(
+            f"Kenaikan Harian Tertinggi ({metric})", f"+{besar:,.0f} {satuan}",
+            help=f"Terjadi pada {tanggal.strftime('%d %B %Y')}"
+        )
+        kenaikan_cols[2 * i + 1].metric(
+            f"Pertumbuhan {TREND_GROWTH_WINDOW_DAYS} Hari ({metric})",
+            '-' if np.isnan(pertumbuhan) else f"{pertumbuhan:.1f}%"
+        )
+    st.caption(
+        "Kenaikan paling curam: " + " · ".join(
+            f"{metric} pada **{tanggal.strftime('%d %B %Y')}** (+{besar:,.0f})" for metric, (tanggal, besar, _) in kenaikan.items()
+        )
+    )
     
     st.markdown("""
     #### Analisis Visual 1.1: Trend Kumulatif
     Visual ini menunjukkan **laju perkembangan krisis**. Peningkatan tajam menandakan situasi memburuk atau adanya penemuan korban baru.
     * **Tindakan Cepat:** Identifikasi tanggal dengan kenaikan paling curam untuk mengalokasikan sumber daya investigasi (SAR) dan memastikan respon pada hari itu sudah optimal.
     """)
-    st.markdown("---")
 
-    st.subheader("Visual 1.2: Peta Sebaran Korban Meninggal per Kab/Kota (Terfilter)")
-    
-    df_sorted_korban = df_filtered.sort_values(by='Total_Meninggal', ascending=False).head(10)
-    
-    chart_meninggal_mengungsi = alt.Chart(df_sorted_korban).mark_bar().encode(
-        x=alt.X('Kabupaten_Kota', sort='-y', title='Kabupaten/Kota Terdampak'),
-        y=alt.Y('Total_Meninggal', title='Korban Meninggal (Jiwa)', scale=alt.Scale(domain=[0, df_bencana['Total_Meninggal'].max() * 1.1])),
-        color=alt.Color('Total_Meninggal', scale=alt.Scale(range=['#fdd0d0', '#ff0000']), legend=None),
-        tooltip=['Kabupaten_Kota', 'Total_Meninggal', 'Mengungsi_Jiwa', 'Jenis_Bencana']
+# Kolom tabel prakiraan wilayah yang dipakai bagian prakiraan (horizon sudah dipilih lewat partisi)
+PRAKIRAAN_COLUMNS = ['Kabupaten_Kota'] + [
+    f'{metric}{suffix}' for metric in FORECAST_METRICS for suffix in ('', '_Prakiraan', '_Bawah', '_Atas')
+]
+
+def get_prakiraan(horizon):
+    """
+    Prakiraan wilayah untuk satu horizon (hanya partisi & kolom yang dipakai) dan prakiraan provinsi
+    snapshot versi data ini; dibaca sekali per kubus.
+    """
+    store = get_store(STORE_PATH)
+    return cube.memo('prakiraan', ('versi', DATA_VERSION, horizon), lambda: (
+        store.read('prakiraan', DATA_VERSION, columns=PRAKIRAAN_COLUMNS, partitions=[str(horizon)]),
+        store.read('prakiraan_provinsi', DATA_VERSION),
+    ))
+
+def prakiraan_long(df_trend, df_prakiraan_provinsi):
+    """Trend aktual provinsi + titik prakiraan (disambung dari titik aktual terakhir) untuk satu grafik."""
+    metrics = list(FORECAST_METRICS.values())
+    aktual = trend_long(df_trend, metrics).assign(Jenis='Aktual')
+    terakhir = df_trend.iloc[[-1]].melt(id_vars='Tanggal', value_vars=metrics, var_name='Metrik', value_name='Jumlah')
+    terakhir = terakhir.assign(Bawah=terakhir['Jumlah'], Atas=terakhir['Jumlah'])
+    prakiraan = pd.concat([terakhir, df_prakiraan_provinsi.drop(columns='Horizon_Jam')], ignore_index=True)
+    return pd.concat([aktual, prakiraan.assign(Jenis='Prakiraan')], ignore_index=True)
+
+@traced_fragment
+def render_prakiraan_section(selection):
+    st.subheader("Visual 1.1b: Prakiraan Pengungsi & Korban Meninggal 24-72 Jam")
+
+    df_trend = cube.df_trend
+    tanggal_akhir = df_trend['Tanggal'].iloc[-1]
+    horizon = st.select_slider(
+        'Horizon prakiraan', options=FORECAST_HORIZONS_H, value=FORECAST_HORIZONS_H[-1],
+        format_func=lambda h: f'{h} jam', key='prakiraan_horizon'
+    )
+    with tracer.span('data:prakiraan'):
+        df_prakiraan, df_prakiraan_provinsi = get_prakiraan(horizon)
+
+    # Baris wilayah terfilter: partisi horizon berurutan sama dengan baris kubus (tanpa isin)
+    df_horizon = cube.memo('prakiraan_wilayah', (horizon,) + selection.key[1:], lambda: df_prakiraan.take(
+        selection.rows
+    ))
+
+    terfilter = not (selection.is_all_wilayah and selection.is_all_jenis)
+    prakiraan_cols = st.columns(2)
+    for col, (metric, label) in zip(prakiraan_cols, [('Mengungsi_Jiwa', 'Jiwa Mengungsi'), ('Total_Meninggal', 'Korban Meninggal')]):
+        if terfilter:
+            kini, nilai = df_horizon[metric].sum(), df_horizon[f'{metric}_Prakiraan'].sum()
+            bawah, atas = df_horizon[f'{metric}_Bawah'].sum(), df_horizon[f'{metric}_Atas'].sum()
+        else:
+            baris = df_prakiraan_provinsi[
+                (df_prakiraan_provinsi['Metrik'] == FORECAST_METRICS[metric]) & (df_prakiraan_provinsi['Horizon_Jam'] == horizon)
+            ].iloc[0]
+            kini = df_trend[FORECAST_METRICS[metric]].iloc[-1]
+            nilai, bawah, atas = baris['Jumlah'], baris['Bawah'], baris['Atas']
+        col.metric(
+            f"{label} +{horizon} Jam ({'Terfilter' if terfilter else 'Total'})", f"{nilai:,.0f} Jiwa",
+            delta=f"+{nilai - kini:,.0f}", delta_color='inverse',
+            help=f"Rentang 80%: {bawah:,.0f} - {atas:,.0f} Jiwa"
+        )
+
+    df_chart = cube.memo('prakiraan_chart', ('versi', DATA_VERSION), lambda: prakiraan_long(df_trend, df_prakiraan_provinsi))
+    base = alt.Chart().encode(x=alt.X('Tanggal:T', title='Tanggal'))
+    garis = base.mark_line(point=True).encode(
+        y=alt.Y('Jumlah:Q', title='Jumlah Kumulatif'),
+        color='Metrik:N',
+        strokeDash=alt.StrokeDash('Jenis:N', title=None),
+        tooltip=['Tanggal:T', 'Jenis:N', alt.Tooltip('Jumlah:Q', format=',.0f')]
+    )
+    pita = base.mark_area(opacity=0.2).transform_filter(alt.datum.Jenis == 'Prakiraan').encode(
+        y='Bawah:Q', y2='Atas:Q', color='Metrik:N'
+    )
+    prakiraan_chart = alt.layer(pita, garis, data=df_chart).properties(height=180).facet(
+        row=alt.Row('Metrik:N', title=None)
+    ).resolve_scale(
+        y='independent'
     ).properties(
-        title=f'Top 10 Sebaran Korban Meninggal ({selected_jenis})'
+        title=f'Trend Provinsi & Prakiraan {FORECAST_HORIZONS_H[-1]} Jam dari {tanggal_akhir.strftime("%d %B %Y")}'
     )
-    
-    st.altair_chart(chart_meninggal_mengungsi, use_container_width=True)
+    with tracer.span('chart:prakiraan'):
+        st.altair_chart(prakiraan_chart, use_container_width=True)
+
+    # Beban pengungsian per wilayah (10 teratas dari wilayah terfilter)
+    df_beban = df_horizon.nlargest(10, 'Mengungsi_Jiwa_Prakiraan')
+    df_display = pd.DataFrame({
+        'Kabupaten_Kota': df_beban['Kabupaten_Kota'],
+        'Mengungsi Kini': df_beban['Mengungsi_Jiwa'],
+        f'Mengungsi +{horizon} Jam': df_beban['Mengungsi_Jiwa_Prakiraan'],
+        'Rentang 80%': [f'{lo:,} - {hi:,}' for lo, hi in zip(df_beban['Mengungsi_Jiwa_Bawah'], df_beban['Mengungsi_Jiwa_Atas'])],
+        f'Meninggal +{horizon} Jam': df_beban['Total_Meninggal_Prakiraan'],
+    })
+    with tracer.span('tabel:prakiraan'):
+        st.dataframe(df_display, hide_index=True, use_container_width=True)
+    st.caption(
+        f"Model log-linear pada tambahan harian {FORECAST_WINDOW_DAYS} hari terakhir (data hingga "
+        f"{tanggal_akhir.strftime('%d %B %Y')}); dihitung sekali per versi data untuk semua kab/kota."
+    )
+
+    st.markdown("""
+    #### Analisis Visual 1.1b: Proyeksi Beban Pengungsian
+    Prakiraan ini memperkirakan **kebutuhan kapasitas pos pengungsian** dalam 1-3 hari ke depan. Rentang lebar menandakan laporan harian yang masih fluktuatif.
+    * **Tindakan Cepat:** Siapkan tenda, logistik pangan, dan air bersih sesuai batas atas prakiraan di wilayah teratas sebelum pengungsi bertambah.
+    """)
+
+MAP_METRICS = {
+    'Korban Meninggal': 'Total_Meninggal',
+    'Jiwa Mengungsi': 'Mengungsi_Jiwa',
+    'Skor Prioritas': 'Skor_Prioritas',
+}
+
+def render_peta_sebaran(df_filtered, selected_jenis, kabkota_layers):
+    """Choropleth kab/kota: geometri dari URL statis, nilai atribut di-join di browser (lookup)."""
+    col_metrik, col_detail = st.columns([2, 1])
+    metric_label = col_metrik.radio('Warna peta', list(MAP_METRICS), horizontal=True, key='peta_metrik')
+    detail = col_detail.radio('Detail batas', list(DETAIL_LEVELS), index=1, horizontal=True, key='peta_detail')
+    metric = MAP_METRICS[metric_label]
+
+    # Hanya atribut per wilayah yang dikirim setiap rerun
+    df_values = df_filtered[['Kabupaten_Kota', 'Jenis_Bencana', 'Total_Meninggal', 'Mengungsi_Jiwa']].copy()
+    if not df_filtered.empty:
+        scorer, _ = get_prioritas(selection)
+        df_values['Skor_Prioritas'] = scorer.scores().round(1)
+    else:
+        df_values['Skor_Prioritas'] = []
+
+    def geo_data(layers):
+        return alt.Data(url=f'{GEO_STATIC_URL}/{layers[detail]}', format=alt.DataFormat(property='features', type='json'))
+
+    # Wilayah di luar filter tetap digambar abu-abu sebagai latar
+    latar = alt.Chart(geo_data(kabkota_layers)).mark_geoshape(fill='#eeeeee', stroke='white', strokeWidth=0.5).encode(
+        tooltip=[alt.Tooltip('properties.Nama:N', title='Wilayah')]
+    )
+    choropleth = alt.Chart(geo_data(kabkota_layers)).mark_geoshape(stroke='white', strokeWidth=0.5).transform_lookup(
+        lookup='properties.Kabupaten_Kota',
+        from_=alt.LookupData(df_values, 'Kabupaten_Kota', ['Jenis_Bencana', 'Total_Meninggal', 'Mengungsi_Jiwa', 'Skor_Prioritas']),
+    ).transform_filter(
+        alt.datum[metric] != None  # noqa: E711 (ekspresi Vega, bukan perbandingan Python)
+    ).encode(
+        color=alt.Color(f'{metric}:Q', title=metric_label, scale=alt.Scale(range=['#fdd0d0', '#ff0000'])),
+        tooltip=[
+            alt.Tooltip('properties.Nama:N', title='Wilayah'),
+            alt.Tooltip('Jenis_Bencana:N', title='Jenis Bencana'),
+            alt.Tooltip('Total_Meninggal:Q', title='Meninggal', format=','),
+            alt.Tooltip('Mengungsi_Jiwa:Q', title='Mengungsi', format=','),
+            alt.Tooltip('Skor_Prioritas:Q', title='Skor Prioritas'),
+        ],
+    )
+    layers = [latar, choropleth]
+    kecamatan_layers = map_layers(GEO_KECAMATAN_PATH, kecamatan=True)
+    if kecamatan_layers is not None:
+        layers.append(alt.Chart(geo_data(kecamatan_layers)).mark_geoshape(filled=False, stroke='#888888', strokeWidth=0.3))
+
+    peta = alt.layer(*layers).project('mercator').properties(
+        title=f'Sebaran {metric_label} per Kab/Kota ({selected_jenis})', height=520
+    )
+    with tracer.span('chart:peta_sebaran'):
+        st.altair_chart(peta, use_container_width=True)
+
+@traced_fragment
+def render_sebaran_section(df_filtered, selected_jenis):
+    st.subheader("Visual 1.2: Peta Sebaran Korban Meninggal per Kab/Kota (Terfilter)")
+
+    with tracer.span('peta:geometri'):
+        kabkota_layers = map_layers(GEO_KABKOTA_PATH)
+    if kabkota_layers is not None:
+        render_peta_sebaran(df_filtered, selected_jenis, kabkota_layers)
+    else:
+        st.caption(f"File batas wilayah `{os.path.basename(GEO_KABKOTA_PATH)}` tidak ditemukan; menampilkan grafik batang.")
+        df_sorted_korban = df_filtered.sort_values(by='Total_Meninggal', ascending=False).head(10)
+
+        chart_meninggal_mengungsi = alt.Chart(df_sorted_korban).mark_bar().encode(
+            x=alt.X('Kabupaten_Kota', sort='-y', title='Kabupaten/Kota Terdampak'),
+            y=alt.Y('Total_Meninggal', title='Korban Meninggal (Jiwa)', scale=alt.Scale(domain=[0, cube.df_bencana['Total_Meninggal'].max() * 1.1])),
+            color=alt.Color('Total_Meninggal', scale=alt.Scale(range=['#fdd0d0', '#ff0000']), legend=None),
+            tooltip=['Kabupaten_Kota', 'Total_Meninggal', 'Mengungsi_Jiwa', 'Jenis_Bencana']
+        ).properties(
+            title=f'Top 10 Sebaran Korban Meninggal ({selected_jenis})'
+        )
+
+        with tracer.span('chart:sebaran_korban'):
+            st.altair_chart(chart_meninggal_mengungsi, use_container_width=True)
 
     st.markdown("""
     #### Analisis Visual 1.2: Hotspot Kemanusiaan
-    Grafik ini adalah alat utama untuk menentukan **prioritas SAR dan Evakuasi**. Wilayah dengan batang tertinggi adalah titik fokus utama.
+    Grafik ini adalah alat utama untuk menentukan **prioritas SAR dan Evakuasi**. Wilayah dengan warna paling pekat (atau batang tertinggi) adalah titik fokus utama.
     * **Tindakan Cepat:** Segera kerahkan tim tambahan ke 3 kabupaten teratas untuk pencarian dan penyelamatan serta memastikan layanan kesehatan tersedia di sana.
     """)
 
+def render_tab_ringkasan():
+    render_trend_section(selection, current_date_display)
+    st.markdown("---")
+    render_prakiraan_section(selection)
+    st.markdown("---")
+    render_sebaran_section(cube.frame(selection), selected_jenis)
+
 # ====================================================================
 # TAB 2: ANALISIS FINANSIAL & INFRASTRUKTUR
 # ====================================================================
-with tab2:
+@traced_fragment
+def render_kerugian_section(df_filtered):
     st.subheader("Visual 2.1: Estimasi Kerugian Finansial per Kabupaten (Terfilter)")
     
     df_kerugian_filtered = df_filtered.sort_values(by='Kerugian_Rupiah_Miliar', ascending=False).head(10)
@@ -300,15 +620,17 @@ with tab2:
     ).properties(
         title='Kerugian Rupiah (Estimasi) Berdasarkan Kabupaten/Kota'
     )
-    st.altair_chart(kerugian_chart, use_container_width=True)
+    with tracer.span('chart:kerugian'):
+        st.altair_chart(kerugian_chart, use_container_width=True)
 
     st.markdown("""
     #### Analisis Visual 2.1: Prioritas Anggaran
     Visual ini memandu **alokasi dana rekonstruksi**. Wilayah dengan kerugian tertinggi membutuhkan audit kerusakan dan perencanaan anggaran pemulihan segera.
     * **Tindakan Cepat:** Bentuk tim pemulihan ekonomi di kabupaten teratas untuk memulai pendataan aset dan infrastruktur yang rusak demi mempercepat klaim anggaran.
     """)
-    st.markdown("---")
 
+@traced_fragment
+def render_infrastruktur_section(df_filtered):
     st.subheader("Visual 2.2: Komposisi Kerusakan Infrastruktur Kritis (Terfilter)")
     
     # Agregasi infrastruktur
@@ -330,7 +652,8 @@ with tab2:
         color=alt.value("black") 
     )
     
-    st.altair_chart(donut_chart, use_container_width=True)
+    with tracer.span('chart:infrastruktur'):
+        st.altair_chart(donut_chart, use_container_width=True)
     
     st.markdown("""
     #### Analisis Visual 2.2: Fokus Rekonstruksi
@@ -340,84 +663,247 @@ with tab2:
     * **Tindakan Cepat:** Bentuk gugus tugas khusus perbaikan Jembatan (untuk akses) dan Sekolah/Faskes (untuk layanan publik).
     """)
 
+def render_tab_finansial():
+    df_filtered = cube.frame(selection)
+    render_kerugian_section(df_filtered)
+    st.markdown("---")
+    render_infrastruktur_section(df_filtered)
+
 # ====================================================================
 # TAB 3: PRIORITAS AKSI CEPAT
 # ====================================================================
-with tab3:
-    st.header("Ringkasan Prioritas (Berdasarkan Data Terfilter)")
+@traced_fragment
+def render_prioritas_section(df_top_prioritas):
+    # Menampilkan tabel prioritas
+    st.subheader("Top 5 Wilayah Berdasarkan Skor Prioritas Gabungan")
     
-    if not df_filtered.empty:
-        # Menghitung Total Skor Prioritas (gabungan korban, kerugian, dan kerusakan)
-        df_prioritas = df_filtered.copy()
-        
-        # Normalisasi untuk skor gabungan
-        df_prioritas['Skor_Meninggal'] = df_prioritas['Total_Meninggal'] / df_prioritas['Total_Meninggal'].max()
-        df_prioritas['Skor_Mengungsi'] = df_prioritas['Mengungsi_Jiwa'] / df_prioritas['Mengungsi_Jiwa'].max()
-        df_prioritas['Skor_Kerugian'] = df_prioritas['Kerugian_Rupiah_Miliar'] / df_prioritas['Kerugian_Rupiah_Miliar'].max()
-        df_prioritas['Skor_Infrastruktur'] = df_prioritas['Total_Unit_Rusak'] / df_prioritas['Total_Unit_Rusak'].max()
-        
-        # Skor akhir (bobot: Kemanusiaan 40%, Finansial 30%, Infrastruktur 30%)
-        df_prioritas['Skor_Prioritas_Gabungan'] = (
-            (df_prioritas['Skor_Meninggal'] + df_prioritas['Skor_Mengungsi']) * 0.20 +
-            (df_prioritas['Skor_Kerugian'] * 0.30) +
-            (df_prioritas['Skor_Infrastruktur'] * 0.30)
-        ) * 100
-        
-        df_top_prioritas = df_prioritas.sort_values(by='Skor_Prioritas_Gabungan', ascending=False).head(5)
-        
-        # Menampilkan tabel prioritas
-        st.subheader("Top 5 Wilayah Berdasarkan Skor Prioritas Gabungan")
-        
-        df_display = df_top_prioritas[[
-            'Kabupaten_Kota', 
-            'Total_Meninggal', 
-            'Mengungsi_Jiwa', 
-            'Kerugian_Rupiah_Miliar',
-            'Total_Unit_Rusak',
-            'Skor_Prioritas_Gabungan'
+    df_display = df_top_prioritas[[
+        'Kabupaten_Kota', 
+        'Total_Meninggal', 
+        'Mengungsi_Jiwa', 
+        'Kerugian_Rupiah_Miliar',
+        'Total_Unit_Rusak',
+        'Skor_Prioritas_Gabungan'
+    ]].rename(columns={
+        'Total_Meninggal': 'Meninggal', 
+        'Mengungsi_Jiwa': 'Mengungsi', 
+        'Kerugian_Rupiah_Miliar': 'Kerugian (M)',
+        'Total_Unit_Rusak': 'Rusak (Unit)',
+        'Skor_Prioritas_Gabungan': 'Skor (%)'
+    })
+    
+    df_display['Skor (%)'] = df_display['Skor (%)'].round(1)
+    df_display['Kerugian (M)'] = df_display['Kerugian (M)'].round(1)
+
+    # Highlight skor tertinggi
+    with tracer.span('tabel:prioritas'):
+        st.dataframe(
+            df_display.style.apply(highlight_priority, subset=['Skor (%)']),
+            use_container_width=True
+        )
+
+    st.markdown("---")
+    
+    # Prioritas Eksekutif Berdasarkan Peringkat 1
+    top_kab = df_top_prioritas.iloc[0]['Kabupaten_Kota']
+    
+    st.markdown(f"""
+        <div style="background-color: #ffcccc; padding: 25px; border-radius: 12px; border-left: 8px solid #cc0000; margin-top: 20px;">
+            <h2 style="color: #cc0000; margin-top: 0; font-weight: 700;">🚨 FOKUS AKSI UTAMA (Peringkat 1)</h2>
+            <p style="font-size: 1.6em; font-weight: bold;">
+                Prioritas Tunggal: <span style="color: #990000;">{top_kab.upper()}</span>
+            </p>
+            <p>Semua sumber daya cepat (SAR, Medis, Logistik 48 Jam) harus diarahkan ke wilayah ini terlebih dahulu.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+@traced_fragment
+def render_whatif_section(scorer, df_top_prioritas):
+    """Slider bobot hanya me-rerun fragment ini, bukan seluruh dashboard."""
+    st.subheader("Simulasi Bobot Prioritas (What-If)")
+    with st.expander("Ubah bobot skor dan bandingkan peringkat wilayah"):
+        bobot_labels = {
+            'Total_Meninggal': 'Korban Meninggal (%)',
+            'Mengungsi_Jiwa': 'Jiwa Mengungsi (%)',
+            'Kerugian_Rupiah_Miliar': 'Kerugian Finansial (%)',
+            'Total_Unit_Rusak': 'Infrastruktur Rusak (%)',
+        }
+        bobot_cols = st.columns(len(bobot_labels))
+        custom_weights = {
+            metric: bobot_cols[i].slider(label, 0, 100, int(DEFAULT_WEIGHTS[metric] * 100), step=5, key=f'bobot_{metric}') / 100
+            for i, (metric, label) in enumerate(bobot_labels.items())
+        }
+
+        # Peringkat bawaan vs skenario dihitung dalam satu batch
+        ranks_default, ranks_custom = scorer.ranks([DEFAULT_WEIGHTS, custom_weights])
+        df_whatif = scorer.ranked_frame(k=5, weights=custom_weights)[['Kabupaten_Kota', 'Skor_Prioritas_Gabungan']]
+        whatif_pos = scorer.positions(df_whatif.index)
+        df_whatif['Peringkat Bawaan'] = ranks_default[whatif_pos]
+        df_whatif['Peringkat Skenario'] = ranks_custom[whatif_pos]
+        df_whatif['Skor_Prioritas_Gabungan'] = df_whatif['Skor_Prioritas_Gabungan'].round(1)
+        with tracer.span('tabel:whatif'):
+            st.dataframe(df_whatif.rename(columns={'Skor_Prioritas_Gabungan': 'Skor Skenario (%)'}), hide_index=True, use_container_width=True)
+
+        # Sapuan bobot infrastruktur 0-100% untuk semua wilayah sekaligus
+        infra_steps = np.linspace(0, 1, 21)
+        sweep_ranks = scorer.ranks(vary_weight(DEFAULT_WEIGHTS, 'Total_Unit_Rusak', infra_steps))
+        tracked = scorer.positions(df_top_prioritas.index)
+        df_sweep = pd.DataFrame({
+            'Bobot_Infrastruktur': np.repeat(infra_steps * 100, len(tracked)),
+            'Kabupaten_Kota': np.tile(df_top_prioritas['Kabupaten_Kota'].to_numpy(), len(infra_steps)),
+            'Peringkat': sweep_ranks[:, tracked].ravel(),
+        })
+        sweep_chart = alt.Chart(df_sweep).mark_line(point=True).encode(
+            x=alt.X('Bobot_Infrastruktur:Q', title='Bobot Infrastruktur (%)'),
+            y=alt.Y('Peringkat:Q', title='Peringkat', scale=alt.Scale(reverse=True)),
+            color='Kabupaten_Kota:N',
+            tooltip=['Kabupaten_Kota', 'Bobot_Infrastruktur', 'Peringkat']
+        ).properties(title='Perubahan Peringkat Top 5 Saat Bobot Infrastruktur Diubah')
+        with tracer.span('chart:sapuan_bobot'):
+            st.altair_chart(sweep_chart, use_container_width=True)
+
+def render_paged_table(df, key, memo_key, search_columns, default_sort, highlight_column=None):
+    """
+    Tabel dengan pencarian, urutan, dan paginasi di server: hanya halaman aktif yang dikirim ke browser.
+    Urutan baris hasil kueri di-memo per `memo_key`, sehingga pindah halaman hanya memotong array indeks.
+    """
+    col_cari, col_urut, col_arah, col_baris = st.columns([3, 2, 1, 1])
+    search = col_cari.text_input('Cari', key=f'{key}_cari', placeholder=', '.join(search_columns))
+    sort_by = col_urut.selectbox('Urutkan', list(df.columns), index=list(df.columns).index(default_sort), key=f'{key}_urut')
+    ascending = col_arah.toggle('Naik', value=False, key=f'{key}_naik')
+    page_size = col_baris.selectbox('Baris', PAGE_SIZES, key=f'{key}_baris')
+
+    order = cube.memo(
+        'tabel', (key, memo_key, search.strip(), sort_by, ascending),
+        lambda: query_order(df, search.strip(), search_columns, sort_by, ascending)
+    )
+    n_pages = page_count(len(order), page_size)
+    # Jepit halaman yang tersimpan jika hasil pencarian kini lebih sedikit
+    if st.session_state.get(f'{key}_halaman', 1) > n_pages:
+        st.session_state[f'{key}_halaman'] = n_pages
+    page = st.number_input('Halaman', min_value=1, max_value=n_pages, step=1, key=f'{key}_halaman')
+
+    df_page = df.take(page_rows(order, page, page_size))
+    styled = df_page.style.format(precision=1)
+    if highlight_column is not None:
+        styled = styled.apply(highlight_priority, subset=[highlight_column])
+    with tracer.span(f'tabel:{key}'):
+        st.dataframe(styled, hide_index=True, use_container_width=True)
+    st.caption(f"{len(order):,} dari {len(df):,} baris · halaman {page} dari {n_pages}")
+
+@traced_fragment
+def render_tabel_lengkap_section(selection, scorer):
+    """Peringkat lengkap semua wilayah terfilter dan catatan laporan feed, dipaginasi di server."""
+    st.subheader("Daftar Lengkap Wilayah & Catatan Laporan")
+    tab_peringkat, tab_laporan = st.tabs(["Peringkat Lengkap", "Catatan Laporan (Feed)"])
+
+    with tab_peringkat:
+        df_peringkat = cube.memo('peringkat_penuh', selection, lambda: scorer.ranked_frame())
+        df_peringkat = df_peringkat[[
+            'Kabupaten_Kota', 'Jenis_Bencana', 'Total_Meninggal', 'Mengungsi_Jiwa',
+            'Kerugian_Rupiah_Miliar', 'Total_Unit_Rusak', 'Skor_Prioritas_Gabungan'
         ]].rename(columns={
-            'Total_Meninggal': 'Meninggal', 
-            'Mengungsi_Jiwa': 'Mengungsi', 
+            'Total_Meninggal': 'Meninggal',
+            'Mengungsi_Jiwa': 'Mengungsi',
             'Kerugian_Rupiah_Miliar': 'Kerugian (M)',
             'Total_Unit_Rusak': 'Rusak (Unit)',
             'Skor_Prioritas_Gabungan': 'Skor (%)'
         })
-        
-        df_display['Skor (%)'] = df_display['Skor (%)'].round(1)
-        df_display['Kerugian (M)'] = df_display['Kerugian (M)'].round(1)
+        df_peringkat.insert(0, 'Peringkat', np.arange(1, len(df_peringkat) + 1))
+        render_paged_table(
+            df_peringkat, 'peringkat', selection.key, ['Kabupaten_Kota', 'Jenis_Bencana'],
+            default_sort='Skor (%)', highlight_column='Skor (%)'
+        )
 
-        # Highlight skor tertinggi
-        st.dataframe(
-            df_display.style.applymap(highlight_priority, subset=['Skor (%)']),
-            use_container_width=True
+    with tab_laporan:
+        # Catatan yang sudah di-parsing pembaca feed (hanya potongan baru yang disambung, tanpa baca ulang file)
+        signature, df_laporan = feed_reader.records()
+        if df_laporan.empty:
+            st.info("Feed laporan belum berisi catatan.")
+            return
+        if not selection.is_all_wilayah or not selection.is_all_jenis:
+            regions = cube.regions[selection.rows]
+            df_laporan = cube.memo(
+                'laporan', (signature, selection.key[1:]),
+                lambda: df_laporan[df_laporan['Kabupaten_Kota'].isin(regions)]
+            )
+        render_paged_table(
+            df_laporan, 'laporan', (signature, selection.key[1:]), ['Kabupaten_Kota', 'Kategori', 'Sub_Kategori', 'Sumber'],
+            default_sort='Waktu'
         )
 
+def render_tab_prioritas():
+    st.header("Ringkasan Prioritas (Berdasarkan Data Terfilter)")
+    
+    df_filtered = cube.frame(selection)
+    if not df_filtered.empty:
+        scorer, df_prioritas = get_prioritas(selection)
+        render_prioritas_section(df_prioritas.head(5))
         st.markdown("---")
-        
-        # Prioritas Eksekutif Berdasarkan Peringkat 1
-        top_kab = df_top_prioritas.iloc[0]['Kabupaten_Kota']
-        
-        st.markdown(f"""
-            <div style="background-color: #ffcccc; padding: 25px; border-radius: 12px; border-left: 8px solid #cc0000; margin-top: 20px;">
-                <h2 style="color: #cc0000; margin-top: 0; font-weight: 700;">🚨 FOKUS AKSI UTAMA (Peringkat 1)</h2>
-                <p style="font-size: 1.6em; font-weight: bold;">
-                    Prioritas Tunggal: <span style="color: #990000;">{top_kab.upper()}</span>
-                </p>
-                <p>Semua sumber daya cepat (SAR, Medis, Logistik 48 Jam) harus diarahkan ke wilayah ini terlebih dahulu.</p>
-            </div>
-        """, unsafe_allow_html=True)
+        render_whatif_section(scorer, df_prioritas.head(5))
+        st.markdown("---")
+        render_tabel_lengkap_section(selection, scorer)
     else:
         st.info("Pilih setidaknya satu wilayah atau jenis bencana untuk melihat rekomendasi prioritas.")
 
 # ====================================================================
 # TAB 4: REKOMENDASI TINDAKAN DETAIL
 # ====================================================================
-with tab4:
+def get_alokasi(selection, df_filtered, scorer, supply):
+    """Rencana alokasi di-cache per kombinasi filter & stok (skor prioritas dari memo yang sama)."""
+    return cube.memo('alokasi', (selection.key[1:], tuple(supply)), lambda: allocate(
+        scorer.scores(), resource_needs(df_filtered), supply
+    ))
+
+def render_alokasi_section(selection, df_filtered, scorer, plan, supply):
+    """Ringkasan pemakaian stok dan rencana lengkap per wilayah (dipaginasi di server)."""
+    st.subheader("Rencana Alokasi Sumber Daya (Semua Wilayah Terfilter)")
+    cakupan = coverage(plan)
+    for col, (r, (name, resource)) in zip(st.columns(len(RESOURCES)), enumerate(RESOURCES.items())):
+        col.metric(
+            f"{name} Dialokasikan", f"{plan.allocation[:, r].sum():,} / {supply[r]:,} {resource.unit}",
+            help=f"Memenuhi {cakupan[r]:.0f}% kebutuhan · cadangan {plan.reserve[r]:,} {resource.unit}"
+        )
+    if not plan.complete:
+        st.caption("Anggaran waktu alokasi habis; unit yang belum terbagi dicatat sebagai cadangan.")
+
+    def build_rencana():
+        df_rencana = pd.DataFrame({
+            'Kabupaten_Kota': df_filtered['Kabupaten_Kota'].to_numpy(),
+            'Skor (%)': scorer.scores(),
+        })
+        for r, (name, resource) in enumerate(RESOURCES.items()):
+            df_rencana[f'{name} ({resource.unit})'] = plan.allocation[:, r]
+            df_rencana[f'Kebutuhan {name}'] = plan.need[:, r]
+        return df_rencana
+
+    df_rencana = cube.memo('rencana_alokasi', (selection.key[1:], tuple(supply)), build_rencana)
+    render_paged_table(
+        df_rencana, 'alokasi', (selection.key[1:], tuple(supply)), ['Kabupaten_Kota'],
+        default_sort='Skor (%)', highlight_column='Skor (%)'
+    )
+
+@traced_fragment
+def render_tab_rekomendasi(selection, df_filtered):
     st.header("Rencana Aksi Prioritas 5D (Detail)")
     
     if not df_filtered.empty:
-        # Ambil data top 3 dari hasil skor gabungan
-        df_prioritas_aksi = df_prioritas.sort_values(by='Skor_Prioritas_Gabungan', ascending=False).head(3)
+        # Ambil data top 3 dari hasil skor gabungan (memo yang sama dengan tab 3)
+        scorer, df_prioritas = get_prioritas(selection)
+        df_prioritas_aksi = df_prioritas.head(3)
+
+        # Stok yang tersedia untuk dibagi ke seluruh wilayah terfilter
+        with st.expander("Stok Sumber Daya Tersedia"):
+            supply = [
+                col.number_input(f"{name} ({resource.unit})", min_value=0, value=resource.supply, step=1, key=f'stok_{name}')
+                for col, (name, resource) in zip(st.columns(len(RESOURCES)), RESOURCES.items())
+            ]
+        with tracer.span('alokasi:rencana'):
+            plan = get_alokasi(selection, df_filtered, scorer, supply)
+        # Baris rencana & persen stok untuk wilayah top 3 (posisi sama dengan urutan skor)
+        posisi = scorer.positions(df_prioritas_aksi.index)
+        alokasi_aksi = dict(zip(RESOURCES, plan.allocation[posisi].T))
+        persen_aksi = dict(zip(RESOURCES, share(plan.allocation[posisi], supply).T))
         
         if len(df_prioritas_aksi) > 0:
             P1 = df_prioritas_aksi.iloc[0]
@@ -431,16 +917,17 @@ with tab4:
         
         st.info(f"""
         **PRIORITAS TERTINGGI ({P1['Kabupaten_Kota']}):**
-        - **SAR:** Kerahkan 75% tim SAR tersisa ke lokasi Bencana {P1['Jenis_Bencana']} untuk pencarian **{int(P1['Total_Meninggal'])} korban** dan **{int(P1['Mengungsi_Jiwa']):,} jiwa mengungsi**.
-        - **Logistik:** Distribusikan 100% bantuan darurat (makanan siap saji, selimut, obat-obatan) untuk 72 jam pertama ke pusat evakuasi terbesar.
-        - **Medis:** Siapkan posko darurat dan tim medis trauma untuk korban luka-luka.
+        - **SAR:** Kerahkan **{alokasi_aksi['Tim SAR'][0]} tim SAR** ({persen_aksi['Tim SAR'][0]:.0f}% stok) ke lokasi Bencana {P1['Jenis_Bencana']} untuk pencarian **{int(P1['Total_Meninggal'])} korban** dan **{int(P1['Mengungsi_Jiwa']):,} jiwa mengungsi**.
+        - **Logistik:** Distribusikan **{alokasi_aksi['Logistik'][0]:,} ton** bantuan darurat ({persen_aksi['Logistik'][0]:.0f}% stok; makanan siap saji, selimut, obat-obatan) untuk 72 jam pertama ke pusat evakuasi.
+        - **Medis:** Siapkan posko darurat dengan **{alokasi_aksi['Tim Medis'][0]} tim medis** trauma untuk korban luka-luka.
         """)
 
         if P2 is not None:
             st.warning(f"""
             **PRIORITAS SEKUNDER ({P2['Kabupaten_Kota']}):**
-            - **SAR:** Kerahkan 25% tim SAR untuk menyisir lokasi-lokasi terpencil yang terisolasi di area {P2['Jenis_Bencana']}.
-            - **Kesehatan:** Kirim tim psikososial untuk membantu trauma korban mengungsi.
+            - **SAR:** Kerahkan **{alokasi_aksi['Tim SAR'][1]} tim SAR** ({persen_aksi['Tim SAR'][1]:.0f}% stok) untuk menyisir lokasi-lokasi terpencil yang terisolasi di area {P2['Jenis_Bencana']}.
+            - **Logistik:** Kirim **{alokasi_aksi['Logistik'][1]:,} ton** bantuan untuk **{int(P2['Mengungsi_Jiwa']):,} jiwa mengungsi**.
+            - **Kesehatan:** Kirim **{alokasi_aksi['Tim Medis'][1]} tim medis** termasuk tim psikososial untuk membantu trauma korban mengungsi.
             """)
         
         st.markdown("---")
@@ -457,13 +944,17 @@ with tab4:
 
         st.error(f"""
         **Aksi Infrastruktur Total Top 3:**
-        - **Jembatan ({total_jembatan} Unit Rusak):** Segera bangun jembatan darurat (Bailey) untuk minimal 3 jembatan yang paling vital di **{P1['Kabupaten_Kota']}** dalam 7 hari ke depan.
+        - **Jembatan ({total_jembatan} Unit Rusak):** Bangun **{alokasi_aksi['Jembatan Bailey'].sum()} jembatan darurat (Bailey)** di Top 3 dalam 7 hari ke depan, **{alokasi_aksi['Jembatan Bailey'][0]}** di antaranya di **{P1['Kabupaten_Kota']}**.
         - **Sekolah ({total_sekolah} Unit Rusak):** Identifikasi bangunan publik terdekat (Kantor Desa/Balai Pertemuan) untuk dijadikan Sekolah Darurat.
         - **Faskes ({total_faskes} Unit Rusak):** Prioritaskan perbaikan **1 Faskes** terpenting di **{P1['Kabupaten_Kota']}** agar layanan bersalin dan darurat berjalan.
         """)
 
         st.markdown("---")
 
+        render_alokasi_section(selection, df_filtered, scorer, plan, supply)
+
+        st.markdown("---")
+
         st.subheader("3. Pemulihan Ekonomi & Keuangan (Prioritas Jangka Panjang)")
         st.markdown("""
         Fokus: Mempersiapkan anggaran, dan pemulihan mata pencaharian.
@@ -479,3 +970,53 @@ with tab4:
         st.info("Pilih setidaknya satu wilayah atau jenis bencana untuk melihat rekomendasi tindakan detail.")
 
     st.caption("Dashboard ini menyediakan analisis cepat berdasarkan data agregat bencana. Gunakan ini sebagai panduan awal dalam pengambilan keputusan.")
+
+# ====================================================================
+# TABBED DASHBOARD
+# ====================================================================
+
+# Mode ringan: hanya tab yang sedang dilihat yang dihitung & diserialisasi
+lazy_tabs = st.sidebar.toggle(
+    'Mode Ringan (hanya tab aktif dihitung)',
+    value=True,
+    help='Jika nonaktif, keempat tab dihitung di setiap rerun (st.tabs).'
+)
+
+TAB_RENDERERS = [
+    render_tab_ringkasan,
+    render_tab_finansial,
+    render_tab_prioritas,
+    lambda: render_tab_rekomendasi(selection, cube.frame(selection)),
+]
+
+# Panel debug waktu (diisi di akhir rerun, setelah semua span tercatat)
+show_timing = st.sidebar.toggle('Panel Debug Waktu', value=False, help='Durasi setiap bagian dashboard pada rerun ini.')
+timing_panel = st.sidebar.empty()
+
+if lazy_tabs:
+    active_tab = st.radio('Tampilan', TAB_LABELS, horizontal=True, label_visibility='collapsed', key='active_tab')
+    with tracer.span(f'tab:{active_tab}'):
+        TAB_RENDERERS[TAB_LABELS.index(active_tab)]()
+else:
+    for label, tab, render_tab in zip(TAB_LABELS, st.tabs(TAB_LABELS), TAB_RENDERERS):
+        with tab, tracer.span(f'tab:{label}'):
+            render_tab()
+
+def render_spans(spans):
+    df_spans = pd.DataFrame(spans).sort_values('offset_ms')
+    df_spans['Span'] = ['\u00a0\u00a0' * depth + name for depth, name in zip(df_spans['depth'], df_spans['name'])]
+    st.dataframe(
+        df_spans[['Span', 'duration_ms']].rename(columns={'duration_ms': 'Durasi (ms)'}).round(2),
+        hide_index=True, use_container_width=True
+    )
+
+if show_timing:
+    with timing_panel.container():
+        st.caption(f"Sesi `{tracer.session_id}` · rerun `{tracer.rerun_id}` · total {tracer.total_ms():.1f} ms")
+        render_spans(tracer.spans)
+        # Rerun fragment terakhir (dicatat oleh tracer fragment itu sendiri)
+        if '_timing_last_fragment' in st.session_state:
+            fragment_rerun_id, fragment_ms, fragment_spans = st.session_state['_timing_last_fragment']
+            st.caption(f"Rerun fragment terakhir `{fragment_rerun_id}` · total {fragment_ms:.1f} ms")
+            render_spans(fragment_spans)
+tracer.sink.flush()
@@ -0,0 +1,81 @@
+"""
+Disagregasi total otoritatif ke unit wilayah dengan metode sisa terbesar
+(largest remainder / Hamilton).
+
+Semua metrik diproses sekaligus sebagai satu array [unit x metrik], dan
+setiap level hierarki (provinsi -> kab/kota -> kecamatan -> nagari) cukup
+satu pass vektor untuk semua induk. Hasilnya selalu menjumlah tepat ke total
+induknya, dan sisa pembulatan dibagi ke unit dengan pecahan terbesar, bukan
+ditumpuk ke satu wilayah.
+"""
+import numpy as np
+
+
+def largest_remainder(parent_totals, weights, parents=None):
+    """
+    Membagi `parent_totals` [induk x metrik] ke unit anak sesuai `weights` [anak].
+
+    `parents` [anak] berisi indeks induk setiap anak (default: semua anak di induk 0).
+    Mengembalikan array int64 [anak x metrik] yang per induk menjumlah tepat ke totalnya.
+    Seri pecahan diputus berdasarkan bobot lalu urutan baris, sehingga hasil deterministik.
+    Induk yang bobot semua anaknya nol dibagi rata ke anak-anaknya; induk bertotal bukan nol
+    tanpa anak sama sekali ditolak (`ValueError`), karena totalnya tidak dapat dipertahankan.
+    """
+    parent_totals = np.atleast_2d(np.asarray(parent_totals, dtype=float))
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    parents = np.zeros(n, dtype=np.intp) if parents is None else np.asarray(parents, dtype=np.intp)
+    n_parents = parent_totals.shape[0]
+    targets = np.rint(parent_totals).astype(np.int64)
+
+    n_children = np.bincount(parents, minlength=n_parents)
+    orphaned = (n_children == 0) & (targets != 0).any(axis=1)
+    if orphaned.any():
+        raise ValueError(f'induk {np.flatnonzero(orphaned).tolist()} memiliki total tetapi tidak memiliki anak')
+
+    # Kuota proporsional per anak (semua metrik sekaligus)
+    group_weight = np.bincount(parents, weights=weights, minlength=n_parents)
+    if (group_weight <= 0).any():
+        weights = np.where(group_weight[parents] > 0, weights, 1.0)
+        group_weight = np.bincount(parents, weights=weights, minlength=n_parents)
+    share = np.divide(weights, group_weight[parents], out=np.zeros(n), where=group_weight[parents] > 0)
+    quotas = share[:, None] * targets[parents]
+    floors = np.floor(quotas).astype(np.int64)
+    remainders = quotas - floors
+
+    # Sisa per induk & metrik setelah pembulatan ke bawah
+    floor_sums = np.zeros_like(targets)
+    np.add.at(floor_sums, parents, floors)
+    residual = targets - floor_sums
+
+    # Peringkat pecahan di dalam setiap induk, per metrik: induk, pecahan menurun, bobot menurun, indeks
+    order = np.lexsort((np.broadcast_to(np.arange(n)[:, None], remainders.shape),
+                        np.broadcast_to(-weights[:, None], remainders.shape),
+                        -remainders,
+                        np.broadcast_to(parents[:, None], remainders.shape)), axis=0)
+    sorted_parents = parents[order]
+    group_start = np.searchsorted(parents[np.argsort(parents, kind='stable')], np.arange(n_parents))
+    rank_in_group = np.arange(n)[:, None] - group_start[sorted_parents]
+
+    bonus = np.zeros_like(floors)
+    np.put_along_axis(
+        bonus, order,
+        (rank_in_group < np.take_along_axis(residual, sorted_parents, axis=0)).astype(np.int64),
+        axis=0,
+    )
+    return floors + bonus
+
+
+def apportion_levels(totals, levels):
+    """
+    Disagregasi bertingkat. `totals` [metrik] adalah total provinsi; `levels` berisi
+    pasangan (weights, parents) untuk setiap level, dengan `parents` menunjuk indeks
+    unit pada level sebelumnya (None untuk level pertama di bawah provinsi).
+    Mengembalikan daftar array [unit x metrik], satu per level.
+    """
+    current = np.atleast_2d(np.asarray(totals, dtype=float))
+    results = []
+    for weights, parents in levels:
+        current = largest_remainder(current, weights, parents)
+        results.append(current)
+    return results
@@ -0,0 +1,276 @@
+"""
+Benchmark headless untuk `app.py` pada skala data sintetis.
+
+Skrip ini membuat dataset sintetis (feed harian, basis wilayah),
+menjalankan `app.py` lewat `streamlit.testing.v1.AppTest`, lalu mencatat:
+- waktu cold start (cache kosong, store kosong),
+- waktu `load_updated_data` dan `load_forecast` saja,
+- latensi rerun per interaksi sidebar (tanggal, wilayah, jenis bencana).
+
+Hasil ditulis sebagai JSON agar bisa dibandingkan antar commit:
+
+    python benchmarks/bench_app.py --output bench_results.json
+    python benchmarks/bench_app.py --regions 15 1000 10000 --days 7 365 --types 1 20
+    python benchmarks/bench_app.py --compare baseline.json --threshold 1.25
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / 'app.py'
+sys.path.insert(0, str(ROOT))
+
+# (wilayah, hari, jenis bencana) bawaan: dari ukuran saat ini hingga skala tanggap darurat besar
+DEFAULT_SCENARIOS = [(15, 7, 3), (100, 30, 5), (1000, 90, 10), (10000, 365, 20)]
+
+DATA_ENV = ['BENCANA_FEED_PATH', 'BENCANA_WILAYAH_PATH', 'BENCANA_STORE_PATH']
+
+
+def write_synthetic_dataset(directory, n_regions, n_days, n_types, seed=0):
+    """Menulis feed harian dan basis wilayah sintetis ke `directory`."""
+    rng = np.random.default_rng(seed)
+    directory = Path(directory)
+
+    # Total per Sub_Kategori dari feed contoh, diskalakan dan dibagi ke `n_days` laporan harian
+    totals = pd.read_csv(ROOT / 'data' / 'feed_laporan.csv').groupby(
+        ['Kategori', 'Sub_Kategori', 'Satuan'], sort=False, as_index=False
+    )['Nilai'].sum()
+    scale = max(1.0, n_regions / 15)
+    share = np.cumsum(rng.random(n_days) + 0.1)
+    share /= share[-1]
+    cumulative = np.round(np.outer(share, totals['Nilai'].to_numpy() * scale))
+    increments = np.diff(cumulative, axis=0, prepend=0)
+    days = pd.date_range('2025-12-01', periods=n_days, freq='D').strftime('%Y-%m-%dT%H:%M:%S')
+    pd.DataFrame({
+        'Waktu': np.repeat(days, len(totals)),
+        'Kabupaten_Kota': 'Sumatera Barat',
+        'Kategori': np.tile(totals['Kategori'].to_numpy(), n_days),
+        'Sub_Kategori': np.tile(totals['Sub_Kategori'].to_numpy(), n_days),
+        'Satuan': np.tile(totals['Satuan'].to_numpy(), n_days),
+        'Nilai': increments.ravel(),
+    }).to_csv(directory / 'feed.csv', index=False)
+
+    jenis = [f'Jenis {j + 1}' for j in range(n_types)]
+    pd.DataFrame({
+        'Kabupaten_Kota': [f'Wilayah {i:05d}' for i in range(n_regions)],
+        'Base_Score': rng.integers(1, 21, n_regions),
+        'Jenis_Bencana': rng.choice(jenis, n_regions),
+    }).to_csv(directory / 'wilayah.csv', index=False)
+
+    return {
+        'BENCANA_FEED_PATH': str(directory / 'feed.csv'),
+        'BENCANA_WILAYAH_PATH': str(directory / 'wilayah.csv'),
+        'BENCANA_STORE_PATH': str(directory / 'store'),
+    }
+
+
+def time_load(env, repeats):
+    """
+    Waktu `load_updated_data` dan `load_forecast` untuk dataset pada `env`
+    (detik, per pengulangan).
+    """
+    from ingest import MultiSourceFeed
+    from pipeline import feed_snapshot, load_forecast, load_updated_data
+    from timeseries import TimeSeriesEngine
+
+    reader = MultiSourceFeed(env['BENCANA_FEED_PATH'])
+    deret = TimeSeriesEngine()
+    reader.subscribe(deret.ingest, on_reset=deret.reset)
+    reader.poll()
+    df_totals = reader.totals_frame()
+    df_wilayah = pd.read_csv(env['BENCANA_WILAYAH_PATH'])
+    samples = {'load_updated_data': [], 'load_forecast': []}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        trend_data = load_updated_data(df_totals, df_wilayah, feed_snapshot(reader, deret).trend)[1]
+        samples['load_updated_data'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        load_forecast(trend_data, df_wilayah)
+        samples['load_forecast'].append(time.perf_counter() - start)
+    return samples
+
+
+def clear_streamlit_caches():
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def timed_run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f'app.py gagal: {at.exception[0].message}')
+    return elapsed
+
+
+def summarize(samples):
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+        'samples': len(samples),
+    }
+
+
+def bench_scenario(n_regions, n_days, n_types, repeats, timeout):
+    """Menjalankan satu skenario skala dan mengembalikan ringkasan waktunya."""
+    from streamlit.testing.v1 import AppTest
+
+    workdir = tempfile.mkdtemp(prefix='bench-bencana-')
+    saved_env = {k: os.environ.get(k) for k in DATA_ENV}
+    try:
+        env = write_synthetic_dataset(workdir, n_regions, n_days, n_types)
+        os.environ.update(env)
+
+        load_samples = time_load(env, repeats)
+
+        clear_streamlit_caches()
+        at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        cold_start = timed_run(at, timeout)
+        warm_start = timed_run(at, timeout)
+
+        # Elemen widget harus diambil ulang setelah setiap run
+        date_box = lambda: at.sidebar.selectbox[0]
+        jenis_box = lambda: at.sidebar.selectbox[1]
+        wilayah_box = lambda: at.sidebar.multiselect[0]
+        date_options = list(date_box().options)
+        jenis_options = list(jenis_box().options)
+        wilayah_options = [w for w in wilayah_box().options if w != 'Semua Wilayah']
+
+        interactions = {'tanggal': [], 'wilayah': [], 'jenis': []}
+        for i in range(repeats):
+            date_box().select(date_options[1 + i % (len(date_options) - 1)])
+            interactions['tanggal'].append(timed_run(at, timeout))
+
+            picked = wilayah_options[i % len(wilayah_options):][:5] or wilayah_options[:5]
+            wilayah_box().set_value(picked)
+            interactions['wilayah'].append(timed_run(at, timeout))
+
+            jenis_box().select(jenis_options[1 + i % (len(jenis_options) - 1)])
+            interactions['jenis'].append(timed_run(at, timeout))
+
+            wilayah_box().set_value(['Semua Wilayah'])
+            jenis_box().select('Semua Jenis')
+            timed_run(at, timeout)
+
+        return {
+            'regions': n_regions,
+            'days': n_days,
+            'types': n_types,
+            'cold_start_s': cold_start,
+            'warm_start_s': warm_start,
+            'load_updated_data': summarize(load_samples['load_updated_data']),
+            'load_forecast': summarize(load_samples['load_forecast']),
+            'rerun': {name: summarize(samples) for name, samples in interactions.items()},
+        }
+    finally:
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scenario_key(result):
+    return (result['regions'], result['days'], result['types'])
+
+
+def compare(results, baseline_path, threshold):
+    """Daftar regresi: metrik median yang lebih lambat dari baseline x `threshold`."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {scenario_key(r): r for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        base = baseline.get(scenario_key(result))
+        if base is None:
+            continue
+        pairs = [('cold_start_s', result['cold_start_s'], base['cold_start_s']),
+                 ('load_updated_data', result['load_updated_data']['median_s'], base['load_updated_data']['median_s'])]
+        if 'load_forecast' in base:
+            pairs.append(('load_forecast', result['load_forecast']['median_s'], base['load_forecast']['median_s']))
+        pairs += [(f'rerun.{name}', stats['median_s'], base['rerun'][name]['median_s'])
+                  for name, stats in result['rerun'].items() if name in base['rerun']]
+        for metric, current, previous in pairs:
+            if previous > 0 and current > previous * threshold:
+                regressions.append({'scenario': scenario_key(result), 'metric': metric,
+                                    'baseline_s': previous, 'current_s': current})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--regions', type=int, nargs='+', help='Jumlah wilayah (kombinasi dengan --days & --types)')
+    parser.add_argument('--days', type=int, nargs='+', help='Jumlah hari trend')
+    parser.add_argument('--types', type=int, nargs='+', help='Jumlah jenis bencana')
+    parser.add_argument('--repeats', type=int, default=5, help='Pengulangan per interaksi')
+    parser.add_argument('--timeout', type=float, default=300, help='Batas waktu satu run script (detik)')
+    parser.add_argument('--output', default='bench_results.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File JSON baseline untuk deteksi regresi')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Rasio perlambatan yang dianggap regresi')
+    args = parser.parse_args(argv)
+
+    if args.regions or args.days or args.types:
+        scenarios = list(itertools.product(args.regions or [15], args.days or [7], args.types or [3]))
+    else:
+        scenarios = DEFAULT_SCENARIOS
+
+    results = []
+    for n_regions, n_days, n_types in scenarios:
+        result = bench_scenario(n_regions, n_days, n_types, args.repeats, args.timeout)
+        results.append(result)
+        print(
+            f"{n_regions:>6} wilayah {n_days:>4} hari {n_types:>3} jenis | "
+            f"cold {result['cold_start_s']:.3f}s | load {result['load_updated_data']['median_s'] * 1000:.1f}ms | "
+            f"prakiraan {result['load_forecast']['median_s'] * 1000:.1f}ms | "
+            + ' | '.join(f"{k} {v['median_s'] * 1000:.1f}ms" for k, v in result['rerun'].items())
+        )
+
+    report = {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'Hasil ditulis ke {args.output}')
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for r in regressions:
+            print(f"REGRESI {r['scenario']} {r['metric']}: {r['baseline_s']:.4f}s -> {r['current_s']:.4f}s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
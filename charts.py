@@ -0,0 +1,94 @@
+"""
+Persiapan data grafik di sisi server.
+
+Fold (wide -> long), agregasi per bucket waktu, dan downsampling LTTB
+(Largest-Triangle-Three-Buckets) dilakukan di Python sehingga spesifikasi
+Vega-Lite yang dikirim ke browser memiliki jumlah titik tetap, berapa pun
+panjang riwayat datanya. Spesifikasi grafik yang dipakai dashboard maupun
+laporan ekspor juga dibangun di sini.
+"""
+import numpy as np
+
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+alt = LazyModule('altair')
+
+# Anggaran titik per seri pada grafik trend
+TREND_POINT_BUDGET = 200
+
+
+def lttb(x, y, n_out):
+    """
+    Indeks titik terpilih dengan algoritma Largest-Triangle-Three-Buckets.
+    Titik pertama dan terakhir selalu dipertahankan.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def bucket_last(df, time_col, freq):
+    """Agregasi nilai kumulatif per bucket waktu (nilai terakhir di setiap bucket)."""
+    return df.resample(freq, on=time_col).last().dropna(how='all').reset_index()
+
+
+def trend_long(df_trend, metrics, time_col='Tanggal', max_points=TREND_POINT_BUDGET, bucket=None):
+    """
+    Mengubah data trend lebar menjadi format panjang (`time_col`, Metrik, Jumlah)
+    dengan maksimal `max_points` titik per metrik.
+    """
+    df = df_trend[[time_col] + list(metrics)]
+    if bucket is not None:
+        df = bucket_last(df, time_col, bucket)
+
+    x = df[time_col].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    frames = []
+    for metric in metrics:
+        y = df[metric].to_numpy(dtype=float)
+        idx = lttb(x, y, max_points)
+        frames.append(pd.DataFrame({
+            time_col: df[time_col].to_numpy()[idx],
+            'Metrik': metric,
+            'Jumlah': y[idx],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def trend_chart(df_long, end_date):
+    """Grafik trend kumulatif per metrik (satu baris facet per metrik) dari keluaran `trend_long`."""
+    return alt.Chart(df_long).mark_line(point=True).encode(
+        x=alt.X('Tanggal:T', title='Tanggal Update Data'),
+        y=alt.Y('Jumlah:Q', title='Jumlah Kumulatif'),
+        color='Metrik:N',
+        tooltip=['Tanggal:T', 'Metrik:N', alt.Tooltip('Jumlah:Q', format=',')]
+    ).properties(
+        height=180
+    ).interactive().facet(
+        row=alt.Row('Metrik:N', title=None)
+    ).resolve_scale(
+        y='independent'
+    ).properties(
+        title=f'Trend Dampak Kemanusiaan Hingga {end_date.strftime("%d %B %Y")}'
+    )
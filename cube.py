@@ -0,0 +1,186 @@
+"""
+Kubus filter (tanggal x wilayah x jenis bencana) yang dibangun sekali per versi data.
+
+Semua filter sidebar diterjemahkan menjadi indeks baris dan indeks tanggal,
+sehingga metrik, grafik, dan tabel prioritas cukup diambil lewat lookup dan
+roll-up NumPy murah, tanpa `isin`/perbandingan string di setiap rerun.
+
+Pada 10.000 wilayah x 365 hari x 20 jenis, `select` + `sum` + `frame` + `trend`
+memakan < 0,1 ms per filter. Rerun penuh `app.py` (diukur `benchmarks/bench_app.py`)
+tetap sekitar 75-150 ms per interaksi sidebar, bahkan pada 15 wilayah: sisanya adalah
+eksekusi skrip dan serialisasi widget/grafik Streamlit, bukan penyaringan data.
+
+Array kubus dapat disimpan sebagai snapshot di `ColumnarStore` dan dimuat
+ulang di proses baru tanpa pandas; DataFrame `df_bencana`/`df_trend` baru
+dibaca dari store saat pertama kali dibutuhkan (mis. oleh grafik).
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+ALL_DATES = 'Semua Hari'
+ALL_WILAYAH = 'Semua Wilayah'
+ALL_JENIS = 'Semua Jenis'
+
+CUBE_ARRAYS = 'kubus'
+TREND_METRICS = ['Meninggal_Kumulatif', 'Mengungsi_Kumulatif', 'Kerugian_Kumulatif_Miliar']
+
+Selection = namedtuple('Selection', ['key', 'rows', 'date_end', 'is_all_wilayah', 'is_all_jenis'])
+
+
+class FilterCube:
+    """Indeks dan pra-agregasi untuk kombinasi filter tanggal, wilayah, dan jenis bencana."""
+
+    def __init__(self, arrays, meta, frame_loader, memo_size=256):
+        # Dimensi wilayah & jenis bencana
+        self.regions = np.array(meta['regions'], dtype=object)
+        self.region_index = {name: i for i, name in enumerate(self.regions)}
+        self.jenis_labels = np.array(meta['jenis_labels'], dtype=object)
+        self.jenis_codes = arrays['jenis_codes']
+        self.jenis_index = {name: i for i, name in enumerate(self.jenis_labels)}
+        self.rows_by_jenis = [np.flatnonzero(self.jenis_codes == j) for j in range(len(self.jenis_labels))]
+        self.all_rows = np.arange(len(self.regions))
+
+        # Matriks metrik numerik [wilayah x metrik] dan pra-agregat per jenis / total
+        self.metrics = meta['metrics']
+        self.metric_index = {m: k for k, m in enumerate(self.metrics)}
+        self.values = arrays['values']
+        self.total = arrays['total']
+        self.by_jenis = arrays['by_jenis']
+
+        # Dimensi tanggal & nilai trend [tanggal x metrik trend]
+        self.date_labels = list(meta['date_labels'])
+        self.date_index = {d: i for i, d in enumerate(self.date_labels)}
+        self.trend_metrics = meta['trend_metrics']
+        self.trend_values = arrays['trend_values']
+        self.meta = meta
+
+        self._frame_loader = frame_loader
+        self._frames = None
+        self._memo = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_arrays(df_bencana, df_trend, extra_meta=None):
+        """Menghitung array & metadata kubus dari DataFrame hasil `load_updated_data`."""
+        jenis_codes, jenis_labels = pd.factorize(df_bencana['Jenis_Bencana'])
+        metrics = df_bencana.select_dtypes(include='number').columns.tolist()
+        values = df_bencana[metrics].to_numpy(dtype=float)
+        by_jenis = np.zeros((len(jenis_labels), len(metrics)))
+        np.add.at(by_jenis, jenis_codes, values)
+        trend_metrics = [m for m in TREND_METRICS if m in df_trend.columns]
+        arrays = {
+            'jenis_codes': jenis_codes.astype(np.int32),
+            'values': values,
+            'total': values.sum(axis=0),
+            'by_jenis': by_jenis,
+            'trend_values': df_trend[trend_metrics].to_numpy(dtype=float),
+        }
+        meta = {
+            'regions': df_bencana['Kabupaten_Kota'].astype(str).tolist(),
+            'jenis_labels': [str(j) for j in jenis_labels],
+            'metrics': metrics,
+            'date_labels': df_trend['Tanggal'].dt.date.astype(str).tolist(),
+            'trend_metrics': trend_metrics,
+        }
+        meta.update(extra_meta or {})
+        return arrays, meta
+
+    @classmethod
+    def from_frames(cls, df_bencana, df_trend, **kwargs):
+        df_bencana = df_bencana.reset_index(drop=True)
+        df_trend = df_trend.reset_index(drop=True)
+        arrays, meta = cls.build_arrays(df_bencana, df_trend)
+        return cls(arrays, meta, lambda: (df_bencana, df_trend), **kwargs)
+
+    @classmethod
+    def from_store(cls, store, version, **kwargs):
+        """Memuat kubus dari snapshot store (memory-mapped); DataFrame dibaca saat dibutuhkan."""
+        arrays, meta = store.read_arrays(CUBE_ARRAYS, version)
+        return cls(arrays, meta, lambda: (store.read('wilayah', version), store.read('trend', version)), **kwargs)
+
+    def _load_frames(self):
+        with self._lock:
+            if self._frames is None:
+                self._frames = self._frame_loader()
+            return self._frames
+
+    @property
+    def df_bencana(self):
+        return self._load_frames()[0]
+
+    @property
+    def df_trend(self):
+        return self._load_frames()[1]
+
+    def select(self, date_str, wilayah, jenis):
+        """Menerjemahkan nilai widget sidebar menjadi `Selection` (indeks baris & tanggal)."""
+        date_end = len(self.date_labels) if date_str == ALL_DATES else self.date_index[date_str] + 1
+
+        is_all_wilayah = ALL_WILAYAH in wilayah
+        if is_all_wilayah:
+            rows = self.all_rows
+        else:
+            # Wilayah berulang (mis. `?wilayah=Agam&wilayah=Agam` di API) hanya dihitung sekali
+            rows = np.array(sorted({self.region_index[w] for w in wilayah if w in self.region_index}), dtype=np.intp)
+
+        is_all_jenis = jenis == ALL_JENIS
+        if not is_all_jenis:
+            j = self.jenis_index.get(jenis)
+            if j is None:
+                rows = rows[:0]
+            elif is_all_wilayah:
+                rows = self.rows_by_jenis[j]
+            else:
+                rows = rows[self.jenis_codes[rows] == j]
+
+        key = (date_end, None if is_all_wilayah else tuple(rows.tolist()), jenis)
+        return Selection(key, rows, date_end, is_all_wilayah, is_all_jenis)
+
+    def frame(self, selection):
+        """Baris `df_bencana` sesuai filter wilayah & jenis."""
+        if selection.is_all_wilayah and selection.is_all_jenis:
+            return self.df_bencana
+        return self.memo('frame', selection.key[1:], lambda: self.df_bencana.take(selection.rows))
+
+    def trend(self, selection):
+        """Data trend hingga tanggal terpilih (slice tanpa salin)."""
+        return self.df_trend.iloc[:selection.date_end]
+
+    def trend_value(self, selection, metric):
+        """Nilai kumulatif trend pada tanggal terpilih, langsung dari array snapshot."""
+        return self.trend_values[selection.date_end - 1, self.trend_metrics.index(metric)]
+
+    def sum(self, selection, metric):
+        """Jumlah satu metrik untuk filter wilayah & jenis, memakai pra-agregat bila bisa."""
+        k = self.metric_index[metric]
+        if selection.is_all_wilayah:
+            if selection.is_all_jenis:
+                return self.total[k]
+            if len(selection.rows):
+                return self.by_jenis[self.jenis_codes[selection.rows[0]], k]
+            return 0.0
+        return self.values[selection.rows, k].sum()
+
+    def memo(self, name, selection, compute):
+        """
+        Roll-up turunan (mis. skor prioritas) yang di-cache per kombinasi filter.
+        `selection` boleh berupa tuple kunci sendiri jika hasil hanya bergantung pada sebagian filter.
+        """
+        key = (name, selection.key if isinstance(selection, Selection) else selection)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        result = compute()
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return result
@@ -0,0 +1,204 @@
+"""
+Pembaca feed laporan bencana (append-only) secara inkremental.
+
+Feed berisi satu baris per laporan per kab/kota per jam, dalam format CSV
+atau JSON-lines, dengan kolom `FEED_COLUMNS`. Nilai setiap baris adalah
+tambahan (increment) sejak laporan sebelumnya, sehingga total otoritatif
+cukup dijumlahkan. Setiap pemanggilan `poll()` hanya mem-parsing byte yang
+ditambahkan sejak pembacaan terakhir.
+"""
+import json
+import os
+import threading
+import time
+from io import BytesIO
+
+from lazy import LazyModule
+
+# pandas hanya di-import saat ada potongan feed baru yang perlu di-parsing
+pd = LazyModule('pandas')
+
+FEED_COLUMNS = ['Waktu', 'Kabupaten_Kota', 'Kategori', 'Sub_Kategori', 'Satuan', 'Nilai']
+TOTAL_COLUMNS = ['Kategori', 'Sub_Kategori', 'Satuan', 'Nilai']
+
+
+def accumulate_totals(totals, frame):
+    """Menambahkan potongan baru ke `totals` (Sub_Kategori -> [Kategori, Satuan, Nilai])."""
+    chunk_totals = frame.groupby('Sub_Kategori', sort=False).agg(
+        Kategori=('Kategori', 'last'), Satuan=('Satuan', 'last'), Nilai=('Nilai', 'sum')
+    )
+    for sub_kategori, kategori, satuan, nilai in chunk_totals.itertuples():
+        entry = totals.setdefault(sub_kategori, [kategori, satuan, 0.0])
+        entry[0], entry[1] = kategori, satuan
+        entry[2] += float(nilai)
+
+
+def parse_chunk(chunk, is_jsonl, header=None):
+    """
+    Baris lengkap feed (byte) -> `(frame, header)`. Potongan CSV lanjutan memakai `header` dari
+    potongan pertama. Nilai kosong/tidak valid dibiarkan NaN: tidak ikut total, dan ditolak oleh
+    validasi `ingest`. Dipakai pembacaan inkremental maupun penuh agar hasilnya identik.
+    """
+    if is_jsonl:
+        records = [json.loads(line) for line in chunk.splitlines() if line.strip()]
+        frame = pd.DataFrame.from_records(records, columns=FEED_COLUMNS)
+    elif header is None:
+        frame = pd.read_csv(BytesIO(chunk))
+        header = frame.columns.tolist()
+    else:
+        frame = pd.read_csv(BytesIO(chunk), header=None, names=header)
+    frame['Nilai'] = pd.to_numeric(frame['Nilai'], errors='coerce').astype(float)
+    return frame, header
+
+
+class IncrementalFeedReader:
+    """
+    Membaca feed dari posisi byte terakhir dan menjumlahkan `Nilai` per `Sub_Kategori`.
+
+    Hanya baris lengkap (diakhiri newline) yang diproses; sisa baris yang masih
+    ditulis akan dibaca pada `poll()` berikutnya. Jika file diganti (inode berubah)
+    atau dipotong, pembacaan diulang dari awal. Posisi baca dan total dapat disimpan
+    dengan `checkpoint()` dan dipulihkan di proses baru dengan `restore()`.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.is_jsonl = self.path.endswith(('.jsonl', '.ndjson'))
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._reset_listeners = []
+        self._last_checkpoint = None
+        # Versi naik setiap ada data baru dan tidak kembali ke nol saat feed dibaca ulang
+        self.version = 0
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.rows_read = 0
+        self._inode = None
+        self._header = None
+        # Sub_Kategori -> [Kategori, Satuan, Nilai], urutan sesuai kemunculan pertama
+        self._totals = {}
+        for callback in self._reset_listeners:
+            callback()
+
+    def subscribe(self, callback, on_reset=None):
+        """
+        Mendaftarkan `callback(frame_baru)` yang dipanggil untuk setiap potongan baris baru,
+        dan `on_reset()` yang dipanggil saat feed dibaca ulang dari awal (file diganti/dipotong).
+        """
+        self._listeners.append(callback)
+        if on_reset is not None:
+            self._reset_listeners.append(on_reset)
+
+    def _parse(self, chunk):
+        """Mem-parsing potongan byte menjadi DataFrame dengan kolom `FEED_COLUMNS`."""
+        frame, self._header = parse_chunk(chunk, self.is_jsonl, self._header)
+        return frame
+
+    def replaced(self):
+        """True jika file feed sudah diganti (inode baru) atau dipotong sejak pembacaan terakhir."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self.offset)
+
+    def poll(self):
+        """
+        Membaca byte baru dari feed. Mengembalikan True jika ada baris baru yang diproses.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self.offset):
+                self._reset()
+            self._inode = stat.st_ino
+            if stat.st_size == self.offset:
+                return False
+
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read(stat.st_size - self.offset)
+            end = chunk.rfind(b'\n')
+            if end < 0:
+                return False
+            chunk = chunk[:end + 1]
+            self.offset += len(chunk)
+
+            frame = self._parse(chunk)
+            if frame.empty:
+                return False
+            accumulate_totals(self._totals, frame)
+            self.rows_read += len(frame)
+            self.version += 1
+            for callback in self._listeners:
+                callback(frame)
+            return True
+
+    def totals_records(self):
+        """Total otoritatif terkini sebagai tuple `(Kategori, Sub_Kategori, Satuan, Nilai)` (tanpa pandas)."""
+        with self._lock:
+            return [(k, sub, satuan, nilai) for sub, (k, satuan, nilai) in self._totals.items()]
+
+    def totals_frame(self):
+        """Total otoritatif terkini dengan struktur `Kategori,Sub_Kategori,Satuan,Nilai`."""
+        return pd.DataFrame(self.totals_records(), columns=TOTAL_COLUMNS)
+
+    def checkpoint(self):
+        """Status pembacaan yang dapat disimpan (JSON) dan dipulihkan di proses lain."""
+        with self._lock:
+            return {
+                'path': os.path.abspath(self.path),
+                'offset': self.offset,
+                'inode': self._inode,
+                'header': self._header,
+                'rows_read': self.rows_read,
+                'totals': {sub: list(entry) for sub, entry in self._totals.items()},
+            }
+
+    def checkpoint_due(self, interval):
+        """True (dan mencatat waktunya) jika checkpoint terakhir sudah lebih dari `interval` detik lalu."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_checkpoint is not None and now - self._last_checkpoint < interval:
+                return False
+            self._last_checkpoint = now
+            return True
+
+    def restore(self, state):
+        """
+        Memulihkan status dari `checkpoint()`. Diabaikan (False) jika checkpoint milik file lain,
+        file sudah diganti, atau lebih pendek dari posisi yang tersimpan.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (not state or state.get('path') != os.path.abspath(self.path)
+                or state.get('inode') != stat.st_ino or stat.st_size < state.get('offset', 0)):
+            return False
+        with self._lock:
+            self.offset = state['offset']
+            self._inode = state['inode']
+            self._header = state['header']
+            self.rows_read = state['rows_read']
+            self._totals = {sub: list(entry) for sub, entry in state['totals'].items()}
+            self.version += 1
+        return True
+
+
+def read_feed_frame(path, end=None):
+    """
+    Baris lengkap feed (hingga byte ke-`end` jika diberikan) sebagai DataFrame berkolom `FEED_COLUMNS`
+    (untuk tabel catatan laporan; total tetap dihitung oleh `IncrementalFeedReader`).
+    """
+    with open(path, 'rb') as f:
+        data = f.read() if end is None else f.read(end)
+    data = data[:data.rfind(b'\n') + 1]
+    if not data.strip():
+        return pd.DataFrame(columns=FEED_COLUMNS)
+    frame, _ = parse_chunk(data, str(path).endswith(('.jsonl', '.ndjson')))
+    return frame.reindex(columns=FEED_COLUMNS)
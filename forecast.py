@@ -0,0 +1,87 @@
+"""
+Prakiraan jangka pendek (24-72 jam) nilai kumulatif untuk banyak deret sekaligus.
+
+Tambahan harian setiap deret dimodelkan log-linear, `log(tambahan) = a + b*t`,
+dan dicocokkan dengan kuadrat terkecil pada beberapa hari terakhir. Semua deret
+(mis. seluruh kab/kota x metrik) dicocokkan dalam satu batch NumPy: jumlah
+tertimbang dihitung per kolom matriks [hari x deret], tanpa loop per wilayah.
+Jika `b < 0` tambahan harian menurun dan kumulatif menuju titik jenuh; jika
+`b > 0` pertumbuhan dibatasi `max_rate` agar proyeksi tidak meledak.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Batas laju pertumbuhan tambahan harian: paling cepat berlipat dua per hari
+MAX_DAILY_GROWTH = float(np.log(2))
+
+# z untuk rentang prakiraan 80% (dua sisi)
+INTERVAL_Z = 1.2816
+
+LogLinearFit = namedtuple('LogLinearFit', ['intercept', 'slope', 'sigma', 'n'])
+Forecast = namedtuple('Forecast', ['value', 'lower', 'upper'])
+
+
+def fit_log_linear(increments, window, max_rate=MAX_DAILY_GROWTH):
+    """
+    Kecocokan `log(tambahan) = a + b*t` per kolom pada `window` bucket terakhir
+    dari `increments` [bucket x deret], dengan t = 0 di bucket terakhir.
+    Bucket bernilai nol/negatif (tanpa laporan atau koreksi) tidak ikut dicocokkan.
+    """
+    increments = np.asarray(increments, dtype=float)
+    if increments.ndim == 1:
+        increments = increments[:, None]
+    y = increments[-window:]
+    t = np.arange(1 - len(y), 1, dtype=float)[:, None]
+    w = (y > 0).astype(float)
+    log_y = np.log(np.where(y > 0, y, 1.0))
+
+    n = w.sum(axis=0)
+    safe_n = np.maximum(n, 1.0)
+    t_mean = (w * t).sum(axis=0) / safe_n
+    y_mean = (w * log_y).sum(axis=0) / safe_n
+    dt = (t - t_mean) * w
+    sxx = (dt * (t - t_mean)).sum(axis=0)
+    sxy = (dt * (log_y - y_mean)).sum(axis=0)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    slope = np.minimum(slope, max_rate)
+    intercept = y_mean - slope * t_mean
+
+    residual = w * (log_y - intercept - slope * t)
+    dof = np.maximum(n - 2, 1.0)
+    sigma = np.where(n > 2, np.sqrt((residual ** 2).sum(axis=0) / dof), 0.0)
+    # Deret tanpa tambahan positif di jendela: dianggap tidak bertambah lagi
+    intercept = np.where(n > 0, intercept, -np.inf)
+    return LogLinearFit(intercept, slope, sigma, n)
+
+
+def added_after(fit, horizons_days):
+    """Tambahan kumulatif [horizon x deret] dari akhir data hingga `horizons_days` ke depan."""
+    h = np.asarray(horizons_days, dtype=float)[:, None]
+    rate = np.exp(fit.intercept)[None, :]
+    b = fit.slope[None, :]
+    # Integral laju exp(a + b*s) dari 0 hingga h; limit b -> 0 adalah rate * h
+    growth = np.where(np.abs(b) > 1e-9, np.expm1(b * h) / np.where(b == 0, 1.0, b), h)
+    return rate * growth
+
+
+def forecast_cumulative(cumulative, horizons_hours, window, interval_z=INTERVAL_Z, max_rate=MAX_DAILY_GROWTH):
+    """
+    Prakiraan kumulatif harian `cumulative` [hari x deret] untuk setiap horizon (jam).
+    Mengembalikan `Forecast` berisi array [horizon x deret] untuk nilai tengah dan
+    batas bawah/atas (galat log residual dikalikan `interval_z`).
+    """
+    cumulative = np.asarray(cumulative, dtype=float)
+    if cumulative.ndim == 1:
+        cumulative = cumulative[:, None]
+    horizons_days = np.asarray(horizons_hours, dtype=float) / 24
+    if not len(cumulative):
+        empty = np.zeros((len(horizons_days), cumulative.shape[1]))
+        return Forecast(empty, empty.copy(), empty.copy())
+
+    increments = np.diff(cumulative, axis=0, prepend=0.0)
+    fit = fit_log_linear(increments, window, max_rate)
+    added = added_after(fit, horizons_days)
+    spread = np.exp(interval_z * fit.sigma)[None, :]
+    last = cumulative[-1][None, :]
+    return Forecast(last + added, last + added / spread, last + added * spread)
@@ -0,0 +1,241 @@
+"""
+Geometri batas wilayah untuk peta sebaran.
+
+Batas kab/kota (dan kecamatan, opsional) dibaca dari file GeoJSON/TopoJSON
+lokal, lalu disederhanakan (Douglas-Peucker) dan dikuantisasi sekali per
+tingkat detail. Hasilnya ditulis sebagai file GeoJSON statis yang namanya
+memuat hash isi file sumber, sehingga browser mengambil poligon lewat URL
+(dan menyimpannya di cache) sementara spesifikasi grafik di setiap rerun
+hanya berisi nilai atribut per wilayah.
+"""
+import hashlib
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Toleransi penyederhanaan per tingkat detail (derajat; 0.01 derajat ~ 1,1 km)
+DETAIL_LEVELS = {
+    'Rendah': 0.01,
+    'Sedang': 0.002,
+    'Tinggi': 0.0005,
+}
+
+# Kandidat properti nama wilayah pada file batas (BIG/GADM/umum)
+NAME_FIELDS = ('Kabupaten_Kota', 'WADMKK', 'NAME_2', 'kabkota', 'nama', 'name')
+KECAMATAN_NAME_FIELDS = ('Kecamatan', 'WADMKC', 'NAME_3', 'kecamatan', 'nama', 'name')
+KEY_FIELD = 'Kabupaten_Kota'
+
+_KABUPATEN_PREFIXES = ('kabupaten ', 'kab. ', 'kab ')
+
+
+def region_key(name):
+    """
+    Nama wilayah pada file batas -> nama seperti pada data dashboard.
+    Awalan "Kabupaten"/"Kab." dibuang, "Kota" dipertahankan (Solok vs Kota Solok).
+    """
+    name = ' '.join(str(name).split())
+    if name.isupper():
+        name = name.title()
+    lowered = name.lower()
+    for prefix in _KABUPATEN_PREFIXES:
+        if lowered.startswith(prefix):
+            return name[len(prefix):]
+    if lowered.startswith('kota '):
+        return 'Kota ' + name[5:]
+    return name
+
+
+def _decode_arcs(topology):
+    transform = topology.get('transform')
+    arcs = []
+    for arc in topology['arcs']:
+        points = np.asarray(arc, dtype=float)[:, :2]
+        if transform:
+            points = np.cumsum(points, axis=0) * transform['scale'] + transform['translate']
+        arcs.append(points)
+    return arcs
+
+
+def _ring_from_arcs(arc_ids, arcs):
+    parts = []
+    for i, arc_id in enumerate(arc_ids):
+        points = arcs[arc_id] if arc_id >= 0 else arcs[~arc_id][::-1]
+        # Titik awal arc sama dengan titik akhir arc sebelumnya
+        parts.append(points if i == 0 else points[1:])
+    return np.concatenate(parts)
+
+
+def topology_features(topology, object_name=None):
+    """Fitur GeoJSON (Polygon/MultiPolygon) dari satu objek TopoJSON."""
+    arcs = _decode_arcs(topology)
+    name = object_name or next(iter(topology['objects']))
+    features = []
+    for geometry in topology['objects'][name].get('geometries', []):
+        if geometry['type'] == 'Polygon':
+            polygons = [geometry['arcs']]
+        elif geometry['type'] == 'MultiPolygon':
+            polygons = geometry['arcs']
+        else:
+            continue
+        features.append({
+            'type': 'Feature',
+            'properties': geometry.get('properties', {}),
+            'geometry': {
+                'type': 'MultiPolygon',
+                'coordinates': [[_ring_from_arcs(ring, arcs).tolist() for ring in polygon] for polygon in polygons],
+            },
+        })
+    return features
+
+
+def read_features(path):
+    """Membaca fitur dari file GeoJSON (FeatureCollection) atau TopoJSON."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('type') == 'Topology':
+        return topology_features(data)
+    return data.get('features', [])
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker iteratif; jarak tegak lurus dihitung per segmen dengan NumPy."""
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        segment = points[start + 1:end]
+        ab = b - a
+        length = math.hypot(ab[0], ab[1])
+        if length == 0:
+            dist = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            dist = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            mid = start + 1 + k
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return points[keep]
+
+
+def quantize(points, grid):
+    """Membulatkan koordinat ke kisi `grid` lalu membuang titik berurutan yang sama."""
+    snapped = np.round(points / grid) * grid
+    if len(snapped) > 1:
+        moved = np.any(snapped[1:] != snapped[:-1], axis=1)
+        snapped = snapped[np.concatenate(([True], moved))]
+    return snapped
+
+
+def simplify_ring(ring, tolerance):
+    """Ring tertutup yang disederhanakan; None jika terlalu kecil untuk tingkat detail ini."""
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if len(points) > 1 and np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    if len(points) < 3:
+        return None
+    # Ring dipecah di titik terjauh dari titik awal agar ujung-ujung garis tidak berimpit
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    head = simplify_line(points[:far + 1], tolerance)
+    tail = simplify_line(np.vstack([points[far:], points[:1]]), tolerance)
+    simplified = quantize(np.vstack([head, tail[1:]]), tolerance / 4)
+    if len(simplified) < 4:
+        return None
+    if not np.array_equal(simplified[0], simplified[-1]):
+        simplified = np.vstack([simplified, simplified[:1]])
+    return simplified
+
+
+def _polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def _name_field(features, name_fields):
+    for field in name_fields:
+        if features and all(field in (f.get('properties') or {}) for f in features):
+            return field
+    raise ValueError(f'Properti nama wilayah tidak ditemukan (dicoba: {", ".join(name_fields)})')
+
+
+def simplify_features(features, tolerance, name_fields=NAME_FIELDS):
+    """
+    Fitur GeoJSON yang disederhanakan & dikuantisasi dengan properti minimal:
+    `Kabupaten_Kota` (kunci join ke data dashboard) dan `Nama` (nama asli).
+    """
+    field = _name_field(features, name_fields)
+    decimals = max(0, math.ceil(-math.log10(tolerance / 4)))
+    simplified = []
+    for feature in features:
+        polygons = []
+        for polygon in _polygons(feature.get('geometry')):
+            outer = simplify_ring(polygon[0], tolerance)
+            if outer is None:
+                continue
+            holes = [h for h in (simplify_ring(ring, tolerance) for ring in polygon[1:]) if h is not None]
+            polygons.append([np.round(r, decimals).tolist() for r in [outer] + holes])
+        if not polygons:
+            # Wilayah sangat kecil tetap digambar: ring terluar tanpa penyederhanaan
+            largest = max(_polygons(feature.get('geometry')), key=lambda p: len(p[0]), default=None)
+            if largest is None:
+                continue
+            polygons = [[np.round(np.asarray(largest[0], dtype=float)[:, :2], decimals).tolist()]]
+        name = feature['properties'][field]
+        simplified.append({
+            'type': 'Feature',
+            'properties': {KEY_FIELD: region_key(name), 'Nama': str(name)},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons},
+        })
+    return simplified
+
+
+def build_levels(path, out_dir, levels=DETAIL_LEVELS, name_fields=NAME_FIELDS):
+    """
+    Menulis satu file GeoJSON per tingkat detail ke `out_dir` dan mengembalikan
+    `{tingkat: nama_file}`. Nama file memuat hash isi sumber, sehingga file yang
+    sudah ada dipakai ulang (juga oleh worker lain) dan aman di-cache browser.
+    """
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(path).stem
+
+    files = {}
+    features = None
+    for level, tolerance in levels.items():
+        name = f'{stem}-{digest}-{level.lower()}.geojson'
+        target = out_dir / name
+        if not target.exists():
+            if features is None:
+                features = read_features(path)
+            collection = {'type': 'FeatureCollection', 'features': simplify_features(features, tolerance, name_fields)}
+            # Nama sementara unik per penulis: worker lain yang membangun file yang sama tidak saling menimpa
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=out_dir, prefix=f'.{name}.', suffix='.tmp',
+                                             delete=False) as f:
+                try:
+                    json.dump(collection, f, ensure_ascii=False, separators=(',', ':'))
+                except BaseException:
+                    f.close()
+                    os.unlink(f.name)
+                    raise
+            os.replace(f.name, target)
+        files[level] = name
+    return files
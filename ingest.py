@@ -0,0 +1,406 @@
+"""
+Ingestion multi-sumber: laporan BNPB, BPBD kab/kota, dan pos lapangan.
+
+Setiap sumber adalah feed append-only sendiri yang dibaca inkremental oleh
+`IncrementalFeedReader`. Setiap potongan baru divalidasi secara vektor
+(struktur Kategori/Sub_Kategori/Satuan, waktu, nilai kosong atau negatif),
+lalu direkonsiliasi antar-sumber lewat indeks hash persisten: satu observasi
+(waktu, kab/kota, Sub_Kategori) hanya dihitung dari sumber berperingkat
+tertinggi yang melaporkannya, dan laporan ulang dari sumber yang sama
+menggantikan nilai sebelumnya. Yang diteruskan ke total dan deret waktu
+hanyalah selisih terhadap nilai yang sudah dihitung, sehingga biaya setiap
+potongan sebanding dengan ukurannya sendiri, bukan dengan seluruh riwayat.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from feed import FEED_COLUMNS, TOTAL_COLUMNS, IncrementalFeedReader, accumulate_totals, read_feed_frame
+from geo import region_key
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+FEED_SUFFIXES = ('.csv', '.jsonl', '.ndjson')
+RECORD_COLUMNS = FEED_COLUMNS + ['Sumber']
+
+# Peringkat sumber menurut awalan nama file (tanpa beda huruf besar/kecil); lainnya 0
+SOURCE_RANKS = {'bnpb': 3, 'bpbd': 2, 'pos': 1}
+
+# Struktur laporan yang sah: Sub_Kategori -> (Kategori, Satuan). Semua satuan adalah hitungan/ukuran non-negatif.
+FEED_SCHEMA = {
+    'Meninggal Total': ('Korbang Jiwa', 'Jiwa'),
+    'Meninggal Teridentifikasi': ('Korbang Jiwa', 'Jiwa'),
+    'Hilang': ('Korbang Jiwa', 'Jiwa'),
+    'Luka-Luka': ('Korbang Jiwa', 'Jiwa'),
+    'Mengungsi': ('Korbang Jiwa', 'Jiwa'),
+    'Rusak Ringan': ('Kerusakan Rumah', 'Unit'),
+    'Rusak Sedang': ('Kerusakan Rumah', 'Unit'),
+    'Rusak Berat': ('Kerusakan Rumah', 'Unit'),
+    'Rumah Ibadah': ('Fasilitas Publik', 'Unit'),
+    'Fasilitas Kesehatan': ('Fasilitas Publik', 'Unit'),
+    'Kantor': ('Fasilitas Publik', 'Unit'),
+    'Sekolah': ('Fasilitas Publik', 'Unit'),
+    'Jalan Rusak': ('Prasarana Vital', 'Unit'),
+    'Jembatan Rusak': ('Prasarana Vital', 'Unit'),
+    'Sawah': ('Dampak Ekonomi', 'Ha'),
+    'Taksiran Kerugian Total': ('Kerugian Finansial', 'Rupiah'),
+}
+
+# Alasan penolakan, diperiksa berurutan (alasan pertama yang cocok dicatat)
+REJECT_REASONS = ['waktu', 'sub_kategori', 'kategori', 'satuan', 'nilai', 'negatif']
+
+# Delta indeks digabung ke basis setelah melebihi 1/8 basis (biaya penggabungan teramortisasi)
+_MERGE_RATIO = 8
+_MIN_DELTA = 4096
+
+
+def source_rank(name):
+    lowered = name.lower()
+    for prefix, rank in SOURCE_RANKS.items():
+        if lowered.startswith(prefix):
+            return rank
+    return 0
+
+
+def discover_sources(path):
+    """`{nama_sumber: path}` dari direktori berisi satu file feed per sumber, atau satu file feed."""
+    path = Path(path)
+    if not path.is_dir():
+        return {path.stem: str(path)}
+    return {
+        entry.stem: str(entry) for entry in sorted(path.iterdir())
+        if entry.suffix in FEED_SUFFIXES and not entry.name.startswith('.')
+    }
+
+
+def validate(frame):
+    """
+    Pemeriksaan skema & rentang ter-vektorisasi. Mengembalikan `(frame_sah, alasan)`:
+    `frame_sah` berisi baris yang lolos dengan `Waktu` ter-parse, `alasan` berisi alasan
+    penolakan per baris yang ditolak (array string).
+    """
+    missing = [c for c in FEED_COLUMNS if c not in frame.columns]
+    if missing:
+        return frame.iloc[:0], np.full(len(frame), 'kolom')
+
+    waktu = pd.to_datetime(frame['Waktu'], errors='coerce', format='ISO8601')
+    sub_kategori = frame['Sub_Kategori'].astype(str)
+    expected_kategori = sub_kategori.map({sub: kategori for sub, (kategori, _) in FEED_SCHEMA.items()})
+    expected_satuan = sub_kategori.map({sub: satuan for sub, (_, satuan) in FEED_SCHEMA.items()})
+    nilai = pd.to_numeric(frame['Nilai'], errors='coerce')
+    conditions = [
+        waktu.isna().to_numpy(),
+        expected_kategori.isna().to_numpy(),
+        (frame['Kategori'].astype(str) != expected_kategori).to_numpy(),
+        (frame['Satuan'].astype(str) != expected_satuan).to_numpy(),
+        nilai.isna().to_numpy(),
+        (nilai < 0).to_numpy(),
+    ]
+    reasons = np.select(conditions, REJECT_REASONS, default='')
+    valid = reasons == ''
+
+    accepted = frame.loc[valid, FEED_COLUMNS].copy()
+    accepted['Waktu'] = waktu[valid]
+    accepted['Nilai'] = nilai[valid].astype(float)
+    return accepted, reasons[~valid]
+
+
+def observation_keys(frame):
+    """Hash uint64 per baris untuk identitas observasi (waktu, kab/kota, Sub_Kategori)."""
+    return pd.util.hash_pandas_object(
+        frame[['Waktu', 'Kabupaten_Kota', 'Sub_Kategori']], index=False
+    ).to_numpy(dtype=np.uint64)
+
+
+class HashIndex:
+    """
+    Peta kunci uint64 -> (peringkat, sumber, nilai) dalam dua run terurut: basis dan delta kecil.
+
+    Pencarian memakai `np.searchsorted` pada kedua run. Kunci baru masuk ke delta; delta digabung
+    ke basis setelah cukup besar, sehingga biaya per potongan sebanding dengan ukuran potongan
+    (teramortisasi), tidak dengan jumlah kunci yang sudah tersimpan.
+    """
+
+    FIELDS = ('keys', 'ranks', 'sources', 'values')
+
+    def __init__(self, arrays=None):
+        empty = self._empty()
+        self._base = empty if arrays is None else {f: np.array(arrays[f], dtype=empty[f].dtype) for f in self.FIELDS}
+        self._delta = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {
+            'keys': np.empty(0, dtype=np.uint64),
+            'ranks': np.empty(0, dtype=np.int8),
+            'sources': np.empty(0, dtype=np.int16),
+            'values': np.empty(0, dtype=float),
+        }
+
+    def __len__(self):
+        return len(self._base['keys']) + len(self._delta['keys'])
+
+    @staticmethod
+    def _find(run, keys):
+        pos = np.searchsorted(run['keys'], keys)
+        clipped = np.minimum(pos, max(len(run['keys']) - 1, 0))
+        hit = (pos < len(run['keys'])) & (run['keys'][clipped] == keys) if len(run['keys']) else np.zeros(len(keys), dtype=bool)
+        return hit, clipped
+
+    def lookup(self, keys):
+        """`(ada, peringkat, sumber, nilai)` per kunci; peringkat -1 untuk kunci yang belum ada."""
+        found = np.zeros(len(keys), dtype=bool)
+        ranks = np.full(len(keys), -1, dtype=np.int8)
+        sources = np.full(len(keys), -1, dtype=np.int16)
+        values = np.zeros(len(keys))
+        for run in (self._base, self._delta):
+            hit, pos = self._find(run, keys)
+            found |= hit
+            ranks[hit] = run['ranks'][pos[hit]]
+            sources[hit] = run['sources'][pos[hit]]
+            values[hit] = run['values'][pos[hit]]
+        return found, ranks, sources, values
+
+    def upsert(self, keys, ranks, sources, values):
+        """Menulis entri untuk `keys` (unik dalam satu panggilan)."""
+        pending = np.ones(len(keys), dtype=bool)
+        for run in (self._base, self._delta):
+            hit, pos = self._find(run, keys)
+            hit &= pending
+            run['ranks'][pos[hit]] = ranks[hit]
+            run['sources'][pos[hit]] = sources[hit]
+            run['values'][pos[hit]] = values[hit]
+            pending &= ~hit
+        if pending.any():
+            new = {'keys': keys[pending], 'ranks': ranks[pending], 'sources': sources[pending], 'values': values[pending]}
+            self._delta = self._merge(self._delta, new)
+            if len(self._delta['keys']) > max(_MIN_DELTA, len(self._base['keys']) // _MERGE_RATIO):
+                self._base = self._merge(self._base, self._delta)
+                self._delta = self._empty()
+
+    def _merge(self, a, b):
+        merged = {f: np.concatenate([a[f], b[f].astype(a[f].dtype)]) for f in self.FIELDS}
+        order = np.argsort(merged['keys'], kind='stable')
+        return {f: merged[f][order] for f in self.FIELDS}
+
+    def arrays(self):
+        """Isi indeks sebagai satu run terurut (untuk checkpoint)."""
+        return self._merge(self._base, self._delta)
+
+
+class MultiSourceFeed:
+    """
+    Gabungan beberapa feed sumber dengan antarmuka yang sama seperti `IncrementalFeedReader`
+    (`poll`, `totals_records`, `subscribe`, `checkpoint`/`restore`), sehingga dashboard,
+    refresher, dan ekspor laporan tidak perlu tahu ada berapa sumber.
+
+    `path` boleh berupa satu file feed atau direktori berisi satu file per sumber
+    (peringkat sumber dari awalan nama file, lihat `SOURCE_RANKS`). File sumber baru di
+    direktori ikut dibaca pada `poll()` berikutnya; jika salah satu file diganti, dipotong,
+    atau dihapus, seluruh sumber dibaca ulang dari awal.
+
+    Catatan mentah semua sumber (untuk tabel catatan laporan) disimpan sebagai potongan yang
+    sudah di-parsing saat `poll()`; `records()` hanya menyambung potongan baru ke frame
+    yang sudah ada, tanpa membaca ulang file.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._reset_listeners = []
+        self._last_checkpoint = None
+        self.version = 0
+        self.records_version = 0
+        self._reset()
+
+    def _reset(self):
+        self.sources = {}   # nama -> (id, peringkat, IncrementalFeedReader)
+        # Id sumber dicatat di indeks dedupe sebagai pemilik nilai: tidak pernah dipakai ulang, ikut checkpoint
+        self._next_id = 0
+        self.index = HashIndex()
+        self.rows_read = 0
+        self.stats = Counter()
+        self._totals = {}
+        self._records = None
+        self._record_chunks = []
+        # Sumber yang dipulihkan dari checkpoint: awal file (hingga posisi baca) belum ada di catatan
+        self._record_prefix = {}
+        self.records_version += 1
+        self._discover()
+        for callback in self._reset_listeners:
+            callback()
+
+    def _discover(self):
+        for name, path in discover_sources(self.path).items():
+            if name not in self.sources:
+                reader = IncrementalFeedReader(path)
+                source_id = self._next_id
+                self._next_id += 1
+                reader.subscribe(lambda frame, s=source_id, r=source_rank(name): self._ingest(s, r, frame))
+                reader.subscribe(lambda frame, n=name: self._append_records(n, frame))
+                self.sources[name] = (source_id, source_rank(name), reader)
+
+    def subscribe(self, callback, on_reset=None):
+        """Sama seperti `IncrementalFeedReader.subscribe`; `callback` menerima baris yang diterima (selisih)."""
+        self._listeners.append(callback)
+        if on_reset is not None:
+            self._reset_listeners.append(on_reset)
+
+    def _append_records(self, name, frame):
+        self._record_chunks.append(frame.reindex(columns=FEED_COLUMNS).assign(Sumber=name))
+        self.records_version += 1
+
+    def records(self):
+        """
+        `(versi, frame)` semua catatan mentah yang sudah dibaca dari semua sumber, dengan kolom
+        tambahan `Sumber`; versi berubah setiap kali catatan bertambah atau dibaca ulang.
+        Setelah pemulihan dari checkpoint, awal setiap file dibaca sekali (hingga posisi tersimpan).
+        """
+        with self._lock:
+            if self._record_prefix:
+                prefix = [read_feed_frame(path, end).assign(Sumber=name) for name, (path, end) in self._record_prefix.items()]
+                self._record_chunks[:0] = prefix
+                self._record_prefix = {}
+            if self._record_chunks:
+                chunks = self._record_chunks if self._records is None else [self._records, *self._record_chunks]
+                self._records = pd.concat(chunks, ignore_index=True)
+                self._record_chunks = []
+            if self._records is None:
+                return self.records_version, pd.DataFrame(columns=RECORD_COLUMNS)
+            return self.records_version, self._records
+
+    def _ingest(self, source_id, rank, frame):
+        accepted, reasons = validate(frame)
+        self.stats.update({f'ditolak_{reason}': int(n) for reason, n in zip(*np.unique(reasons, return_counts=True))})
+        if accepted.empty:
+            return
+        names = accepted['Kabupaten_Kota'].astype(str)
+        accepted['Kabupaten_Kota'] = names.map({name: region_key(name) for name in names.unique()})
+
+        # Laporan berulang untuk observasi yang sama dalam satu potongan: yang terakhir berlaku
+        keys = observation_keys(accepted)
+        last = ~pd.Series(keys).duplicated(keep='last').to_numpy()
+        self.stats['duplikat'] += int((~last).sum())
+        accepted, keys = accepted[last], keys[last]
+        values = accepted['Nilai'].to_numpy()
+
+        found, old_ranks, old_sources, old_values = self.index.lookup(keys)
+        # Observasi baru, sumber berperingkat lebih tinggi, atau koreksi dari sumber pemilik nilai
+        takes_over = ~found | (rank > old_ranks) | (old_sources == source_id)
+        delta = np.where(found, values - old_values, values)
+        changed = takes_over & (delta != 0)
+        self.stats['diterima'] += int((takes_over & ~found).sum())
+        self.stats['koreksi'] += int((takes_over & found & changed).sum())
+        self.stats['duplikat'] += int((~takes_over | (found & ~changed)).sum())
+
+        self.index.upsert(
+            keys[takes_over], np.full(takes_over.sum(), rank, dtype=np.int8),
+            np.full(takes_over.sum(), source_id, dtype=np.int16), values[takes_over]
+        )
+        if not changed.any():
+            return
+        emitted = accepted[changed].assign(Nilai=delta[changed])
+        accumulate_totals(self._totals, emitted)
+        self.version += 1
+        for callback in self._listeners:
+            callback(emitted)
+
+    def poll(self):
+        """Membaca byte baru dari semua sumber (peringkat tertinggi dulu); True jika total/deret berubah."""
+        with self._lock:
+            names = discover_sources(self.path)
+            if any(name not in names or reader.replaced() for name, (_, _, reader) in self.sources.items()):
+                self._reset()
+            self._discover()
+            version = self.version
+            for _, _, reader in sorted(self.sources.values(), key=lambda s: (-s[1], s[0])):
+                reader.poll()
+            self.rows_read = sum(reader.rows_read for _, _, reader in self.sources.values())
+            return self.version != version
+
+    def totals_records(self):
+        """Total hasil rekonsiliasi sebagai tuple `(Kategori, Sub_Kategori, Satuan, Nilai)` (tanpa pandas)."""
+        with self._lock:
+            return [(k, sub, satuan, nilai) for sub, (k, satuan, nilai) in self._totals.items()]
+
+    def snapshot(self, *views):
+        """
+        `(total, view()...)` dibaca di bawah kunci yang sama dengan `poll()`, mis. deret waktu
+        pelanggan: tidak ada potongan feed baru yang masuk di antara total dan view.
+        """
+        with self._lock:
+            return (self.totals_records(), *(view() for view in views))
+
+    def totals_frame(self):
+        return pd.DataFrame(self.totals_records(), columns=TOTAL_COLUMNS)
+
+    def checkpoint(self):
+        """Status JSON: posisi baca per sumber, total, dan statistik (indeks ada di `checkpoint_arrays`)."""
+        with self._lock:
+            return {
+                'path': os.path.abspath(self.path),
+                'sources': {name: reader.checkpoint() for name, (_, _, reader) in self.sources.items()},
+                'source_ids': {name: source_id for name, (source_id, _, _) in self.sources.items()},
+                'totals': {sub: list(entry) for sub, entry in self._totals.items()},
+                'stats': dict(self.stats),
+            }
+
+    def checkpoint_arrays(self):
+        with self._lock:
+            return {f'indeks_{field}': array for field, array in self.index.arrays().items()}
+
+    def checkpoint_due(self, interval):
+        """True (dan mencatat waktunya) jika checkpoint terakhir sudah lebih dari `interval` detik lalu."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_checkpoint is not None and now - self._last_checkpoint < interval:
+                return False
+            self._last_checkpoint = now
+            return True
+
+    def restore(self, state, arrays):
+        """
+        Memulihkan status dari `checkpoint()` & `checkpoint_arrays()`. Diabaikan (False) jika
+        daftar sumber berbeda atau salah satu sumber tidak dapat dipulihkan. Id sumber diambil
+        dari checkpoint (bukan urutan penemuan saat ini), agar pemilik nilai di indeks tetap benar.
+        """
+        if not state or arrays is None or state.get('path') != os.path.abspath(self.path):
+            return False
+        with self._lock:
+            source_ids = state.get('source_ids', {})
+            if not set(state.get('sources', {})) == set(source_ids) == set(self.sources):
+                return False
+            # Sumber dipulihkan ke pembaca baru dulu agar kegagalan di tengah tidak merusak status
+            fresh = {}
+            for name, (_, rank, reader) in self.sources.items():
+                source_id = int(source_ids[name])
+                candidate = IncrementalFeedReader(reader.path)
+                if not candidate.restore(state['sources'][name]):
+                    return False
+                candidate.subscribe(lambda frame, s=source_id, r=rank: self._ingest(s, r, frame))
+                candidate.subscribe(lambda frame, n=name: self._append_records(n, frame))
+                fresh[name] = (source_id, rank, candidate)
+            try:
+                index = HashIndex({field: arrays[f'indeks_{field}'] for field in HashIndex.FIELDS})
+            except KeyError:
+                return False
+            self.sources = fresh
+            self._next_id = max((source_id for source_id, _, _ in fresh.values()), default=-1) + 1
+            self.index = index
+            self._records = None
+            self._record_chunks = []
+            self._record_prefix = {
+                name: (reader.path, reader.offset) for name, (_, _, reader) in fresh.items() if reader.offset
+            }
+            self.records_version += 1
+            self._totals = {sub: list(entry) for sub, entry in state['totals'].items()}
+            self.stats = Counter(state.get('stats', {}))
+            self.rows_read = sum(reader.rows_read for _, _, reader in self.sources.values())
+            self.version += 1
+        return True
@@ -0,0 +1,112 @@
+"""
+Instrumentasi waktu (span) untuk jalur panas dashboard.
+
+Setiap rerun memiliki `RerunTracer` dengan ID sesi dan ID rerun. Span dicatat
+dengan `with tracer.span('nama'):` dan dikirim ke `TimingSink` milik proses,
+yang menulis ke file lokal:
+- `*.jsonl`: satu baris JSON per span (dengan session_id & rerun_id),
+- `*.prom`: format teks Prometheus (count & sum per span), ditulis ulang
+  secara atomik agar bisa dibaca node_exporter textfile collector.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class TimingSink:
+    """Penampung span tingkat proses; aman dipakai banyak sesi sekaligus."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.is_prometheus = bool(path) and path.endswith('.prom')
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: [0, 0.0])
+        # JSON-lines: satu handle ber-buffer baris dibuka sekali, bukan dibuka ulang per span
+        self._file = None
+
+    def record(self, span):
+        if not self.path:
+            return
+        with self._lock:
+            if self.is_prometheus:
+                totals = self._totals[span['name']]
+                totals[0] += 1
+                totals[1] += span['duration_ms'] / 1000
+            else:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+                self._file.write(json.dumps(span, ensure_ascii=False) + '\n')
+
+    def close(self):
+        """Menutup handle JSON-lines (dibuka lagi otomatis pada span berikutnya)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def flush(self):
+        """Menulis ulang file Prometheus (tidak berpengaruh untuk JSON-lines)."""
+        if not self.is_prometheus:
+            return
+        with self._lock:
+            lines = [
+                '# HELP bencana_span_seconds Durasi bagian dashboard per span.',
+                '# TYPE bencana_span_seconds summary',
+            ]
+            for name, (count, total) in sorted(self._totals.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'bencana_span_seconds_count{{span="{label}"}} {count}')
+                lines.append(f'bencana_span_seconds_sum{{span="{label}"}} {total:.6f}')
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(tmp_path, self.path)
+
+
+class RerunTracer:
+    """Pencatat span untuk satu rerun dari satu sesi."""
+
+    def __init__(self, session_id, rerun_id, sink):
+        self.session_id = session_id
+        self.rerun_id = rerun_id
+        self.sink = sink
+        self.spans = []
+        self._started = time.perf_counter()
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record = {
+                'ts': time.time(),
+                'session_id': self.session_id,
+                'rerun_id': self.rerun_id,
+                'name': name,
+                'depth': self._depth,
+                'offset_ms': (start - self._started) * 1000,
+                'duration_ms': (time.perf_counter() - start) * 1000,
+            }
+            self.spans.append(record)
+            self.sink.record(record)
+
+    def total_ms(self):
+        return (time.perf_counter() - self._started) * 1000
+
+
+def start_rerun(session_state, sink):
+    """Membuat tracer baru untuk rerun ini; ID sesi disimpan di `session_state`."""
+    if '_timing_session_id' not in session_state:
+        session_state['_timing_session_id'] = uuid.uuid4().hex[:12]
+        session_state['_timing_rerun_count'] = 0
+    session_state['_timing_rerun_count'] += 1
+    session_id = session_state['_timing_session_id']
+    return RerunTracer(session_id, f"{session_id}-{session_state['_timing_rerun_count']}", sink)
@@ -0,0 +1,27 @@
+"""
+Import modul yang ditunda hingga atribut pertamanya diakses.
+
+Dipakai untuk pustaka berat (pandas, altair) agar kartu metrik dapat tampil
+di proses baru sebelum pustaka tersebut selesai di-import.
+"""
+import importlib
+
+
+class LazyModule:
+    """Proksi modul: `pd = LazyModule('pandas')` baru meng-import pandas saat `pd.X` dipakai."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<LazyModule {self._name!r} ({state})>'
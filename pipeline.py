@@ -0,0 +1,239 @@
+"""
+Pipeline data dashboard tanpa UI: total feed -> tabel wilayah, trend, dan prakiraan.
+
+Dipakai bersama oleh `app.py`, ekspor laporan massal (`reports.py`), dan API JSON
+(`api.py`), sehingga semuanya membaca snapshot yang sama dari `ColumnarStore` untuk
+satu versi data dan tidak menghitung ulang angka yang sama secara terpisah.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from apportion import largest_remainder
+from cube import CUBE_ARRAYS, FilterCube
+from feed import TOTAL_COLUMNS
+from forecast import forecast_cumulative
+from lazy import LazyModule
+from scoring import PriorityScorer
+from storage import data_version, file_signature
+
+pd = LazyModule('pandas')
+
+# Naikkan setiap kali logika load_updated_data mengubah isi tabel yang disimpan
+PIPELINE_VERSION = 8
+
+
+def snapshot_version(totals_records, wilayah_path):
+    """Versi data dari total feed, versi pipeline, dan tanda tangan file basis."""
+    return data_version(totals_records, salt=(PIPELINE_VERSION, file_signature(wilayah_path)))
+
+
+# Jendela laju pertumbuhan bergulir pada trend harian
+TREND_GROWTH_WINDOW_DAYS = 3
+# Sub_Kategori feed yang digambar sebagai trend provinsi
+TREND_SERIES = ('Meninggal Total', 'Mengungsi', 'Taksiran Kerugian Total')
+
+# Nama metrik kenaikan paling curam (kolom `<metrik>_Harian` tabel trend) -> Sub_Kategori feed
+TREND_PEAKS = {'Meninggal': 'Meninggal Total', 'Mengungsi': 'Mengungsi'}
+
+FeedSnapshot = namedtuple('FeedSnapshot', ['records', 'trend'])
+
+
+def feed_snapshot(reader, deret):
+    """
+    Total feed dan deret trend dari state pembaca yang sama: versi data dihitung dari
+    `records`, dan tabel untuk versi itu dibangun dari `trend` yang berakhir tepat di total tersebut.
+    """
+    records, trend = reader.snapshot(lambda: deret.snapshot(TREND_SERIES, growth_window=TREND_GROWTH_WINDOW_DAYS))
+    return FeedSnapshot(records, trend)
+
+
+def trend_peaks(trend):
+    """
+    `{metrik: [tanggal, kenaikan]}` kenaikan harian tertinggi `TREND_PEAKS`, dibaca dari puncak
+    yang dipelihara mesin deret saat observasi masuk (tanpa memindai riwayat); None jika belum ada data.
+    """
+    return {
+        metric: None if trend[name].peak_time is None else [str(trend[name].peak_time), trend[name].peak_increment]
+        for metric, name in TREND_PEAKS.items()
+    }
+
+
+def load_updated_data(df_totals, df_wilayah, trend):
+    """
+    Memuat data bencana alam Sumatera Barat dengan daftar wilayah yang lebih lengkap 
+    dan total yang disesuaikan dengan data otoritatif.
+    `df_totals` adalah total berjalan dari feed (16 baris), `df_wilayah` adalah data basis
+    simulasi dari `data/wilayah_basis.csv`, dan `trend` adalah deret harian provinsi
+    `TREND_SERIES` dari state feed yang sama (lihat `feed_snapshot`).
+    """
+    df_raw = df_totals.set_index('Sub_Kategori')
+    
+    # Dapatkan Total Otoritatif dari CSV
+    rupiah_total_raw = float(df_raw.loc['Taksiran Kerugian Total', 'Nilai'])
+    TOTAL_KERUGIAN_BARU_M = rupiah_total_raw / 1_000_000_000 # Dalam Miliar Rupiah (~1072.7 M)
+    TOTAL_MENINGGAL_BARU = float(df_raw.loc['Meninggal Total', 'Nilai'])
+    TOTAL_MENGUNGSI_BARU = float(df_raw.loc['Mengungsi', 'Nilai'])
+    TOTAL_JEMBATAN_RUSAK_BARU = float(df_raw.loc['Jembatan Rusak', 'Nilai'])
+    TOTAL_SEKOLAH_RUSAK_BARU = float(df_raw.loc['Sekolah', 'Nilai'])
+    TOTAL_FASKES_RUSAK_BARU = float(df_raw.loc['Fasilitas Kesehatan', 'Nilai'])
+    TOTAL_UNIT_RUSAK_BARU = TOTAL_JEMBATAN_RUSAK_BARU + TOTAL_SEKOLAH_RUSAK_BARU + TOTAL_FASKES_RUSAK_BARU
+    
+    # Buat DataFrame Basis (Kab/Kota, Weighted Scores - lebih tinggi = dampak lebih parah, dan jenis bencana)
+    df_base = df_wilayah[['Kabupaten_Kota', 'Base_Score', 'Jenis_Bencana']].reset_index(drop=True)
+    
+    # Hitung faktor skala (total score basis 15 Kab/Kota adalah 100)
+    score_factor = df_base['Base_Score'] / df_base['Base_Score'].sum()
+    
+    # Aplikasikan faktor skala ke total otoritatif
+    df_bencana = df_base.copy()
+    
+    # Korbang Jiwa & Infrastruktur: semua metrik hitungan dibagi sekaligus dengan metode sisa terbesar,
+    # sehingga total akhir SAMA PERSIS tanpa menumpuk sisa pembulatan ke satu wilayah
+    count_totals = {
+        'Total_Meninggal': TOTAL_MENINGGAL_BARU,
+        'Mengungsi_Jiwa': TOTAL_MENGUNGSI_BARU,
+        'Jembatan_Rusak': TOTAL_JEMBATAN_RUSAK_BARU,
+        'Sekolah_Rusak': TOTAL_SEKOLAH_RUSAK_BARU,
+        'Faskes_Rusak': TOTAL_FASKES_RUSAK_BARU,
+    }
+    allocated = largest_remainder(list(count_totals.values()), df_base['Base_Score'].to_numpy())
+    for k, col in enumerate(count_totals):
+        df_bencana[col] = allocated[:, k]
+    
+    # Finansial (Rupiah tidak perlu dibulatkan)
+    df_bencana['Kerugian_Rupiah_Miliar'] = score_factor * TOTAL_KERUGIAN_BARU_M
+    
+    df_bencana['Total_Unit_Rusak'] = df_bencana['Jembatan_Rusak'] + df_bencana['Sekolah_Rusak'] + df_bencana['Faskes_Rusak']
+    df_bencana = df_bencana.drop(columns=['Base_Score'])
+    
+    # Data Trend Harian dari deret waktu feed (nilai akhir otomatis sama dengan total otoritatif)
+    trend_meninggal, trend_mengungsi, trend_kerugian = (trend[name] for name in TREND_SERIES)
+    
+    trend_data = pd.DataFrame({
+        'Tanggal': trend_meninggal.times.astype('datetime64[ns]'),
+        'Meninggal_Kumulatif': trend_meninggal.cumulative.round().astype(int),
+        'Mengungsi_Kumulatif': trend_mengungsi.cumulative.round().astype(int),
+        'Kerugian_Kumulatif_Miliar': trend_kerugian.cumulative / 1_000_000_000,
+        # Tambahan harian & laju pertumbuhan bergulir (persen) untuk deteksi kenaikan paling curam
+        'Meninggal_Harian': trend_meninggal.increments.round().astype(int),
+        'Mengungsi_Harian': trend_mengungsi.increments.round().astype(int),
+        'Kerugian_Harian_Miliar': trend_kerugian.increments / 1_000_000_000,
+        'Meninggal_Pertumbuhan_Persen': trend_meninggal.growth * 100,
+        'Mengungsi_Pertumbuhan_Persen': trend_mengungsi.growth * 100,
+    })
+    
+    return df_bencana, trend_data, TOTAL_KERUGIAN_BARU_M, TOTAL_MENINGGAL_BARU, TOTAL_MENGUNGSI_BARU, TOTAL_UNIT_RUSAK_BARU
+
+
+# --- PRAKIRAAN 24-72 JAM ---
+FORECAST_HORIZONS_H = [24, 48, 72]
+# Jumlah hari terakhir yang dipakai untuk mencocokkan model prakiraan
+FORECAST_WINDOW_DAYS = 5
+# Kolom wilayah -> kolom trend provinsi
+FORECAST_METRICS = {
+    'Mengungsi_Jiwa': 'Mengungsi_Kumulatif',
+    'Total_Meninggal': 'Meninggal_Kumulatif',
+}
+
+
+def load_forecast(trend_data, df_wilayah):
+    """
+    Prakiraan kumulatif provinsi dan setiap kab/kota untuk `FORECAST_HORIZONS_H`.
+    Riwayat harian per kab/kota dibagi dari deret provinsi dengan bobot `Base_Score` dan metode
+    sisa terbesar (sama seperti `load_updated_data`), sehingga titik terakhirnya sama dengan tabel
+    wilayah. Provinsi dan semua wilayah x metrik dicocokkan sekaligus dalam satu batch.
+    """
+    # Hanya jendela pencocokan (+1 hari basis tambahan pertama) yang perlu dibagi ke wilayah
+    riwayat = trend_data.tail(FORECAST_WINDOW_DAYS + 1)
+    n_days, n_metrics, n_regions = len(riwayat), len(FORECAST_METRICS), len(df_wilayah)
+    provinsi = riwayat[list(FORECAST_METRICS.values())].to_numpy(dtype=float)  # [hari x metrik]
+    # Satu pembagian untuk semua (metrik, hari): [wilayah x metrik*hari] -> [hari x metrik*wilayah]
+    wilayah = largest_remainder(provinsi.T.reshape(1, -1), df_wilayah['Base_Score'].to_numpy())
+    wilayah = wilayah.reshape(n_regions, n_metrics, n_days).transpose(2, 1, 0).reshape(n_days, -1)
+    prakiraan = forecast_cumulative(np.hstack([provinsi, wilayah]), FORECAST_HORIZONS_H, FORECAST_WINDOW_DAYS)
+    n_horizons = len(FORECAST_HORIZONS_H)
+
+    # Baris per (horizon, wilayah) dengan urutan wilayah sama seperti `df_bencana`
+    df_prakiraan = pd.DataFrame({
+        'Horizon_Jam': np.repeat(FORECAST_HORIZONS_H, n_regions),
+        'Kabupaten_Kota': np.tile(df_wilayah['Kabupaten_Kota'].to_numpy(), n_horizons),
+    })
+    for m, metric in enumerate(FORECAST_METRICS):
+        df_prakiraan[metric] = np.tile(wilayah[-1, m * n_regions:(m + 1) * n_regions], n_horizons).astype(np.int64)
+        # Kolom prakiraan: provinsi lebih dulu, lalu blok wilayah per metrik
+        cols = slice(n_metrics + m * n_regions, n_metrics + (m + 1) * n_regions)
+        df_prakiraan[f'{metric}_Prakiraan'] = np.rint(prakiraan.value[:, cols]).astype(np.int64).ravel()
+        df_prakiraan[f'{metric}_Bawah'] = np.rint(prakiraan.lower[:, cols]).astype(np.int64).ravel()
+        df_prakiraan[f'{metric}_Atas'] = np.rint(prakiraan.upper[:, cols]).astype(np.int64).ravel()
+
+    # Provinsi dalam format panjang (seperti `trend_long`) untuk digambar di samping trend aktual
+    tanggal_akhir = trend_data['Tanggal'].iloc[-1]
+    df_prakiraan_provinsi = pd.DataFrame({
+        'Horizon_Jam': np.tile(FORECAST_HORIZONS_H, n_metrics),
+        'Tanggal': np.tile(tanggal_akhir + pd.to_timedelta(FORECAST_HORIZONS_H, unit='h'), n_metrics),
+        'Metrik': np.repeat(list(FORECAST_METRICS.values()), n_horizons),
+        'Jumlah': prakiraan.value[:, :n_metrics].T.ravel(),
+        'Bawah': prakiraan.lower[:, :n_metrics].T.ravel(),
+        'Atas': prakiraan.upper[:, :n_metrics].T.ravel(),
+    })
+    return df_prakiraan, df_prakiraan_provinsi
+
+
+def build_snapshot(store, version, totals_records, wilayah_path, trend):
+    """
+    Snapshot per versi data: tabel wilayah, trend & prakiraan plus array kubus filter di store kolumnar.
+    Jika snapshot versi ini sudah ada (ditulis worker lain atau proses sebelumnya), kubus langsung
+    dimuat lewat memory-map tanpa pandas dan tanpa menjalankan `load_updated_data`.
+    """
+    if not store.has_arrays(CUBE_ARRAYS, version):
+        df_totals = pd.DataFrame(totals_records, columns=TOTAL_COLUMNS)
+        df_wilayah = pd.read_csv(wilayah_path)
+        df_bencana, trend_data, total_kerugian, total_meninggal, total_mengungsi, total_unit_rusak = load_updated_data(
+            df_totals, df_wilayah, trend
+        )
+        totals = {
+            'TOTAL_KERUGIAN': float(total_kerugian),
+            'TOTAL_MENINGGAL': float(total_meninggal),
+            'TOTAL_MENGUNGSI': float(total_mengungsi),
+            'TOTAL_UNIT_RUSAK': float(total_unit_rusak),
+            'PUNCAK_KENAIKAN': trend_peaks(trend),
+        }
+        df_prakiraan, df_prakiraan_provinsi = load_forecast(trend_data, df_wilayah)
+        store.write('trend', trend_data, version)
+        # Per horizon: dashboard hanya membaca partisi horizon yang dipilih
+        store.write('prakiraan', df_prakiraan, version, partition_by='Horizon_Jam')
+        store.write('prakiraan_provinsi', df_prakiraan_provinsi, version)
+        store.write('wilayah', df_bencana, version, meta=totals)
+        # Array kubus ditulis terakhir: keberadaannya menandai snapshot versi ini lengkap
+        arrays, meta = FilterCube.build_arrays(df_bencana.reset_index(drop=True), trend_data, extra_meta=totals)
+        store.write_arrays(CUBE_ARRAYS, version, arrays, meta)
+    return FilterCube.from_store(store, version)
+
+
+# --- ANGKA YANG DITAMPILKAN (DIPAKAI BERSAMA DASHBOARD & API) ---
+# Jumlah wilayah pada daftar prioritas teratas (tab 3 & 4)
+TOP_PRIORITIES = 5
+
+
+def selection_metrics(cube, selection):
+    """
+    Angka kartu metrik utama untuk satu filter: korban, pengungsi, dan kerugian kumulatif provinsi
+    pada tanggal terpilih (trend tidak dirinci per wilayah), serta unit rusak wilayah terfilter.
+    """
+    return {
+        'Meninggal_Kumulatif': float(cube.trend_value(selection, 'Meninggal_Kumulatif')),
+        'Mengungsi_Kumulatif': float(cube.trend_value(selection, 'Mengungsi_Kumulatif')),
+        'Kerugian_Kumulatif_Miliar': float(cube.trend_value(selection, 'Kerugian_Kumulatif_Miliar')),
+        'Total_Unit_Rusak': float(cube.sum(selection, 'Total_Unit_Rusak')),
+    }
+
+
+def priority_ranking(cube, selection, k=TOP_PRIORITIES):
+    """
+    Scorer & k wilayah prioritas teratas, di-cache di kubus per kombinasi wilayah & jenis (top-k tanpa sort
+    penuh). Tabel wilayah tidak bergantung pada tanggal, sehingga `date_end` (`selection.key[0]`) tidak ikut kunci.
+    """
+    rows_key = selection.key[1:]
+    scorer = cube.memo('scorer', rows_key, lambda: PriorityScorer(cube.frame(selection)))
+    return scorer, cube.memo('prioritas', (rows_key, k), lambda: scorer.ranked_frame(k=k))
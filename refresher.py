@@ -0,0 +1,218 @@
+"""
+Mode pembaruan langsung: satu thread latar belakang per proses.
+
+Thread ini mengawasi sumber total otoritatif (file feed lokal atau endpoint
+HTTP lokal pengganti feed BPBD), menghitung ulang frame turunan tepat sekali
+per versi data, menerbitkannya sebagai `version`, lalu memberi tahu setiap
+sesi yang berlangganan (satu permintaan rerun per versi). Perubahan yang
+datang beruntun digabung (debounce) sehingga biaya tetap konstan berapa pun
+jumlah penonton: sesi tidak membaca feed, tidak menghitung sendiri, dan tidak
+perlu polling selama pemberitahuan sampai.
+"""
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def mirror_path(store_path, url):
+    """Path salinan lokal feed dari `url` di dalam store (ekstensi file mengikuti path URL, default CSV)."""
+    suffix = Path(urllib.parse.urlparse(url).path).suffix or '.csv'
+    return os.path.join(store_path, '_feed', 'feed' + suffix)
+
+
+class HttpFeedMirror:
+    """
+    Menyalin feed dari endpoint HTTP ke file lokal agar bisa dibaca `IncrementalFeedReader`.
+
+    Hanya byte baru yang diminta (header `Range`). Jika server tidak mendukung
+    `Range`, isi lengkap dibandingkan dengan salinan lokal: sambungan di akhir
+    ditambahkan, isi yang berbeda ditulis ulang secara atomik (inode baru,
+    sehingga pembaca feed mulai ulang dari awal).
+    """
+
+    def __init__(self, url, path, timeout=5.0):
+        self.url = url
+        self.path = path
+        self.timeout = timeout
+
+    def sync(self):
+        """Mengambil byte baru dari server; True jika file lokal berubah."""
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url, headers=headers), timeout=self.timeout) as resp:
+                status, body = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 416:  # Tidak ada byte baru setelah `offset`
+                return False
+            raise
+
+        if status == 206:
+            if body:
+                with open(self.path, 'ab') as f:
+                    f.write(body)
+            return bool(body)
+
+        current = b''
+        if offset:
+            with open(self.path, 'rb') as f:
+                current = f.read()
+        if body == current:
+            return False
+        if current and body.startswith(current):
+            with open(self.path, 'ab') as f:
+                f.write(body[len(current):])
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, self.path)
+        return True
+
+
+class BackgroundRefresher:
+    """
+    Thread latar belakang yang memegang snapshot data terkini untuk seluruh proses.
+
+    - `read()` mengambil data dari pembaca (default: `reader.totals_records`), mis. total feed
+      beserta deret waktunya dari state yang sama.
+    - `version_of(records)` menghitung versi data dari hasil `read()` (murah, dipanggil tiap tick).
+    - `build(version, records)` menghitung frame turunan; dipanggil tepat sekali per versi.
+    - Versi baru baru diterbitkan setelah tidak berubah selama `debounce` detik
+      (paling lama `max_delay` detik sejak perubahan pertama), lalu setiap
+      pelanggan dipanggil sekali. Pelanggan yang mengembalikan False dihapus.
+    """
+
+    def __init__(self, reader, version_of, build, mirror=None, interval=2.0, debounce=1.0, max_delay=10.0,
+                 on_poll=None, read=None):
+        self.reader = reader
+        self.read = read or reader.totals_records
+        self.version_of = version_of
+        self.build = build
+        self.mirror = mirror
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.on_poll = on_poll
+
+        self.version = None
+        self.value = None
+        self.published_at = None
+        self.builds = 0
+        self._pending = None  # (versi kandidat, pertama terlihat, terakhir berubah)
+        self._lock = threading.Lock()
+        self._listeners = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Memuat snapshot awal secara sinkron lalu menjalankan thread pengawas."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, name='bencana-refresher', daemon=True)
+        self.refresh(force=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def subscribe(self, key, callback):
+        """Mendaftarkan `callback(versi)` (mis. permintaan rerun satu sesi); `key` unik per sesi."""
+        with self._lock:
+            self._listeners[key] = callback
+
+    def unsubscribe(self, key):
+        with self._lock:
+            self._listeners.pop(key, None)
+
+    def listener_count(self):
+        with self._lock:
+            return len(self._listeners)
+
+    def current(self):
+        """Pasangan `(versi, nilai)` yang terakhir diterbitkan."""
+        with self._lock:
+            return self.version, self.value
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Sumber sementara tidak tersedia: snapshot lama tetap dipakai, coba lagi di tick berikutnya
+                _LOGGER.exception('Pembaruan data latar belakang gagal')
+
+    def refresh(self, force=False):
+        """Satu tick: sinkron sumber, baca byte baru, terbitkan versi baru bila sudah stabil."""
+        if self.mirror is not None:
+            self.mirror.sync()
+        if self.reader.poll() and self.on_poll is not None:
+            self.on_poll(self.reader)
+        records = self.read()
+        candidate = self.version_of(records)
+
+        now = time.monotonic()
+        if candidate == self.version:
+            self._pending = None
+            return False
+        if self._pending is None or self._pending[0] != candidate:
+            first_seen = self._pending[1] if self._pending is not None else now
+            self._pending = (candidate, first_seen, now)
+        _, first_seen, last_change = self._pending
+        if not force and now - last_change < self.debounce and now - first_seen < self.max_delay:
+            return False
+
+        value = self.build(candidate, records)
+        with self._lock:
+            self.version, self.value = candidate, value
+            self.published_at = time.time()
+            self.builds += 1
+            listeners = list(self._listeners.items())
+        self._pending = None
+        self._notify(candidate, listeners)
+        return True
+
+    def _notify(self, version, listeners):
+        stale = []
+        for key, callback in listeners:
+            try:
+                if callback(version) is False:
+                    stale.append(key)
+            except Exception:
+                _LOGGER.exception('Gagal memberi tahu sesi %s', key)
+                stale.append(key)
+        with self._lock:
+            for key in stale:
+                self._listeners.pop(key, None)
+
+
+def request_session_rerun(session_id):
+    """
+    Meminta rerun satu sesi Streamlit dari thread refresher; permintaan dijalankan di event loop sesi.
+    Streamlit 1.36 belum menyediakan API publik untuk ini, sehingga sesi dicari lewat session manager
+    runtime dengan `getattr`. False jika runtime/API tidak tersedia atau sesi sudah ditutup.
+    """
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return False
+    manager = getattr(runtime.get_instance(), '_session_mgr', None)
+    info = None if manager is None else manager.get_active_session_info(session_id)
+    session = getattr(info, 'session', None)
+    loop = getattr(session, '_event_loop', None)
+    if loop is None or not hasattr(session, 'request_rerun'):
+        return False
+    loop.call_soon_threadsafe(session.request_rerun, None)
+    return True
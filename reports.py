@@ -0,0 +1,279 @@
+"""
+Ekspor massal laporan rencana aksi per kab/kota untuk setiap tanggal trend.
+
+    python reports.py --output laporan
+    python reports.py --output laporan --workers 8 --force
+
+Angka diambil dari snapshot pipeline yang sama dengan dashboard
+(`pipeline.build_snapshot`). Angka wilayah setiap tanggal dibagi dari kumulatif
+provinsi pada tanggal itu (lihat `dated_regions`), lalu diberi skor dengan
+`PriorityScorer` dan rencana alokasi dengan `allocation.allocate` per tanggal;
+grafik trend dari `charts`. Setiap laporan (CSV +
+HTML dengan grafik) diberi sidik jari dari inputnya; laporan yang sidik jarinya
+sama dengan manifest ekspor sebelumnya dilewati, sisanya dibagi ke process pool.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from allocation import RESOURCES, allocate, resource_needs
+from apportion import largest_remainder
+from charts import trend_chart, trend_long
+from ingest import MultiSourceFeed
+from lazy import LazyModule
+from pipeline import build_snapshot, feed_snapshot, snapshot_version
+from scoring import DEFAULT_WEIGHTS, SCORE_COLUMN, PriorityScorer
+from storage import ColumnarStore, data_version
+from timeseries import TimeSeriesEngine
+
+pd = LazyModule('pandas')
+
+ROOT = Path(__file__).parent
+FEED_PATH = os.environ.get('BENCANA_FEED_PATH', str(ROOT / 'data' / 'feed_laporan.csv'))
+WILAYAH_PATH = os.environ.get('BENCANA_WILAYAH_PATH', str(ROOT / 'data' / 'wilayah_basis.csv'))
+STORE_PATH = os.environ.get('BENCANA_STORE_PATH', str(ROOT / 'data' / 'store'))
+
+# Naikkan jika isi/format laporan berubah agar semua laporan dibuat ulang
+REPORT_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+
+REGION_COLUMNS = [
+    'Kabupaten_Kota', 'Jenis_Bencana', 'Total_Meninggal', 'Mengungsi_Jiwa', 'Kerugian_Rupiah_Miliar',
+    'Jembatan_Rusak', 'Sekolah_Rusak', 'Faskes_Rusak', 'Total_Unit_Rusak',
+]
+TREND_COLUMNS = ['Meninggal_Kumulatif', 'Mengungsi_Kumulatif']
+# Kolom wilayah -> kolom trend provinsi yang dibagi per tanggal (unit rusak tidak punya deret harian)
+DATED_COLUMNS = {
+    'Total_Meninggal': 'Meninggal_Kumulatif',
+    'Mengungsi_Jiwa': 'Mengungsi_Kumulatif',
+}
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Data kumulatif hingga {tanggal} · peringkat prioritas {peringkat} dari {n_wilayah} wilayah</p>
+<h2>Dampak Wilayah</h2>
+{dampak}
+<h2>Rencana Alokasi Sumber Daya</h2>
+{alokasi}
+<h2>Trend Dampak Kemanusiaan Provinsi</h2>
+<div id="trend"></div>
+<script>vegaEmbed('#trend', {spec}, {{actions: false}});</script>
+</body>
+</html>
+"""
+
+# Data trend per proses worker (dikirim sekali lewat initializer, bukan per laporan)
+_TREND = None
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def _init_worker(df_trend):
+    global _TREND
+    _TREND = df_trend
+
+
+@lru_cache(maxsize=64)
+def _trend_spec(date_end):
+    """Spesifikasi grafik trend hingga tanggal ke-`date_end` (sama untuk semua wilayah pada tanggal itu)."""
+    df_trend = _TREND.iloc[:date_end]
+    return trend_chart(trend_long(df_trend, TREND_COLUMNS), df_trend['Tanggal'].iloc[-1]).to_json(indent=None)
+
+
+def render_report(job):
+    """Menulis CSV & HTML satu laporan (dijalankan di worker); mengembalikan path relatif laporan."""
+    output, relpath, date_end, row = job
+    df_trend = _TREND.iloc[:date_end]
+    tanggal = df_trend['Tanggal'].iloc[-1]
+    record = {'Tanggal': tanggal.date().isoformat(), **row}
+    for column in TREND_COLUMNS:
+        record[f'{column}_Provinsi'] = int(df_trend[column].iloc[-1])
+
+    base = Path(output) / relpath
+    base.parent.mkdir(parents=True, exist_ok=True)
+    tmp_csv = base.with_name(f'.{base.name}.csv.tmp')
+    pd.DataFrame([record]).to_csv(tmp_csv, index=False)
+
+    dampak = pd.DataFrame({
+        'Metrik': REGION_COLUMNS[1:] + ['Skor Prioritas (%)'],
+        'Nilai': [row[c] for c in REGION_COLUMNS[1:]] + [round(row[SCORE_COLUMN], 1)],
+    })
+    alokasi = pd.DataFrame({
+        'Sumber Daya': list(RESOURCES),
+        'Satuan': [r.unit for r in RESOURCES.values()],
+        'Dialokasikan': [row[f'Alokasi_{name}'] for name in RESOURCES],
+        'Kebutuhan': [row[f'Kebutuhan_{name}'] for name in RESOURCES],
+    })
+    html = HTML_TEMPLATE.format(
+        title=f"Rencana Aksi {row['Kabupaten_Kota']} · {tanggal.strftime('%d %B %Y')}",
+        tanggal=tanggal.strftime('%d %B %Y'),
+        peringkat=row['Peringkat'],
+        n_wilayah=row['Jumlah_Wilayah'],
+        dampak=dampak.to_html(index=False, float_format=lambda v: f'{v:,.1f}'),
+        alokasi=alokasi.to_html(index=False),
+        spec=_trend_spec(date_end),
+    )
+    tmp_html = base.with_name(f'.{base.name}.html.tmp')
+    tmp_html.write_text(html, encoding='utf-8')
+
+    os.replace(tmp_csv, base.with_suffix('.csv'))
+    os.replace(tmp_html, base.with_suffix('.html'))
+    return relpath
+
+
+def load_snapshot(feed_path, wilayah_path, store_path):
+    """Kubus versi data terkini; dibaca dari store jika dashboard sudah membangunnya."""
+    reader = MultiSourceFeed(feed_path)
+    deret = TimeSeriesEngine()
+    reader.subscribe(deret.ingest, on_reset=deret.reset)
+    reader.poll()
+    snapshot = feed_snapshot(reader, deret)
+    version = snapshot_version(snapshot.records, wilayah_path)
+    return version, build_snapshot(ColumnarStore(store_path), version, snapshot.records, wilayah_path, snapshot.trend)
+
+
+def dated_regions(df_bencana, df_trend, df_wilayah):
+    """
+    Tabel wilayah untuk setiap tanggal `df_trend`: kumulatif provinsi pada tanggal itu dibagi ke
+    wilayah dengan bobot `Base_Score` dan metode sisa terbesar (sama seperti `load_forecast`),
+    sehingga tanggal terakhir sama dengan `df_bencana`. Kerugian dibagi proporsional; unit rusak
+    tidak punya deret harian sehingga memakai total akhir, seperti kartu metrik dashboard.
+    """
+    n_days, n_metrics = len(df_trend), len(DATED_COLUMNS)
+    base_score = df_wilayah['Base_Score'].to_numpy(dtype=float)
+    provinsi = df_trend[list(DATED_COLUMNS.values())].to_numpy(dtype=float)  # [hari x metrik]
+    # Satu pembagian untuk semua (metrik, hari), urutan wilayah sama dengan `load_updated_data`
+    wilayah = largest_remainder(provinsi.T.reshape(1, -1), base_score).reshape(len(base_score), n_metrics, n_days)
+    kerugian = np.outer(base_score / base_score.sum(), df_trend['Kerugian_Kumulatif_Miliar'].to_numpy(dtype=float))
+    # Baris `df_bencana` -> baris `df_wilayah` (dicocokkan lewat nama, bukan urutan)
+    positions = pd.Index(df_wilayah['Kabupaten_Kota']).get_indexer(df_bencana['Kabupaten_Kota'])
+
+    frames = []
+    for d in range(n_days):
+        df = df_bencana.reset_index(drop=True).copy()
+        for m, column in enumerate(DATED_COLUMNS):
+            df[column] = wilayah[positions, m, d]
+        df['Kerugian_Rupiah_Miliar'] = kerugian[positions, d]
+        frames.append(df)
+    return frames
+
+
+def region_rows(df_bencana, supply):
+    """Baris laporan per wilayah: dampak, skor & peringkat prioritas, serta alokasi sumber daya."""
+    scorer = PriorityScorer(df_bencana)
+    scores = scorer.scores()
+    ranks = scorer.ranks(DEFAULT_WEIGHTS)[0]
+    plan = allocate(scores, resource_needs(df_bencana), supply)
+    df_rows = df_bencana[REGION_COLUMNS].reset_index(drop=True).copy()
+    df_rows[SCORE_COLUMN] = scores
+    df_rows['Peringkat'] = ranks
+    df_rows['Jumlah_Wilayah'] = len(df_rows)
+    for r, name in enumerate(RESOURCES):
+        df_rows[f'Alokasi_{name}'] = plan.allocation[:, r]
+        df_rows[f'Kebutuhan_{name}'] = plan.need[:, r]
+    # Tipe NumPy -> tipe Python agar baris bisa di-hash (JSON) dan dikirim ke worker
+    return json.loads(df_rows.to_json(orient='records'))
+
+
+def read_manifest(output):
+    try:
+        with open(Path(output) / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(output, manifest):
+    path = Path(output) / MANIFEST_NAME
+    tmp_path = path.with_name(f'.{MANIFEST_NAME}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def plan_jobs(output, df_trend, rows_by_date, supply, manifest, force=False):
+    """
+    Daftar laporan yang perlu dibuat ulang beserta manifest barunya. `rows_by_date` berisi
+    baris wilayah (`region_rows`) untuk setiap tanggal `df_trend`.
+    Sidik jari laporan = versi laporan + stok + trend hingga tanggalnya + baris wilayahnya.
+    """
+    dates = df_trend['Tanggal'].dt.date.astype(str).tolist()
+    trend_values = df_trend[TREND_COLUMNS].to_numpy().tolist()
+    jobs, fingerprints = [], {}
+    for d, (tanggal, rows) in enumerate(zip(dates, rows_by_date)):
+        date_hash = data_version(dates[:d + 1], trend_values[:d + 1], supply, salt=REPORT_VERSION)
+        for row in rows:
+            row_hash = data_version(row)
+            relpath = f"{tanggal}/{slugify(row['Kabupaten_Kota'])}"
+            fingerprint = data_version(date_hash, row_hash)
+            fingerprints[relpath] = fingerprint
+            exists = all((Path(output) / relpath).with_suffix(ext).exists() for ext in ('.csv', '.html'))
+            if force or manifest.get(relpath) != fingerprint or not exists:
+                jobs.append((str(output), relpath, d + 1, row))
+    return jobs, fingerprints
+
+
+def export_reports(output, workers=None, force=False, supply=None,
+                   feed_path=FEED_PATH, wilayah_path=WILAYAH_PATH, store_path=STORE_PATH):
+    """Membuat laporan yang inputnya berubah; mengembalikan `(dibuat, dilewati)`."""
+    supply = [r.supply for r in RESOURCES.values()] if supply is None else list(supply)
+    _, cube = load_snapshot(feed_path, wilayah_path, store_path)
+    df_trend = cube.df_trend.reset_index(drop=True)
+    df_wilayah = pd.read_csv(wilayah_path)
+    rows_by_date = [region_rows(df, supply) for df in dated_regions(cube.df_bencana, df_trend, df_wilayah)]
+
+    Path(output).mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(output)
+    jobs, fingerprints = plan_jobs(output, df_trend, rows_by_date, supply, manifest, force)
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df_trend,)) as pool:
+            for relpath in pool.map(render_report, jobs, chunksize=chunksize):
+                manifest[relpath] = fingerprints[relpath]
+    # Laporan untuk wilayah/tanggal yang sudah tidak ada tidak lagi dicatat
+    write_manifest(output, {k: v for k, v in manifest.items() if k in fingerprints})
+    return len(jobs), len(fingerprints) - len(jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='laporan', help='Direktori keluaran laporan')
+    parser.add_argument('--workers', type=int, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--force', action='store_true', help='Buat ulang semua laporan')
+    parser.add_argument('--supply', type=int, nargs=len(RESOURCES), metavar='N',
+                        help=f'Stok sumber daya ({", ".join(RESOURCES)})')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    created, skipped = export_reports(args.output, args.workers, args.force, args.supply)
+    print(f'{created} laporan dibuat, {skipped} tidak berubah ({time.perf_counter() - start:.1f} s) -> {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Mesin skor prioritas gabungan (korban, pengungsi, kerugian, infrastruktur).
+
+Metrik dinormalisasi terhadap nilai maksimum masing-masing kolom, lalu
+dikalikan dengan vektor bobot. Banyak skenario bobot (mis. "bagaimana jika
+infrastruktur 50%?") dievaluasi sekaligus dengan satu perkalian matriks
+NumPy, dan pemilihan top-k memakai `argpartition` tanpa mengurutkan seluruh tabel.
+"""
+import numpy as np
+
+# Bobot bawaan: Kemanusiaan 40% (meninggal 20% + mengungsi 20%), Finansial 30%, Infrastruktur 30%
+DEFAULT_WEIGHTS = {
+    'Total_Meninggal': 0.20,
+    'Mengungsi_Jiwa': 0.20,
+    'Kerugian_Rupiah_Miliar': 0.30,
+    'Total_Unit_Rusak': 0.30,
+}
+
+SCORE_COLUMNS = {
+    'Total_Meninggal': 'Skor_Meninggal',
+    'Mengungsi_Jiwa': 'Skor_Mengungsi',
+    'Kerugian_Rupiah_Miliar': 'Skor_Kerugian',
+    'Total_Unit_Rusak': 'Skor_Infrastruktur',
+}
+
+SCORE_COLUMN = 'Skor_Prioritas_Gabungan'
+
+
+def weight_matrix(scenarios, metrics=tuple(DEFAULT_WEIGHTS)):
+    """
+    Mengubah satu dict bobot atau daftar dict bobot menjadi matriks [skenario x metrik]
+    yang baris-barisnya dinormalisasi agar berjumlah 1 (skor tetap pada skala 0-100).
+    """
+    if isinstance(scenarios, dict):
+        scenarios = [scenarios]
+    weights = np.array([[float(s.get(m, 0.0)) for m in metrics] for s in scenarios], dtype=float)
+    sums = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, sums, out=np.zeros_like(weights), where=sums > 0)
+
+
+def vary_weight(base, metric, steps):
+    """
+    Skenario bobot di mana `metric` diberi bobot dari `steps` (0-1) dan metrik lain
+    diskalakan proporsional agar total tetap 1.
+    """
+    others = {m: w for m, w in base.items() if m != metric}
+    others_sum = sum(others.values())
+    scenarios = []
+    for w in steps:
+        scenario = {m: (1 - w) * v / others_sum if others_sum else 0.0 for m, v in others.items()}
+        scenario[metric] = float(w)
+        scenarios.append(scenario)
+    return scenarios
+
+
+def normalize(values):
+    """Normalisasi max per kolom; kolom yang seluruhnya nol menghasilkan skor nol."""
+    col_max = values.max(axis=0, initial=0.0)
+    return np.divide(values, col_max, out=np.zeros_like(values, dtype=float), where=col_max > 0)
+
+
+def top_k(scores, k):
+    """
+    Indeks k skor tertinggi (urut menurun) di sepanjang sumbu terakhir.
+    Seri diurutkan berdasarkan urutan baris asli agar hasil stabil.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < n:
+        # Skor ke-k sebagai ambang (O(n)): semua skor di atas ambang masuk, lalu sisa slot diisi seri
+        # pada ambang menurut urutan baris (argpartition saja bisa membuang seri berindeks lebih kecil)
+        threshold = -np.partition(-scores, k - 1, axis=-1)[..., k - 1:k]
+        above = scores > threshold
+        tied = scores == threshold
+        slots = k - above.sum(axis=-1, keepdims=True)
+        chosen = above | (tied & (np.cumsum(tied, axis=-1) <= slots))
+        # Tepat k terpilih per baris, dan `nonzero` mengembalikan indeks menaik per baris
+        candidates = np.nonzero(chosen.reshape(-1, n))[1].reshape(scores.shape[:-1] + (k,))
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.lexsort((candidates, -candidate_scores), axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class PriorityScorer:
+    """Skor prioritas untuk satu set wilayah, dengan bobot yang dapat dikonfigurasi."""
+
+    def __init__(self, df, weights=None):
+        self.df = df
+        self.metrics = list(DEFAULT_WEIGHTS)
+        self.weights = DEFAULT_WEIGHTS if weights is None else weights
+        self.normalized = normalize(df[self.metrics].to_numpy(dtype=float))
+
+    def sweep(self, scenarios):
+        """Skor [skenario x wilayah] untuk banyak vektor bobot dalam satu operasi broadcast."""
+        return weight_matrix(scenarios, self.metrics) @ self.normalized.T * 100
+
+    def scores(self, weights=None):
+        """Skor gabungan per wilayah untuk satu vektor bobot."""
+        return self.sweep(self.weights if weights is None else weights)[0]
+
+    def ranks(self, scenarios):
+        """Peringkat (1 = tertinggi) setiap wilayah pada setiap skenario bobot."""
+        scores = self.sweep(scenarios)
+        order = top_k(scores, scores.shape[-1])
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, order.shape[-1] + 1), axis=-1)
+        return ranks
+
+    def positions(self, index):
+        """Posisi baris (untuk array skor/peringkat) dari label indeks DataFrame."""
+        return self.df.index.get_indexer(index)
+
+    def ranked_frame(self, k=None, weights=None):
+        """
+        Baris wilayah dengan kolom skor, diurutkan dari skor tertinggi.
+        Jika `k` diberikan, hanya k wilayah teratas yang diambil.
+        """
+        weights = self.weights if weights is None else weights
+        scores = self.scores(weights)
+        idx = top_k(scores, len(scores) if k is None else k)
+        df_prioritas = self.df.iloc[idx].copy()
+        for k_metric, metric in enumerate(self.metrics):
+            df_prioritas[SCORE_COLUMNS[metric]] = self.normalized[idx, k_metric]
+        df_prioritas[SCORE_COLUMN] = scores[idx]
+        return df_prioritas
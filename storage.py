@@ -0,0 +1,327 @@
+"""
+Penyimpanan kolumnar di disk untuk data wilayah (kab/kota, kecamatan, nagari).
+
+Setiap tabel disimpan per versi data dan per partisi, dengan satu file `.npy`
+untuk setiap kolom. Kolom teks disimpan sebagai kode kategori (int32) dengan
+kamus kategori di `manifest.json`. File dibuka dengan `np.load(mmap_mode='r')`
+sehingga hanya kolom dan partisi yang disentuh filter yang dibaca, dan semua
+worker Streamlit berbagi halaman memori yang sama dari page cache OS. Setiap
+memory-map memegang satu file descriptor, jadi hanya array besar yang di-map dan
+disimpan; array kecil dan potongan partisi dibaca langsung lalu dilepas.
+
+Selain tabel, store juga menyimpan kumpulan array bernama (mis. indeks kubus
+filter) dan checkpoint JSON (mis. posisi baca feed), sehingga proses baru dapat
+langsung memakai snapshot tanpa menghitung ulang maupun meng-import pandas.
+
+Struktur direktori:
+    <root>/<tabel>/<versi>/manifest.json
+    <root>/<tabel>/<versi>/p0000/<kolom>.npy
+    <root>/<nama_array>/<versi>/arrays.json, <array>.npy
+    <root>/_checkpoints/<nama>.json, <nama>.npz
+
+Hanya `keep_versions` versi terakhir (menurut waktu terbit atau terakhir dimuat) yang
+disimpan per tabel; versi yang lebih lama dihapus setiap kali versi baru terbit.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+MANIFEST = 'manifest.json'
+ARRAYS_MANIFEST = 'arrays.json'
+CHECKPOINT_DIR = '_checkpoints'
+# Jumlah versi per tabel yang dipertahankan di disk
+KEEP_VERSIONS = 8
+# Array di bawah ukuran ini dibaca langsung ke memori, bukan di-memory-map
+MMAP_MIN_BYTES = 1 << 20
+
+
+def data_version(*parts, salt=''):
+    """
+    Versi data (hash konten) dari beberapa bagian kecil, misalnya total feed (list tuple)
+    atau DataFrame kecil. `salt` membedakan versi logika pengolahan, agar snapshot lama
+    tidak dipakai ulang setelah logika berubah.
+    """
+    digest = hashlib.sha1(str(salt).encode('utf-8'))
+    for part in parts:
+        if hasattr(part, 'to_csv'):
+            digest.update(part.to_csv(index=False).encode('utf-8'))
+        else:
+            digest.update(json.dumps(part, default=str, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def file_signature(path):
+    """Tanda tangan murah sebuah file (path, mtime, ukuran) untuk dipakai sebagai bagian versi data."""
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'
+
+
+class ColumnarStore:
+    """Tabel kolumnar berversi yang dibaca melalui memory-map."""
+
+    def __init__(self, root, keep_versions=KEEP_VERSIONS):
+        self.root = str(root)
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._manifests = {}
+        self._arrays = {}
+
+    def _dir(self, table, version):
+        return os.path.join(self.root, table, version)
+
+    def has(self, table, version):
+        """True jika tabel untuk versi ini sudah lengkap di disk."""
+        return os.path.exists(os.path.join(self._dir(table, version), MANIFEST))
+
+    def write(self, table, df, version, partition_by=None, meta=None):
+        """
+        Menulis `df` sebagai tabel berversi. Penulisan bersifat atomik: data ditulis ke
+        direktori sementara lalu di-rename, sehingga worker lain tidak pernah membaca
+        tabel setengah jadi. Jika versi yang sama sudah ditulis worker lain, hasilnya dipakai.
+        """
+        if self.has(table, version):
+            return
+        tmp_dir = self._tmp_dir(table, version)
+
+        columns = {}
+        encoded = {}
+        for col in df.columns:
+            values = df[col]
+            if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+                cat = values.astype('category')
+                columns[col] = {'dtype': 'category', 'categories': cat.cat.categories.astype(str).tolist()}
+                encoded[col] = cat.cat.codes.to_numpy(dtype=np.int32)
+            else:
+                array = values.to_numpy()
+                columns[col] = {'dtype': str(array.dtype)}
+                encoded[col] = array
+
+        if partition_by is None:
+            groups = {'': np.arange(len(df))}
+        else:
+            keys = df[partition_by].astype(str).to_numpy()
+            groups = {key: np.flatnonzero(keys == key) for key in pd.unique(keys)}
+
+        partitions = {}
+        for i, (key, rows) in enumerate(groups.items()):
+            part_dir = f'p{i:04d}'
+            os.makedirs(os.path.join(tmp_dir, part_dir))
+            for col, array in encoded.items():
+                np.save(os.path.join(tmp_dir, part_dir, f'{col}.npy'), np.ascontiguousarray(array[rows]))
+            partitions[key] = {'dir': part_dir, 'rows': int(len(rows))}
+
+        manifest = {
+            'table': table,
+            'version': version,
+            'partition_by': partition_by,
+            'columns': columns,
+            'column_order': list(df.columns),
+            'partitions': partitions,
+            'rows': int(len(df)),
+            'meta': meta or {},
+        }
+        with open(os.path.join(tmp_dir, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        self._publish(tmp_dir, table, version)
+
+    def _tmp_dir(self, name, version):
+        os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        return tempfile.mkdtemp(prefix=f'.{version}-', dir=os.path.join(self.root, name))
+
+    def _publish(self, tmp_dir, name, version):
+        try:
+            os.rename(tmp_dir, self._dir(name, version))
+        except OSError:
+            # Versi yang sama sudah ditulis oleh worker lain
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.prune(name)
+
+    def versions(self, name):
+        """Versi yang sudah terbit untuk tabel/array `name`, dari yang terlama."""
+        base = os.path.join(self.root, name)
+        entries = []
+        try:
+            with os.scandir(base) as it:
+                for entry in it:
+                    # Direktori sementara (`.versi-xxxx`) belum terbit
+                    if entry.name.startswith('.') or not entry.is_dir():
+                        continue
+                    try:
+                        entries.append((entry.stat().st_mtime_ns, entry.name))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            return []
+        return [version for _, version in sorted(entries)]
+
+    def touch(self, version):
+        """Menandai versi sebagai baru dipakai di semua tabel, agar tidak terhapus oleh `prune`."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            try:
+                os.utime(self._dir(name, version))
+            except OSError:
+                pass
+
+    def prune(self, name, keep=None):
+        """
+        Menghapus versi `name` selain `keep` versi terbaru, lalu membuang cache manifest dan
+        memory-map untuk versi yang sudah tidak ada di disk (termasuk yang dihapus worker lain).
+        Memory-map yang masih dipegang pembaca tetap sah setelah file dihapus.
+        """
+        keep = self.keep_versions if keep is None else keep
+        versions = self.versions(name)
+        for version in versions[:max(len(versions) - keep, 0)]:
+            shutil.rmtree(self._dir(name, version), ignore_errors=True)
+        current = set(versions[-keep:]) if keep > 0 else set()
+        with self._lock:
+            for key in [k for k in list(self._manifests) if k[0] == name and k[1] not in current]:
+                del self._manifests[key]
+            for key in [k for k in list(self._arrays) if k[0] == name and k[1] not in current]:
+                del self._arrays[key]
+
+    def has_arrays(self, name, version):
+        return os.path.exists(os.path.join(self._dir(name, version), ARRAYS_MANIFEST))
+
+    def write_arrays(self, name, version, arrays, meta=None):
+        """Menulis kumpulan array NumPy bernama (satu `.npy` per array) beserta metadata JSON."""
+        if self.has_arrays(name, version):
+            return
+        tmp_dir = self._tmp_dir(name, version)
+        for key, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f'{key}.npy'), np.ascontiguousarray(array))
+        with open(os.path.join(tmp_dir, ARRAYS_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({'arrays': list(arrays), 'meta': meta or {}}, f, ensure_ascii=False)
+        self._publish(tmp_dir, name, version)
+
+    def read_arrays(self, name, version):
+        """Membaca kumpulan array (memory-mapped) dan metadatanya; tidak membutuhkan pandas."""
+        self.touch(version)
+        with open(os.path.join(self._dir(name, version), ARRAYS_MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = {key: self._array(name, version, '', key) for key in manifest['arrays']}
+        return arrays, manifest['meta']
+
+    def _checkpoint_path(self, name):
+        return os.path.join(self.root, CHECKPOINT_DIR, f'{name}.json')
+
+    def save_checkpoint(self, name, state, arrays=None):
+        """
+        Menyimpan status kecil (JSON) secara atomik, mis. posisi baca feed.
+        `arrays` (opsional) ditulis lebih dulu ke `<nama>.npz` dan ditautkan lewat token
+        di JSON, sehingga status dan array selalu dibaca berpasangan.
+        """
+        path = self._checkpoint_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if arrays is not None:
+            token = uuid.uuid4().hex
+            arrays_path = self._checkpoint_arrays_path(name)
+            tmp_arrays_path = f'{arrays_path}.{os.getpid()}.tmp'
+            with open(tmp_arrays_path, 'wb') as f:
+                np.savez(f, _token=np.array(token), **arrays)
+            os.replace(tmp_arrays_path, arrays_path)
+            state = {**state, 'arrays_token': token}
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, name):
+        try:
+            with open(self._checkpoint_path(name), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _checkpoint_arrays_path(self, name):
+        return os.path.join(self.root, CHECKPOINT_DIR, f'{name}.npz')
+
+    def load_checkpoint_arrays(self, name, state):
+        """Array milik checkpoint `state`; None jika tidak ada atau sudah ditimpa checkpoint lain."""
+        token = (state or {}).get('arrays_token')
+        if not token:
+            return None
+        try:
+            with np.load(self._checkpoint_arrays_path(name), allow_pickle=False) as data:
+                if str(data['_token']) != token:
+                    return None
+                return {key: data[key] for key in data.files if key != '_token'}
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def manifest(self, table, version):
+        key = (table, version)
+        with self._lock:
+            if key not in self._manifests:
+                with open(os.path.join(self._dir(table, version), MANIFEST), encoding='utf-8') as f:
+                    self._manifests[key] = json.load(f)
+            return self._manifests[key]
+
+    def meta(self, table, version):
+        """Metadata tambahan yang disimpan bersama tabel (mis. total otoritatif)."""
+        return self.manifest(table, version)['meta']
+
+    def partitions(self, table, version):
+        """Daftar kunci partisi (mis. nama kab/kota) sesuai urutan penulisan."""
+        return list(self.manifest(table, version)['partitions'])
+
+    def _load(self, table, version, part_dir, col):
+        path = os.path.join(self._dir(table, version), part_dir, f'{col}.npy')
+        if os.path.getsize(path) < MMAP_MIN_BYTES:
+            return np.load(path)
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:
+            # Array kosong tidak dapat di-memory-map
+            return np.load(path)
+
+    def _array(self, table, version, part_dir, col):
+        """Array satu file, disimpan per proses (memory-map tetap terbuka selama ada di cache)."""
+        key = (table, version, part_dir, col)
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._load(table, version, part_dir, col)
+            self._arrays[key] = array
+        return array
+
+    def read(self, table, version, columns=None, partitions=None):
+        """
+        Membaca kolom `columns` dari partisi `partitions` saja (default: semua).
+        Partisi yang tidak dikenal diabaikan.
+        """
+        manifest = self.manifest(table, version)
+        columns = manifest['column_order'] if columns is None else list(columns)
+        if partitions is None:
+            parts = list(manifest['partitions'].values())
+        else:
+            parts = [manifest['partitions'][p] for p in partitions if p in manifest['partitions']]
+
+        data = {}
+        for col in columns:
+            spec = manifest['columns'][col]
+            if len(parts) == 1:
+                chunks = [self._array(table, version, parts[0]['dir'], col)]
+            else:
+                # Potongan disalin oleh `concatenate`; memory-map-nya tidak perlu tetap terbuka
+                chunks = [self._load(table, version, p['dir'], col) for p in parts]
+            array = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32 if spec['dtype'] == 'category' else spec['dtype'])
+            if spec['dtype'] == 'category':
+                data[col] = pd.Categorical.from_codes(array, categories=spec['categories']).astype(object)
+            else:
+                data[col] = array
+        return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,64 @@
+"""
+Tabel besar dengan pencarian, pengurutan, dan paginasi di sisi server.
+
+Pencarian dan pengurutan menghasilkan satu array indeks baris (dapat di-memo
+per kombinasi kueri); setiap halaman hanyalah potongan array tersebut, jadi
+yang diserialisasi ke browser hanya baris pada halaman yang sedang dilihat.
+Pewarnaan bersyarat dihitung per kolom dengan `np.select`, bukan fungsi
+Python per sel.
+"""
+import math
+
+import numpy as np
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def search_mask(df, text, columns):
+    """Mask baris yang salah satu kolom `columns`-nya memuat `text` (tanpa beda huruf besar/kecil)."""
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        mask |= df[column].astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+def query_order(df, search='', search_columns=(), sort_by=None, ascending=True):
+    """
+    Indeks posisi baris hasil pencarian, diurutkan menurut `sort_by`.
+    Pengurutan stabil ke dua arah: baris dengan nilai sama mempertahankan urutan asli.
+    Nilai kosong (NaN/None) selalu di akhir; kolom bertipe campuran diurutkan sebagai teks.
+    """
+    order = np.arange(len(df))
+    if search and search_columns:
+        order = np.flatnonzero(search_mask(df, search, search_columns))
+    if sort_by is not None and len(order):
+        values = df[sort_by].iloc[order].reset_index(drop=True)
+        try:
+            ranked = values.sort_values(ascending=ascending, kind='stable', na_position='last')
+        except TypeError:
+            ranked = values.where(values.isna(), values.astype(str)).sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            )
+        order = order[ranked.index.to_numpy()]
+    return order
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_rows(order, page, page_size):
+    """Indeks baris untuk halaman `page` (mulai dari 1); halaman di luar rentang dijepit."""
+    page = min(max(1, page), page_count(len(order), page_size))
+    return order[(page - 1) * page_size:page * page_size]
+
+
+def threshold_styles(values, thresholds):
+    """
+    CSS per sel untuk satu kolom: `thresholds` berupa daftar `(batas_bawah, warna)` dari
+    yang tertinggi; sel dengan nilai > batas pertama yang terpenuhi diberi warna tersebut.
+    """
+    values = np.asarray(values, dtype=float)
+    conditions = [values > limit for limit, _ in thresholds]
+    styles = [f'background-color: {color}' for _, color in thresholds]
+    return np.select(conditions, styles, default='')
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modul dashboard berada di akar repo (tanpa paket), jadi akar repo ditambahkan ke path impor
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
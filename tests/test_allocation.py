@@ -0,0 +1,66 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation import RESOURCES, allocate, coverage, resource_needs, share
+
+
+def _value(priority, need, allocation):
+    """Total nilai alokasi: jumlah nilai unit ke-1..a per wilayah, `p * (1 - (k - 1) / n)`."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_cell = priority[:, None] * (allocation - allocation * (allocation - 1) / (2 * need))
+    return np.where(need > 0, per_cell, 0.0).sum(axis=0)
+
+
+def _greedy(priority, need, supply):
+    """Greedy acuan: satu unit per langkah ke wilayah dengan nilai unit berikutnya tertinggi."""
+    allocation = np.zeros_like(need)
+    for r in range(need.shape[1]):
+        heap = [(-priority[i], i) for i in range(len(priority)) if priority[i] > 0 and need[i, r] > 0]
+        heapq.heapify(heap)
+        for _ in range(supply[r]):
+            if not heap:
+                break
+            _, i = heapq.heappop(heap)
+            allocation[i, r] += 1
+            if allocation[i, r] < need[i, r]:
+                heapq.heappush(heap, (-priority[i] * (1 - allocation[i, r] / need[i, r]), i))
+    return allocation
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_brute_force_greedy(seed):
+    rng = np.random.default_rng(seed)
+    priority = rng.random(40) * 100
+    priority[:3] = 0  # wilayah tanpa skor tidak menerima unit
+    need = rng.integers(0, 30, (40, 4))
+    supply = np.array([0, need[:, 1].sum() // 3, need[:, 2].sum() + 5, 250])
+    plan = allocate(priority, need, supply, time_budget_s=10)
+
+    expected = _greedy(priority, need, supply)
+    assert plan.complete
+    np.testing.assert_array_equal(plan.allocation.sum(axis=0), expected.sum(axis=0))
+    np.testing.assert_allclose(_value(priority, need, plan.allocation), _value(priority, need, expected))
+    assert (plan.allocation <= plan.need).all()
+    assert (plan.allocation[:3] == 0).all()
+    np.testing.assert_array_equal(plan.reserve, supply - plan.allocation.sum(axis=0))
+
+
+def test_coverage_and_share():
+    need = np.array([[4, 0], [6, 0]])
+    plan = allocate(np.array([2.0, 1.0]), need, np.array([5, 3]))
+    assert plan.allocation[:, 1].tolist() == [0, 0]
+    np.testing.assert_allclose(coverage(plan), [50.0, 100.0])
+    np.testing.assert_allclose(share(plan.allocation, [5, 0]).sum(axis=0), [100.0, 0.0])
+
+
+def test_resource_needs_rounds_up():
+    df = pd.DataFrame({
+        'Total_Meninggal': [3, 4], 'Mengungsi_Jiwa': [0, 5000], 'Jembatan_Rusak': [0, 2], 'Faskes_Rusak': [1, 0],
+    })
+    need = resource_needs(df)
+    assert need.shape == (2, len(RESOURCES))
+    assert need[:, 0].tolist() == [1, 3]   # Tim SAR: 3/3 dan 4/3 + 1
+    assert need[:, 2].tolist() == [0, 2]   # Jembatan Bailey
@@ -0,0 +1,90 @@
+import json
+import shutil
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from api import ApiServer, ResponseCache, respond, sidecar_refresher
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+
+
+@pytest.fixture
+def refresher(tmp_path):
+    feed_path = tmp_path / 'feed_laporan.csv'
+    shutil.copy(DATA / 'feed_laporan.csv', feed_path)
+    refresher = sidecar_refresher(str(feed_path), str(DATA / 'wilayah_basis.csv'), str(tmp_path / 'store'), feed_url=None)
+    refresher.refresh(force=True)
+    return refresher
+
+
+def _json(response):
+    return json.loads(response[2])
+
+
+def test_matching_etag_returns_304(refresher):
+    cache = ResponseCache()
+    status, headers, body = respond(refresher.current, '/api/total', cache=cache)
+    assert status == 200 and _json((status, headers, body))['versi'] == refresher.version
+    etag = headers['ETag']
+
+    assert respond(refresher.current, '/api/total', if_none_match=etag, cache=cache)[:2] == (304, {
+        'ETag': etag, 'Cache-Control': 'no-cache',
+    })
+    assert respond(refresher.current, '/api/total', if_none_match=f'"lain", W/{etag}', cache=cache)[0] == 304
+    # Body diambil dari cache, bukan disusun ulang
+    assert respond(refresher.current, '/api/total', cache=cache)[2] is body
+    # Parameter berbeda -> ETag berbeda
+    other = respond(refresher.current, '/api/prioritas?k=3', if_none_match=etag, cache=cache)
+    assert other[0] == 200 and other[1]['ETag'] != etag
+    assert len(_json(other)['wilayah']) == 3
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/api/agregat?tanggal=2030-01-01', 400),
+    ('/api/agregat?wilayah=Agam&wilayah=Atlantis', 400),
+    ('/api/agregat?jenis=Meteor', 400),
+    ('/api/prioritas?k=dua', 400),
+    ('/api/prioritas?k=0', 400),
+    ('/api/tidak-ada', 404),
+])
+def test_bad_requests(refresher, target, status):
+    response = respond(refresher.current, target, cache=ResponseCache())
+    assert response[0] == status and 'galat' in _json(response) and 'ETag' not in response[1]
+
+
+def test_snapshot_not_ready_returns_503():
+    assert respond(lambda: (None, None), '/api/total', cache=ResponseCache())[0] == 503
+
+
+def test_etag_changes_after_ingest(refresher, tmp_path):
+    cache = ResponseCache()
+    _, headers, body = respond(refresher.current, '/api/total', cache=cache)
+    before = json.loads(body)
+
+    with open(tmp_path / 'feed_laporan.csv', 'a') as f:
+        f.write('2025-12-07T23:00:00,Sumatera Barat,Korbang Jiwa,Mengungsi,Jiwa,5\n')
+    assert refresher.refresh(force=True)
+
+    status, new_headers, body = respond(refresher.current, '/api/total', if_none_match=headers['ETag'], cache=cache)
+    assert status == 200 and new_headers['ETag'] != headers['ETag']
+    after = json.loads(body)
+    assert after['versi'] != before['versi']
+    assert after['total']['TOTAL_MENGUNGSI'] == before['total']['TOTAL_MENGUNGSI'] + 5
+
+
+def test_server_round_trip(refresher):
+    server = ApiServer(refresher.current, port=0).start()
+    host, port = server.address
+    try:
+        with urllib.request.urlopen(f'http://{host}:{port}/api/versi') as resp:
+            etag = resp.headers['ETag']
+            assert json.loads(resp.read())['versi'] == refresher.version
+        request = urllib.request.Request(f'http://{host}:{port}/api/versi', headers={'If-None-Match': etag})
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 304
+    finally:
+        server.stop()
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from apportion import apportion_levels, largest_remainder
+
+
+def test_exact_sum_per_parent_and_metric():
+    rng = np.random.default_rng(0)
+    parents = rng.integers(0, 4, 60)
+    parents[:4] = np.arange(4)  # setiap induk punya anak
+    weights = rng.random(60) * 10
+    totals = rng.integers(0, 10_000, (4, 3))
+    result = largest_remainder(totals, weights, parents)
+    sums = np.zeros_like(totals)
+    np.add.at(sums, parents, result)
+    np.testing.assert_array_equal(sums, totals)
+    assert result.min() >= 0
+
+
+def test_within_one_unit_of_exact_quota():
+    weights = np.array([3.0, 1.0, 1.0, 2.0])
+    result = largest_remainder([[100]], weights)[:, 0]
+    quota = 100 * weights / weights.sum()
+    assert np.all(np.abs(result - quota) < 1)
+
+
+def test_remainder_goes_to_largest_fraction_then_weight():
+    # Kuota 3.333.. masing-masing: sisa 1 unit ke bobot sama -> urutan baris pertama
+    np.testing.assert_array_equal(largest_remainder([10], [1, 1, 1])[:, 0], [4, 3, 3])
+    # Kuota 2.5 dan 2.5: seri pecahan diputus oleh bobot lebih besar (sama) -> baris pertama
+    np.testing.assert_array_equal(largest_remainder([5], [2, 2])[:, 0], [3, 2])
+
+
+def test_zero_weight_parent_falls_back_to_equal_split():
+    np.testing.assert_array_equal(largest_remainder([10], [0, 0, 0])[:, 0], [4, 3, 3])
+    result = largest_remainder([[10], [5]], [0, 0, 3, 1], [0, 0, 1, 1])[:, 0]
+    np.testing.assert_array_equal(result, [5, 5, 4, 1])
+
+
+def test_parent_without_children_is_rejected():
+    with pytest.raises(ValueError):
+        largest_remainder([[1], [2]], [1, 1], [0, 0])
+    # Induk tanpa anak dengan total nol tidak kehilangan apa pun
+    np.testing.assert_array_equal(largest_remainder([[4], [0]], [1, 1], [0, 0])[:, 0], [2, 2])
+
+
+def test_levels_preserve_province_total():
+    kab, kec = apportion_levels([1000, 37], [
+        (np.array([5.0, 3.0, 2.0]), None),
+        (np.array([1.0, 1.0, 2.0, 1.0, 4.0]), np.array([0, 0, 1, 2, 2])),
+    ])
+    np.testing.assert_array_equal(kab.sum(axis=0), [1000, 37])
+    np.testing.assert_array_equal(kec.sum(axis=0), [1000, 37])
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from charts import lttb, trend_long
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000)
+    y = np.cumsum(rng.normal(size=1000))
+    idx = lttb(x, y, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_passthrough_when_under_budget():
+    np.testing.assert_array_equal(lttb(np.arange(10), np.zeros(10), 10), np.arange(10))
+    np.testing.assert_array_equal(lttb(np.arange(10), np.zeros(10), 2), np.arange(10))
+
+
+def test_lttb_preserves_spike():
+    y = np.zeros(500)
+    y[237] = 100.0
+    assert 237 in lttb(np.arange(500), y, 20)
+
+
+def test_trend_long_caps_points_per_metric():
+    df = pd.DataFrame({
+        'Tanggal': pd.date_range('2025-01-01', periods=400, freq='D'),
+        'A': np.arange(400.0),
+        'B': np.arange(400.0) ** 2,
+    })
+    long = trend_long(df, ['A', 'B'], max_points=40)
+    counts = long.groupby('Metrik').size()
+    assert counts.max() <= 40
+    assert set(counts.index) == {'A', 'B'}
+    # Titik terakhir setiap metrik selalu ikut (nilai kumulatif terkini)
+    assert long.loc[long['Metrik'] == 'B', 'Jumlah'].iloc[-1] == 399.0 ** 2
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import ALL_DATES, ALL_JENIS, ALL_WILAYAH, FilterCube
+from pipeline import priority_ranking
+from scoring import DEFAULT_WEIGHTS
+
+JENIS = ['Banjir', 'Banjir Bandang', 'Tanah Longsor']
+
+
+def _cube(n_regions=30, n_days=10, memo_size=256):
+    rng = np.random.default_rng(0)
+    df_bencana = pd.DataFrame({
+        'Kabupaten_Kota': [f'Wilayah {i}' for i in range(n_regions)],
+        'Jenis_Bencana': rng.choice(JENIS, n_regions),
+        'Total_Meninggal': rng.integers(0, 50, n_regions),
+        'Mengungsi_Jiwa': rng.integers(0, 5000, n_regions),
+        'Kerugian_Rupiah_Miliar': rng.random(n_regions) * 100,
+    })
+    df_trend = pd.DataFrame({
+        'Tanggal': pd.date_range('2025-12-01', periods=n_days),
+        'Meninggal_Kumulatif': np.cumsum(rng.integers(0, 10, n_days)),
+        'Mengungsi_Kumulatif': np.cumsum(rng.integers(0, 1000, n_days)),
+        'Kerugian_Kumulatif_Miliar': np.cumsum(rng.random(n_days)),
+    })
+    return FilterCube.from_frames(df_bencana, df_trend, memo_size=memo_size), df_bencana, df_trend
+
+
+def test_select_frame_sum_match_pandas_masks():
+    cube, df_bencana, df_trend = _cube()
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        tanggal = ALL_DATES if rng.random() < 0.3 else rng.choice(cube.date_labels)
+        wilayah = [ALL_WILAYAH] if rng.random() < 0.3 else list(rng.choice(cube.regions, rng.integers(0, 6)))
+        wilayah += ['Tidak Ada'] if rng.random() < 0.1 else []
+        jenis = ALL_JENIS if rng.random() < 0.3 else rng.choice(JENIS + ['Gempa'])
+        selection = cube.select(tanggal, wilayah, jenis)
+
+        mask = np.ones(len(df_bencana), dtype=bool)
+        if ALL_WILAYAH not in wilayah:
+            mask &= df_bencana['Kabupaten_Kota'].isin(wilayah).to_numpy()
+        if jenis != ALL_JENIS:
+            mask &= (df_bencana['Jenis_Bencana'] == jenis).to_numpy()
+        expected = df_bencana[mask]
+
+        pd.testing.assert_frame_equal(cube.frame(selection).reset_index(drop=True), expected.reset_index(drop=True))
+        for metric in ('Total_Meninggal', 'Mengungsi_Jiwa', 'Kerugian_Rupiah_Miliar'):
+            assert cube.sum(selection, metric) == pytest.approx(expected[metric].sum())
+
+        date_mask = df_trend['Tanggal'].dt.date.astype(str) <= (cube.date_labels[-1] if tanggal == ALL_DATES else tanggal)
+        pd.testing.assert_frame_equal(cube.trend(selection), df_trend[date_mask])
+        assert cube.trend_value(selection, 'Mengungsi_Kumulatif') == df_trend.loc[date_mask, 'Mengungsi_Kumulatif'].iloc[-1]
+
+
+def test_selection_key_ignores_widget_order():
+    cube, _, _ = _cube()
+    a = cube.select(ALL_DATES, ['Wilayah 3', 'Wilayah 1'], ALL_JENIS)
+    b = cube.select(ALL_DATES, ['Wilayah 1', 'Wilayah 3'], ALL_JENIS)
+    assert a.key == b.key and a.rows.tolist() == [1, 3]
+
+
+def test_memo_is_lru_bounded():
+    cube, _, _ = _cube(memo_size=3)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key
+
+    for key in ('a', 'b', 'c'):
+        cube.memo('uji', (key,), lambda key=key: compute(key))
+    cube.memo('uji', ('a',), lambda: compute('a'))   # hit: 'a' menjadi yang terbaru
+    cube.memo('uji', ('d',), lambda: compute('d'))   # mengusir 'b' (terlama dipakai)
+    cube.memo('uji', ('a',), lambda: compute('a'))
+    cube.memo('uji', ('b',), lambda: compute('b'))
+    assert calls == ['a', 'b', 'c', 'd', 'b']
+    assert len(cube._memo) == 3
+
+
+def test_priority_ranking_shared_across_dates():
+    _, df_bencana, df_trend = _cube()
+    rng = np.random.default_rng(2)
+    for metric in DEFAULT_WEIGHTS:
+        df_bencana[metric] = rng.integers(0, 100, len(df_bencana))
+    cube = FilterCube.from_frames(df_bencana, df_trend)
+    scorer, top = priority_ranking(cube, cube.select(ALL_DATES, [ALL_WILAYAH], 'Banjir'))
+    # Tanggal lain dengan wilayah & jenis yang sama memakai scorer dan daftar yang sama
+    other_scorer, other_top = priority_ranking(cube, cube.select(cube.date_labels[2], [ALL_WILAYAH], 'Banjir'))
+    assert other_scorer is scorer and other_top is top
+    assert priority_ranking(cube, cube.select(ALL_DATES, [ALL_WILAYAH], ALL_JENIS))[0] is not scorer
@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+
+from feed import FEED_COLUMNS, IncrementalFeedReader, read_feed_frame
+
+HEADER = 'Waktu,Kabupaten_Kota,Kategori,Sub_Kategori,Satuan,Nilai\n'
+
+
+def _row(nilai, waktu='2025-12-01T08:00:00', sub='Mengungsi'):
+    return f'{waktu},Agam,Korbang Jiwa,{sub},Jiwa,{nilai}\n'
+
+
+def _total(reader, sub='Mengungsi'):
+    return {s: n for _, s, _, n in reader.totals_records()}.get(sub, 0.0)
+
+
+def _append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def test_partial_line_waits_for_newline(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text(HEADER + _row(10) + '2025-12-01T09:00:00,Agam,Korbang Jiwa,Mengu')
+    reader = IncrementalFeedReader(path)
+    assert reader.poll()
+    assert _total(reader) == 10 and reader.rows_read == 1
+    assert reader.offset == len(HEADER) + len(_row(10))
+
+    # Sisa baris belum lengkap: tidak ada yang diproses dan posisi tidak bergeser
+    offset = reader.offset
+    assert not reader.poll()
+    assert reader.offset == offset
+
+    _append(path, 'ngsi,Jiwa,5\n')
+    assert reader.poll()
+    assert _total(reader) == 15 and reader.rows_read == 2
+    assert reader.offset == os.path.getsize(path)
+    assert not reader.poll()
+
+
+def test_rotation_and_truncation_restart_from_zero(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text(HEADER + _row(10) + _row(20))
+    reader = IncrementalFeedReader(path)
+    resets = []
+    reader.subscribe(lambda frame: None, on_reset=lambda: resets.append(True))
+    reader.poll()
+    assert _total(reader) == 30
+
+    # File diganti (inode baru) dengan urutan kolom berbeda: header dibaca ulang
+    rotated = tmp_path / 'feed.csv.baru'
+    rotated.write_text('Nilai,Waktu,Kabupaten_Kota,Kategori,Sub_Kategori,Satuan\n'
+                       '7,2025-12-02T08:00:00,Agam,Korbang Jiwa,Mengungsi,Jiwa\n')
+    os.replace(rotated, path)
+    assert reader.replaced()
+    version = reader.version
+    assert reader.poll()
+    assert resets == [True]
+    assert _total(reader) == 7 and reader.rows_read == 1
+    assert reader.version > version
+
+    # File dipotong (inode sama, lebih pendek dari posisi baca) lalu ditulis ulang
+    open(path, 'w').close()
+    assert reader.replaced()
+    assert not reader.poll()
+    assert len(resets) == 2 and _total(reader) == 0
+    _append(path, HEADER + _row(3))
+    assert reader.poll()
+    assert _total(reader) == 3
+
+
+def test_checkpoint_restore_continues_from_offset(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text(HEADER + _row(10))
+    reader = IncrementalFeedReader(path)
+    reader.poll()
+    state = reader.checkpoint()
+
+    _append(path, _row(5, sub='Hilang'))
+    restarted = IncrementalFeedReader(path)
+    assert restarted.restore(state)
+    assert restarted.poll()
+    # Hanya baris setelah checkpoint yang dibaca; header tersimpan dipakai untuk potongan lanjutan
+    assert restarted.rows_read == 2
+    assert _total(restarted) == 10 and _total(restarted, 'Hilang') == 5
+
+    # Checkpoint ditolak untuk file lain, file yang diganti, atau file yang lebih pendek
+    other = tmp_path / 'lain.csv'
+    other.write_text(HEADER + _row(1))
+    assert not IncrementalFeedReader(other).restore(state)
+    rotated = tmp_path / 'feed.csv.baru'
+    rotated.write_text(HEADER + _row(10))
+    os.replace(rotated, path)
+    assert not IncrementalFeedReader(path).restore(state)
+    assert not IncrementalFeedReader(path).restore(None)
+
+
+def test_full_read_matches_incremental_chunks(tmp_path):
+    for name, rows in (
+        ('feed.csv', [HEADER, _row(10), _row(''), _row('x', sub='Hilang'), _row(2.5)]),
+        ('feed.jsonl', ['{"Waktu": "2025-12-01T08:00:00", "Kabupaten_Kota": "Agam", "Kategori": "Korbang Jiwa", '
+                        f'"Sub_Kategori": "Mengungsi", "Satuan": "Jiwa", "Nilai": {nilai}}}\n'
+                        for nilai in ('10', 'null', '"x"', '2.5')]),
+    ):
+        path = tmp_path / name
+        reader = IncrementalFeedReader(path)
+        chunks = []
+        reader.subscribe(chunks.append)
+        # Setiap baris ditulis dan dibaca sebagai potongan tersendiri
+        for row in rows:
+            _append(path, row)
+            reader.poll()
+
+        incremental = pd.concat([frame.reindex(columns=FEED_COLUMNS) for frame in chunks], ignore_index=True)
+        full = read_feed_frame(path)
+        pd.testing.assert_frame_equal(full, incremental)
+        # Nilai kosong/tidak valid tetap NaN pada kedua jalur dan tidak ikut total
+        assert full['Nilai'].isna().sum() == 2
+        assert _total(reader) == 12.5
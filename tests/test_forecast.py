@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from forecast import MAX_DAILY_GROWTH, fit_log_linear, forecast_cumulative
+
+
+def _cumulative(increments):
+    return np.cumsum(increments, axis=0)
+
+
+def test_exact_exponential_series():
+    rate = 0.2
+    increments = 10 * np.exp(rate * np.arange(10))
+    fit = fit_log_linear(increments, window=5)
+    assert fit.slope[0] == pytest.approx(rate)
+    assert fit.intercept[0] == pytest.approx(np.log(increments[-1]))
+    assert fit.sigma[0] == pytest.approx(0.0, abs=1e-9) and fit.n[0] == 5
+
+    forecast = forecast_cumulative(_cumulative(increments), [24, 48, 72], window=5)
+    # Integral laju exp(a + b*s) dari akhir data hingga h hari ke depan
+    expected = increments.sum() + increments[-1] * np.expm1(rate * np.array([1, 2, 3])) / rate
+    np.testing.assert_allclose(forecast.value[:, 0], expected)
+    # Tanpa residual, rentang prakiraan menyempit ke nilai tengah
+    np.testing.assert_allclose(forecast.lower, forecast.value)
+    np.testing.assert_allclose(forecast.upper, forecast.value)
+
+
+def test_batch_matches_single_series_and_edge_cases():
+    t = np.arange(8)
+    series = np.column_stack([
+        5 * np.exp(0.3 * t),        # tumbuh
+        100 * np.exp(-0.5 * t),     # menurun -> menuju titik jenuh
+        np.exp(1.5 * t),            # lebih cepat dari batas pertumbuhan
+        np.zeros(8),                # tidak ada tambahan sama sekali
+    ])
+    cumulative = _cumulative(series)
+    batch = forecast_cumulative(cumulative, [24, 72], window=5)
+    for j in range(series.shape[1]):
+        single = forecast_cumulative(cumulative[:, j], [24, 72], window=5)
+        np.testing.assert_allclose(batch.value[:, j], single.value[:, 0])
+
+    last = cumulative[-1]
+    # Tambahan ke depan untuk deret menurun tidak melebihi laju terakhir / |b|
+    assert batch.value[1, 1] - last[1] < series[-1, 1] / 0.5
+    assert fit_log_linear(series[:, 2], window=5).slope[0] == pytest.approx(MAX_DAILY_GROWTH)
+    np.testing.assert_allclose(batch.value[:, 3], 0.0)
+
+
+def test_empty_history():
+    forecast = forecast_cumulative(np.zeros((0, 2)), [24, 48], window=5)
+    assert forecast.value.shape == (2, 2) and not forecast.value.any()
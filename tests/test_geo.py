@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+import geo
+from geo import build_levels
+
+
+def _square(x, y, size=1.0, steps=40):
+    # Sisi bergerigi kecil agar penyederhanaan benar-benar membuang titik
+    edge = [(x + size * i / steps, y + (0.0001 if i % 2 else 0.0)) for i in range(steps)]
+    return [[*edge, (x + size, y), (x + size, y + size), (x, y + size), (x, y)]]
+
+
+def _write_source(path):
+    features = [
+        {'type': 'Feature', 'properties': {'Kabupaten_Kota': name}, 'geometry': {'type': 'Polygon', 'coordinates': _square(i, 0)}}
+        for i, name in enumerate(['Agam', 'Kota Padang'])
+    ]
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+
+
+def test_build_levels_writes_each_level_once_without_leftovers(tmp_path, monkeypatch):
+    source = tmp_path / 'batas.geojson'
+    _write_source(source)
+    out_dir = tmp_path / 'static'
+    files = build_levels(source, out_dir)
+    assert set(files) == set(geo.DETAIL_LEVELS)
+    assert sorted(os.listdir(out_dir)) == sorted(files.values())
+    for name in files.values():
+        collection = json.loads((out_dir / name).read_text())
+        assert [f['properties']['Kabupaten_Kota'] for f in collection['features']] == ['Agam', 'Kota Padang']
+
+    # File yang sudah ada dipakai ulang tanpa membaca sumber lagi
+    monkeypatch.setattr(geo, 'read_features', lambda path: 1 / 0)
+    assert build_levels(source, out_dir) == files
+
+
+def test_failed_write_removes_temporary_file(tmp_path, monkeypatch):
+    source = tmp_path / 'batas.geojson'
+    _write_source(source)
+    out_dir = tmp_path / 'static'
+
+    def fail(*args, **kwargs):
+        raise OSError('disk penuh')
+
+    monkeypatch.setattr(geo.json, 'dump', fail)
+    with pytest.raises(OSError):
+        build_levels(source, out_dir)
+    assert os.listdir(out_dir) == []
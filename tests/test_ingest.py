@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import ingest
+from ingest import HashIndex, MultiSourceFeed, validate
+
+HEADER = 'Waktu,Kabupaten_Kota,Kategori,Sub_Kategori,Satuan,Nilai\n'
+
+
+def _row(nilai, waktu='2025-12-01T08:00:00', sub='Mengungsi'):
+    return f'{waktu},Agam,Korbang Jiwa,{sub},Jiwa,{nilai}\n'
+
+
+def _total(reader, sub='Mengungsi'):
+    return {s: n for _, s, _, n in reader.totals_records()}.get(sub, 0.0)
+
+
+def test_validate_reasons_in_order():
+    frame = pd.DataFrame({
+        'Waktu': ['2025-12-01T00:00:00', 'bukan waktu', '2025-12-01T00:00:00', '2025-12-01T00:00:00',
+                  '2025-12-01T00:00:00', '2025-12-01T00:00:00', '2025-12-01T00:00:00'],
+        'Kabupaten_Kota': ['Agam'] * 7,
+        'Kategori': ['Korbang Jiwa', 'Korbang Jiwa', 'Korbang Jiwa', 'Prasarana Vital', 'Korbang Jiwa',
+                     'Korbang Jiwa', 'Korbang Jiwa'],
+        'Sub_Kategori': ['Mengungsi', 'Mengungsi', 'Tidak Ada', 'Mengungsi', 'Mengungsi', 'Mengungsi', 'Mengungsi'],
+        'Satuan': ['Jiwa', 'Jiwa', 'Jiwa', 'Jiwa', 'Unit', 'Jiwa', 'Jiwa'],
+        'Nilai': ['10', '10', '10', '10', '10', 'x', '-1'],
+    })
+    accepted, reasons = validate(frame)
+    assert len(accepted) == 1 and accepted['Nilai'].tolist() == [10.0]
+    assert reasons.tolist() == ['waktu', 'sub_kategori', 'kategori', 'satuan', 'nilai', 'negatif']
+
+
+def test_validate_missing_column_rejects_all():
+    accepted, reasons = validate(pd.DataFrame({'Waktu': ['2025-12-01'], 'Nilai': [1]}))
+    assert accepted.empty and reasons.tolist() == ['kolom']
+
+
+def test_hash_index_lookup_upsert_and_merge(monkeypatch):
+    monkeypatch.setattr(ingest, '_MIN_DELTA', 4)
+    index = HashIndex()
+    rng = np.random.default_rng(0)
+    expected = {}
+    for _ in range(10):
+        keys = np.unique(rng.integers(0, 40, 6).astype(np.uint64))
+        ranks = rng.integers(0, 4, len(keys)).astype(np.int8)
+        sources = rng.integers(0, 3, len(keys)).astype(np.int16)
+        values = rng.random(len(keys))
+        index.upsert(keys, ranks, sources, values)
+        expected.update({int(k): (int(r), int(s), float(v)) for k, r, s, v in zip(keys, ranks, sources, values)})
+
+    probe = np.arange(50, dtype=np.uint64)
+    found, ranks, sources, values = index.lookup(probe)
+    assert len(index) == len(expected)
+    for k in range(50):
+        if k in expected:
+            assert found[k] and (ranks[k], sources[k], values[k]) == expected[k]
+        else:
+            assert not found[k] and ranks[k] == -1
+
+    restored = HashIndex(index.arrays())
+    np.testing.assert_array_equal(restored.lookup(probe)[3], values)
+    assert np.all(np.diff(index.arrays()['keys'].astype(np.int64)) > 0)
+
+
+def test_rank_precedence_survives_restart(tmp_path):
+    # Sumber peringkat rendah ditemukan lebih dulu, sumber BNPB menyusul kemudian
+    pos = tmp_path / 'pos_lapangan.csv'
+    bnpb = tmp_path / 'bnpb.csv'
+    pos.write_text(HEADER + _row(100))
+    reader = MultiSourceFeed(tmp_path)
+    reader.poll()
+    bnpb.write_text(HEADER + _row(120))
+    reader.poll()
+    assert _total(reader) == 120
+
+    state = json.loads(json.dumps(reader.checkpoint()))
+    arrays = reader.checkpoint_arrays()
+    restarted = MultiSourceFeed(tmp_path)
+    assert restarted.restore(state, arrays)
+    assert _total(restarted) == 120
+
+    # Koreksi dari pos lapangan tidak boleh menimpa nilai milik BNPB
+    with open(pos, 'a') as f:
+        f.write(_row(500))
+    restarted.poll()
+    assert _total(restarted) == 120
+
+    # Koreksi dari pemilik nilai tetap berlaku
+    with open(bnpb, 'a') as f:
+        f.write(_row(130))
+    restarted.poll()
+    assert _total(restarted) == 130
+
+    # Sumber baru setelah pemulihan mendapat id baru, bukan id sumber yang sudah ada
+    (tmp_path / 'bpbd_agam.csv').write_text(HEADER + _row(7, sub='Hilang'))
+    restarted.poll()
+    ids = [source_id for source_id, _, _ in restarted.sources.values()]
+    assert len(set(ids)) == len(ids)
+
+
+def test_restore_rejects_checkpoint_without_source_ids(tmp_path):
+    (tmp_path / 'bnpb.csv').write_text(HEADER + _row(5))
+    reader = MultiSourceFeed(tmp_path)
+    reader.poll()
+    state = reader.checkpoint()
+    del state['source_ids']
+    assert not MultiSourceFeed(tmp_path).restore(state, reader.checkpoint_arrays())
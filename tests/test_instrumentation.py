@@ -0,0 +1,36 @@
+import json
+
+from instrumentation import TimingSink, start_rerun
+
+
+def test_jsonl_sink_keeps_one_handle_and_writes_whole_lines(tmp_path):
+    path = tmp_path / 'timing.jsonl'
+    sink = TimingSink(str(path))
+    tracer = start_rerun({}, sink)
+    with tracer.span('data:feed'):
+        pass
+    handle = sink._file
+    with tracer.span('chart:trend'):
+        pass
+    assert sink._file is handle
+    # Buffer baris: setiap span sudah terbaca di file tanpa flush/close
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span['name'] for span in spans] == ['data:feed', 'chart:trend']
+    assert spans[0]['rerun_id'] == spans[1]['rerun_id'] == tracer.rerun_id
+
+    sink.close()
+    with tracer.span('tab:ringkasan'):
+        pass
+    sink.close()
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_prometheus_sink_rewrites_totals(tmp_path):
+    path = tmp_path / 'timing.prom'
+    sink = TimingSink(str(path))
+    tracer = start_rerun({}, sink)
+    for _ in range(2):
+        with tracer.span('data:feed'):
+            pass
+    sink.flush()
+    assert 'bencana_span_seconds_count{span="data:feed"} 2' in path.read_text()
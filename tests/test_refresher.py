@@ -0,0 +1,40 @@
+from refresher import BackgroundRefresher, request_session_rerun
+
+
+class _Reader:
+    def __init__(self):
+        self.records = [('Korbang Jiwa', 'Mengungsi', 'Jiwa', 1.0)]
+
+    def poll(self):
+        return False
+
+    def totals_records(self):
+        return list(self.records)
+
+
+def test_publish_notifies_each_listener_once_and_drops_stale():
+    reader = _Reader()
+    refresher = BackgroundRefresher(reader, lambda records: records[0][3], lambda version, records: version, debounce=0)
+    calls = []
+    refresher.subscribe('a', lambda version: calls.append(('a', version)))
+    refresher.subscribe('b', lambda version: calls.append(('b', version)) and False)
+    refresher.subscribe('c', lambda version: 1 / 0)
+    assert refresher.refresh(force=True)
+    assert calls == [('a', 1.0), ('b', 1.0)]
+    # 'b' mengembalikan None (bukan False) sehingga tetap berlangganan; 'c' gagal dan dihapus
+    assert refresher.listener_count() == 2
+
+    # Tanpa versi baru tidak ada pemberitahuan
+    assert not refresher.refresh()
+    assert len(calls) == 2
+
+    refresher.subscribe('d', lambda version: False)
+    refresher.unsubscribe('a')
+    reader.records[0] = ('Korbang Jiwa', 'Mengungsi', 'Jiwa', 2.0)
+    assert refresher.refresh()
+    assert calls[-1] == ('b', 2.0) and refresher.current() == (2.0, 2.0)
+    assert refresher.listener_count() == 1
+
+
+def test_request_session_rerun_without_runtime():
+    assert request_session_rerun('sesi-tidak-ada') is False
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reports import dated_regions, export_reports, load_snapshot, plan_jobs, read_manifest
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+SUPPLY = [10, 5, 2]
+
+
+@pytest.fixture(scope='module')
+def snapshot(tmp_path_factory):
+    _, cube = load_snapshot(str(DATA / 'feed_laporan.csv'), str(DATA / 'wilayah_basis.csv'),
+                            str(tmp_path_factory.mktemp('store')))
+    return cube.df_bencana, cube.df_trend.reset_index(drop=True), pd.read_csv(DATA / 'wilayah_basis.csv')
+
+
+def test_dated_regions_sum_to_each_dates_totals(snapshot):
+    df_bencana, df_trend, df_wilayah = snapshot
+    # Urutan baris tabel wilayah tidak boleh memengaruhi hasil (dicocokkan lewat nama)
+    shuffled = df_bencana.sample(frac=1, random_state=0)
+    frames = dated_regions(shuffled, df_trend, df_wilayah)
+    assert len(frames) == len(df_trend)
+    for d, df in enumerate(frames):
+        assert df['Total_Meninggal'].sum() == df_trend['Meninggal_Kumulatif'].iloc[d]
+        assert df['Mengungsi_Jiwa'].sum() == df_trend['Mengungsi_Kumulatif'].iloc[d]
+        assert df['Kerugian_Rupiah_Miliar'].sum() == pytest.approx(df_trend['Kerugian_Kumulatif_Miliar'].iloc[d])
+    # Tanggal terakhir sama dengan tabel wilayah dashboard
+    last = frames[-1].set_index('Kabupaten_Kota')
+    expected = df_bencana.set_index('Kabupaten_Kota').loc[last.index]
+    for column in ('Total_Meninggal', 'Mengungsi_Jiwa'):
+        np.testing.assert_array_equal(last[column].to_numpy(), expected[column].to_numpy())
+
+
+def _rows(names, nilai=1):
+    return [{'Kabupaten_Kota': name, 'Total_Meninggal': nilai} for name in names]
+
+
+def test_plan_jobs_skips_unchanged_reports(tmp_path):
+    df_trend = pd.DataFrame({
+        'Tanggal': pd.date_range('2025-12-01', periods=2),
+        'Meninggal_Kumulatif': [1, 3], 'Mengungsi_Kumulatif': [10, 30],
+    })
+    rows_by_date = [_rows(['Agam', 'Kota Padang']), _rows(['Agam', 'Kota Padang'])]
+    jobs, fingerprints = plan_jobs(tmp_path, df_trend, rows_by_date, SUPPLY, {})
+    assert len(jobs) == len(fingerprints) == 4
+    for _, relpath, _, _ in jobs:
+        for ext in ('.csv', '.html'):
+            path = (tmp_path / relpath).with_suffix(ext)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('')
+
+    assert plan_jobs(tmp_path, df_trend, rows_by_date, SUPPLY, fingerprints)[0] == []
+    assert len(plan_jobs(tmp_path, df_trend, rows_by_date, SUPPLY, fingerprints, force=True)[0]) == 4
+
+    # Baris satu wilayah berubah: hanya laporannya yang dibuat ulang
+    changed = [rows_by_date[0], _rows(['Agam']) + _rows(['Kota Padang'], nilai=2)]
+    assert [job[1] for job in plan_jobs(tmp_path, df_trend, changed, SUPPLY, fingerprints)[0]] == ['2025-12-02/kota-padang']
+    # Trend tanggal awal berubah: semua tanggal sesudahnya ikut dibuat ulang
+    revised = df_trend.assign(Mengungsi_Kumulatif=[11, 30])
+    assert len(plan_jobs(tmp_path, revised, rows_by_date, SUPPLY, fingerprints)[0]) == 4
+    # File yang hilang dibuat ulang meski sidik jarinya sama
+    (tmp_path / '2025-12-01' / 'agam.html').unlink()
+    assert [job[1] for job in plan_jobs(tmp_path, df_trend, rows_by_date, SUPPLY, fingerprints)[0]] == ['2025-12-01/agam']
+
+
+def test_second_export_skips_everything(tmp_path):
+    paths = dict(feed_path=str(DATA / 'feed_laporan.csv'), wilayah_path=str(DATA / 'wilayah_basis.csv'),
+                 store_path=str(tmp_path / 'store'))
+    created, skipped = export_reports(tmp_path / 'laporan', workers=2, **paths)
+    assert created > 0 and skipped == 0
+    manifest = read_manifest(tmp_path / 'laporan')
+    assert len(manifest) == created
+    assert export_reports(tmp_path / 'laporan', workers=2, **paths) == (0, created)
+    assert json.loads((tmp_path / 'laporan' / 'manifest.json').read_text()) == manifest
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from scoring import DEFAULT_WEIGHTS, SCORE_COLUMN, PriorityScorer, top_k, vary_weight, weight_matrix
+
+
+def full_sort_top_k(scores, k):
+    """Referensi: urutkan seluruh baris (skor menurun, seri menurut indeks)."""
+    return np.array(sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:k])
+
+
+def test_top_k_matches_full_sort_with_ties():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 7, 50):
+        scores = rng.integers(0, 5, n).astype(float)  # banyak seri
+        for k in (0, 1, 3, n, n + 2):
+            np.testing.assert_array_equal(top_k(scores, k), full_sort_top_k(scores, k))
+
+
+def test_top_k_keeps_lowest_index_ties_at_boundary():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        # Banyak baris dengan sedikit nilai berbeda: seri hampir selalu memotong batas ke-k
+        scores = rng.integers(0, 4, rng.integers(20, 3000)).astype(float)
+        k = int(rng.integers(1, 40))
+        np.testing.assert_array_equal(top_k(scores, k), full_sort_top_k(scores, k))
+    batch = rng.integers(0, 3, (6, 500)).astype(float)
+    np.testing.assert_array_equal(top_k(batch, 7), [full_sort_top_k(row, 7) for row in batch])
+
+
+def test_top_k_is_row_wise_for_scenarios():
+    scores = np.array([[1.0, 3.0, 2.0, 3.0], [4.0, 0.0, 4.0, 1.0]])
+    np.testing.assert_array_equal(top_k(scores, 2), [[1, 3], [0, 2]])
+
+
+def test_weight_matrix_rows_sum_to_one():
+    weights = weight_matrix([DEFAULT_WEIGHTS, {'Total_Meninggal': 2.0}, {}])
+    np.testing.assert_allclose(weights.sum(axis=1), [1.0, 1.0, 0.0])
+
+
+def test_vary_weight_keeps_total_and_proportions():
+    for scenario in vary_weight(DEFAULT_WEIGHTS, 'Total_Unit_Rusak', [0.0, 0.5, 1.0]):
+        assert abs(sum(scenario.values()) - 1.0) < 1e-12
+        assert abs(scenario['Total_Meninggal'] - scenario['Mengungsi_Jiwa']) < 1e-12
+
+
+def test_ranked_frame_and_ranks_agree():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({metric: rng.integers(0, 100, 30) for metric in DEFAULT_WEIGHTS})
+    df.loc[3] = 0  # baris tanpa dampak tetap diberi skor nol
+    scorer = PriorityScorer(df)
+    ranked = scorer.ranked_frame()
+    assert ranked[SCORE_COLUMN].is_monotonic_decreasing
+    ranks = scorer.ranks(DEFAULT_WEIGHTS)[0]
+    np.testing.assert_array_equal(ranks[scorer.positions(ranked.index)], np.arange(1, len(df) + 1))
+    np.testing.assert_array_equal(scorer.ranked_frame(k=5).index, ranked.index[:5])
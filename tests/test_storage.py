@@ -0,0 +1,101 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import storage
+from storage import ColumnarStore, data_version
+
+
+def _frame():
+    return pd.DataFrame({
+        'Kabupaten_Kota': ['Agam', 'Solok', 'Agam', 'Padang', 'Solok'],
+        'Horizon_Jam': [24, 24, 48, 48, 72],
+        'Nilai': [1.5, 2.0, 3.25, 4.0, 5.0],
+        'Jumlah': np.arange(5, dtype=np.int64),
+    })
+
+
+def test_round_trip_with_categories(tmp_path):
+    store = ColumnarStore(tmp_path)
+    df = _frame()
+    store.write('tabel', df, 'v1', meta={'total': 7})
+    assert store.has('tabel', 'v1')
+    manifest = store.manifest('tabel', 'v1')
+    assert manifest['columns']['Kabupaten_Kota'] == {'dtype': 'category', 'categories': ['Agam', 'Padang', 'Solok']}
+    assert store.meta('tabel', 'v1') == {'total': 7}
+    pd.testing.assert_frame_equal(store.read('tabel', 'v1'), df)
+
+
+def test_partition_and_column_pruning(tmp_path):
+    store = ColumnarStore(tmp_path)
+    df = _frame()
+    store.write('tabel', df, 'v1', partition_by='Horizon_Jam')
+    assert store.partitions('tabel', 'v1') == ['24', '48', '72']
+
+    # Urutan baris keluaran mengikuti urutan partisi yang diminta; partisi tak dikenal diabaikan
+    part = store.read('tabel', 'v1', columns=['Kabupaten_Kota', 'Nilai'], partitions=['72', '24', '96'])
+    assert part.columns.tolist() == ['Kabupaten_Kota', 'Nilai']
+    assert part['Kabupaten_Kota'].tolist() == ['Solok', 'Agam', 'Solok']
+    assert part['Nilai'].tolist() == [5.0, 1.5, 2.0]
+    assert len(store.read('tabel', 'v1', partitions=[])) == 0
+    pd.testing.assert_frame_equal(store.read('tabel', 'v1'), df)
+
+
+def test_multi_partition_reads_do_not_cache_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'MMAP_MIN_BYTES', 0)
+    store = ColumnarStore(tmp_path)
+    store.write('tabel', _frame(), 'v1', partition_by='Kabupaten_Kota')
+    store.read('tabel', 'v1')
+    assert not store._arrays
+    store.write_arrays('kubus', 'v1', {'nilai': np.arange(10.0)})
+    arrays, _ = store.read_arrays('kubus', 'v1')
+    assert isinstance(arrays['nilai'], np.memmap)
+
+
+def test_versions_are_immutable_and_pruned(tmp_path):
+    store = ColumnarStore(tmp_path, keep_versions=2)
+    for i in range(4):
+        store.write('tabel', _frame().assign(Jumlah=i), f'v{i}')
+        store.read('tabel', f'v{i}')
+        time.sleep(0.01)
+    # Versi yang sudah ada tidak ditulis ulang
+    store.write('tabel', _frame().assign(Jumlah=99), 'v3')
+    assert store.read('tabel', 'v3')['Jumlah'].tolist() == [3] * 5
+    assert store.versions('tabel') == ['v2', 'v3']
+    assert {key[1] for key in store._manifests} == {'v2', 'v3'}
+    assert not [name for name in os.listdir(tmp_path / 'tabel') if name.startswith('.')]
+
+
+def test_touch_keeps_reused_version(tmp_path):
+    store = ColumnarStore(tmp_path, keep_versions=2)
+    store.write_arrays('kubus', 'lama', {'a': np.zeros(2)})
+    time.sleep(0.01)
+    store.write_arrays('kubus', 'baru', {'a': np.ones(2)})
+    time.sleep(0.01)
+    store.read_arrays('kubus', 'lama')
+    time.sleep(0.01)
+    store.write_arrays('kubus', 'terbaru', {'a': np.ones(2)})
+    assert store.versions('kubus') == ['lama', 'terbaru']
+
+
+def test_checkpoint_round_trip(tmp_path):
+    store = ColumnarStore(tmp_path)
+    assert store.load_checkpoint('feed') is None
+    store.save_checkpoint('feed', {'offset': 10}, arrays={'kunci': np.arange(3, dtype=np.uint64)})
+    state = store.load_checkpoint('feed')
+    assert state['offset'] == 10
+    np.testing.assert_array_equal(store.load_checkpoint_arrays('feed', state)['kunci'], [0, 1, 2])
+
+    # Array dari checkpoint lain (token berbeda) tidak dipasangkan dengan status lama
+    store.save_checkpoint('feed', {'offset': 20}, arrays={'kunci': np.arange(5)})
+    assert store.load_checkpoint_arrays('feed', state) is None
+    assert store.load_checkpoint_arrays('feed', {'offset': 10}) is None
+
+
+@pytest.mark.parametrize('parts', [([('a', 1)],), (pd.DataFrame({'x': [1]}),)])
+def test_data_version_depends_on_salt(parts):
+    assert data_version(*parts) == data_version(*parts)
+    assert data_version(*parts, salt=1) != data_version(*parts, salt=2)
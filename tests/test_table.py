@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from table import page_rows, query_order
+
+
+def test_numeric_nan_last_both_directions():
+    df = pd.DataFrame({'Nilai': [3.0, np.nan, 1.0, 2.0]})
+    assert query_order(df, sort_by='Nilai').tolist() == [2, 3, 0, 1]
+    assert query_order(df, sort_by='Nilai', ascending=False).tolist() == [0, 3, 2, 1]
+
+
+def test_text_with_missing_values_does_not_raise():
+    # Waktu kosong pada feed menjadi NaN di kolom bertipe object
+    df = pd.DataFrame({'Waktu': ['2025-12-02 10:00', np.nan, '2025-12-01 08:00', None]})
+    assert query_order(df, sort_by='Waktu').tolist() == [2, 0, 1, 3]
+    assert query_order(df, sort_by='Waktu', ascending=False).tolist() == [0, 2, 1, 3]
+
+
+def test_mixed_types_sorted_as_text():
+    df = pd.DataFrame({'Sumber': ['b', 1, np.nan, 'a']})
+    assert query_order(df, sort_by='Sumber').tolist() == [1, 3, 0, 2]
+
+
+def test_descending_ties_keep_original_order():
+    df = pd.DataFrame({'Jenis': ['Banjir', 'Longsor', 'Banjir', 'Longsor', 'Banjir'], 'Nilai': [1, 2, 1, 2, 1]})
+    assert query_order(df, sort_by='Jenis', ascending=False).tolist() == [1, 3, 0, 2, 4]
+    assert query_order(df, sort_by='Nilai', ascending=False).tolist() == [1, 3, 0, 2, 4]
+
+
+def test_search_then_sort_returns_positions():
+    df = pd.DataFrame({'Wilayah': ['Agam', 'Solok', 'Kab. Agam', 'Padang'], 'Nilai': [5, 1, 2, 9]}, index=[10, 11, 12, 13])
+    order = query_order(df, 'agam', ['Wilayah'], sort_by='Nilai')
+    assert order.tolist() == [2, 0]
+    assert page_rows(order, 1, 1).tolist() == [2]
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from timeseries import SeriesBuffer, TimeSeriesEngine, rolling_growth
+
+
+def _dense(buckets, columns, values, shape):
+    expected = np.zeros(shape)
+    np.add.at(expected, (buckets, columns), values)
+    return expected
+
+
+def test_cumulative_matches_full_cumsum_after_out_of_order_adds():
+    rng = np.random.default_rng(1)
+    buffer = SeriesBuffer()
+    seen = ([], [], [])
+    for _ in range(20):
+        # Sebagian besar data berurutan, sesekali koreksi ke bucket lama (termasuk negatif)
+        buckets = rng.integers(0, 150, 8)
+        columns = rng.integers(0, 5, 8)
+        values = rng.normal(10, 20, 8)
+        buffer.add(buckets, columns, values)
+        for acc, part in zip(seen, (buckets, columns, values)):
+            acc.append(part)
+        expected = _dense(*(np.concatenate(acc) for acc in seen), (buffer.n_buckets, buffer.n_columns))
+        np.testing.assert_allclose(buffer.increments(), expected)
+        np.testing.assert_allclose(buffer.cumulative(), np.cumsum(expected, axis=0))
+
+
+def test_grows_past_initial_capacity():
+    buffer = SeriesBuffer(capacity=2)
+    buffer.add([0, 500], [0, 3], [1.0, 2.0])
+    assert (buffer.n_buckets, buffer.n_columns) == (501, 4)
+    assert buffer.cumulative()[-1].tolist() == [1.0, 0.0, 0.0, 2.0]
+
+
+def test_prepend_shifts_buckets_and_recomputes():
+    buffer = SeriesBuffer()
+    buffer.add([0, 1], [0, 0], [5.0, 3.0])
+    buffer.cumulative()
+    buffer.prepend(2)
+    buffer.add([0], [0], [1.0])
+    assert buffer.increments()[:, 0].tolist() == [1.0, 0.0, 5.0, 3.0]
+    assert buffer.cumulative()[:, 0].tolist() == [1.0, 1.0, 6.0, 9.0]
+
+
+def test_peaks_and_growth_match_full_recompute():
+    rng = np.random.default_rng(2)
+    buffer = SeriesBuffer()
+    for _ in range(30):
+        # Termasuk koreksi negatif yang dapat menurunkan bucket puncak
+        buffer.add(rng.integers(0, 60, 6), rng.integers(0, 4, 6), rng.normal(5, 20, 6))
+        increments = buffer.increments()
+        peak_bucket, peak_value = buffer.peaks()
+        np.testing.assert_allclose(peak_value, increments.max(axis=0))
+        np.testing.assert_allclose(increments[peak_bucket, np.arange(buffer.n_columns)], peak_value)
+        for window in (1, 3):
+            np.testing.assert_allclose(buffer.growth(window), rolling_growth(buffer.cumulative(), window))
+
+
+def test_state_round_trip():
+    buffer = SeriesBuffer()
+    buffer.add([0, 3, 3, 7], [1, 0, 0, 2], [1.0, 2.0, 4.0, -1.0])
+    restored = SeriesBuffer.from_state(buffer.state())
+    np.testing.assert_array_equal(restored.increments(), buffer.increments())
+    np.testing.assert_array_equal(restored.cumulative(), buffer.cumulative())
+
+
+def test_rolling_growth():
+    growth = rolling_growth(np.array([0.0, 10.0, 20.0, 30.0]), 1)
+    assert np.isnan(growth[0]) and np.isnan(growth[1])  # belum ada basis / basis nol
+    np.testing.assert_allclose(growth[2:], [1.0, 0.5])
+
+
+def test_engine_snapshot_shares_time_axis():
+    engine = TimeSeriesEngine()
+    engine.ingest(pd.DataFrame({
+        'Waktu': ['2025-12-02 10:00', '2025-12-01 08:00', '2025-12-03 09:00', None],
+        'Kabupaten_Kota': ['Agam', 'Agam', 'Solok', 'Agam'],
+        'Sub_Kategori': ['Mengungsi', 'Meninggal Total', 'Mengungsi', 'Mengungsi'],
+        'Nilai': [100.0, 2.0, 50.0, 999.0],
+    }))
+    snapshot = engine.snapshot(['Meninggal Total', 'Mengungsi', 'Sekolah'])
+    assert all(len(view.times) == 3 for view in snapshot.values())
+    assert snapshot['Mengungsi'].cumulative.tolist() == [0.0, 100.0, 150.0]
+    assert snapshot['Meninggal Total'].cumulative.tolist() == [2.0, 2.0, 2.0]
+    assert snapshot['Sekolah'].cumulative.tolist() == [0.0, 0.0, 0.0]
+    assert str(snapshot['Mengungsi'].times[0]) == '2025-12-01'
+
+
+def _feed():
+    return pd.DataFrame({
+        'Waktu': ['2025-12-01 08:00', '2025-12-01 09:00', '2025-12-02 10:00', '2025-12-03 23:00', '2025-12-02 01:00'],
+        'Kabupaten_Kota': ['Agam', 'Solok', 'Agam', 'Solok', 'Solok'],
+        'Sub_Kategori': ['Mengungsi'] * 5,
+        'Nilai': [10.0, 5.0, 40.0, 20.0, 1.0],
+    })
+
+
+def test_engine_hourly_regions_and_peak():
+    engine = TimeSeriesEngine()
+    engine.ingest(_feed())
+    daily = engine.series('Mengungsi', growth_window=1)
+    assert daily.increments.tolist() == [15.0, 41.0, 20.0]
+    assert str(daily.peak_time) == '2025-12-02' and daily.peak_increment == 41.0
+    np.testing.assert_allclose(daily.growth[1:], [41 / 15, 20 / 56])
+
+    hourly = engine.series('Mengungsi', freq='h')
+    assert len(hourly.times) == 72 and str(hourly.times[0]) == '2025-12-01T00'
+    assert hourly.cumulative[-1] == daily.cumulative[-1]
+    assert str(hourly.peak_time) == '2025-12-02T10' and hourly.peak_increment == 40.0
+
+    names, cumulative = engine.region_cumulative('Mengungsi')
+    assert names.tolist() == ['Agam', 'Solok']
+    assert cumulative.tolist() == [[10.0, 5.0], [50.0, 6.0], [50.0, 26.0]]
+    assert engine.region_cumulative('Sekolah')[1].sum() == 0
+
+    # Observasi lebih awal dari titik asal menggeser semua buffer beserta puncaknya
+    engine.ingest(pd.DataFrame({
+        'Waktu': ['2025-11-30 12:00'], 'Kabupaten_Kota': ['Agam'], 'Sub_Kategori': ['Mengungsi'], 'Nilai': [2.0],
+    }))
+    daily = engine.series('Mengungsi')
+    assert str(daily.times[0]) == '2025-11-30' and str(daily.peak_time) == '2025-12-02'
+    assert engine.region_cumulative('Mengungsi')[1][:, 0].tolist() == [2.0, 12.0, 52.0, 52.0]
+
+
+def test_engine_state_round_trip_and_old_checkpoint():
+    engine = TimeSeriesEngine()
+    engine.ingest(_feed())
+    arrays, meta = engine.state()
+    restored = TimeSeriesEngine.from_state(arrays, meta)
+    for freq in ('D', 'h'):
+        expected, actual = engine.series('Mengungsi', freq=freq), restored.series('Mengungsi', freq=freq)
+        np.testing.assert_array_equal(actual.cumulative, expected.cumulative)
+        assert actual.peak_time == expected.peak_time
+    np.testing.assert_array_equal(restored.region_cumulative('Mengungsi')[1], engine.region_cumulative('Mengungsi')[1])
+
+    # Checkpoint lama hanya berisi deret harian provinsi: feed dibaca ulang dari awal
+    assert TimeSeriesEngine.from_state({'province_d': arrays['province_d']}, {'origin': '2025-12-01'}) is None
@@ -0,0 +1,311 @@
+"""
+Mesin deret waktu inkremental untuk feed laporan.
+
+Setiap baris feed adalah tambahan `Nilai` untuk satu kab/kota dan satu
+`Sub_Kategori` pada satu waktu. `TimeSeriesEngine` menampung tambahan itu ke
+bucket waktu: provinsi per hari dan per jam, serta per kab/kota per hari.
+Menambah observasi bersifat O(1) teramortisasi (array tumbuh berlipat dua).
+Nilai kumulatif dihitung ulang hanya mulai dari bucket tertua yang berubah,
+dan puncak kenaikan per kolom diperbarui langsung saat observasi masuk. Laju
+pertumbuhan bergulir di-cache per jendela dan, seperti kumulatif, hanya
+dihitung ulang mulai dari bucket tertua yang berubah.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+FREQ_UNITS = {'D': 'D', 'h': 'h'}
+
+# Kunci pasangan (wilayah, metrik) dalam satu int64: indeks wilayah << 20 | kolom metrik
+_REGION_SHIFT = 20
+_METRIC_MASK = (1 << _REGION_SHIFT) - 1
+
+SeriesView = namedtuple('SeriesView', ['times', 'cumulative', 'increments', 'growth', 'peak_time', 'peak_increment'])
+
+
+def _grow(array, rows=None, cols=None):
+    """Salinan `array` dengan kapasitas minimal `rows` x `cols` (berlipat dua)."""
+    cur_rows, cur_cols = array.shape
+    new_rows = max(cur_rows, 1) if rows is None or rows <= cur_rows else max(rows, cur_rows * 2)
+    new_cols = max(cur_cols, 1) if cols is None or cols <= cur_cols else max(cols, cur_cols * 2)
+    if (new_rows, new_cols) == (cur_rows, cur_cols):
+        return array
+    grown = np.zeros((new_rows, new_cols), dtype=array.dtype)
+    grown[:cur_rows, :cur_cols] = array
+    return grown
+
+
+def rolling_growth(cumulative, window):
+    """Pertumbuhan bergulir `(c[t] - c[t-w]) / c[t-w]`; NaN jika belum ada `window` bucket atau basis nol."""
+    growth = np.full(cumulative.shape, np.nan)
+    if window <= 0 or len(cumulative) <= window:
+        return growth
+    base = cumulative[:-window]
+    np.divide(cumulative[window:] - base, base, out=growth[window:], where=base != 0)
+    return growth
+
+
+class SeriesBuffer:
+    """
+    Tambahan per bucket waktu dalam matriks [bucket x kolom] yang dapat tumbuh.
+
+    Kumulatif disimpan terpisah dan hanya dihitung ulang dari `_dirty_from`
+    (bucket tertua yang berubah sejak pembacaan terakhir); data yang datang
+    berurutan cukup memperbarui bucket terakhir.
+    """
+
+    def __init__(self, n_columns=0, capacity=64):
+        self.n_buckets = 0
+        self.n_columns = n_columns
+        self._increments = np.zeros((capacity, max(n_columns, 1)))
+        self._cumulative = np.zeros_like(self._increments)
+        self._dirty_from = 0
+        self._peak_value = np.zeros(max(n_columns, 1))
+        self._peak_bucket = np.full(max(n_columns, 1), -1, dtype=np.int64)
+        self._peak_dirty = np.zeros(max(n_columns, 1), dtype=bool)
+        # Jendela -> pertumbuhan [kapasitas x kolom] yang valid hingga sebelum `_growth_from[jendela]`
+        self._growth = {}
+        self._growth_from = {}
+
+    def _reserve(self, n_buckets, n_columns):
+        self._increments = _grow(self._increments, n_buckets, n_columns)
+        self._cumulative = _grow(self._cumulative, n_buckets, n_columns)
+        if n_columns > len(self._peak_value):
+            size = self._increments.shape[1]
+            self._peak_value = np.concatenate([self._peak_value, np.zeros(size - len(self._peak_value))])
+            self._peak_bucket = np.concatenate([self._peak_bucket, np.full(size - len(self._peak_bucket), -1)])
+            self._peak_dirty = np.concatenate([self._peak_dirty, np.zeros(size - len(self._peak_dirty), dtype=bool)])
+        self.n_buckets = max(self.n_buckets, n_buckets)
+        self.n_columns = max(self.n_columns, n_columns)
+
+    def prepend(self, k):
+        """Menyisipkan `k` bucket kosong di depan (observasi lebih awal dari titik asal)."""
+        if k <= 0:
+            return
+        n = self.n_buckets
+        self._reserve(n + k, self.n_columns)
+        self._increments[k:n + k] = self._increments[:n].copy()
+        self._increments[:k] = 0
+        self._peak_bucket[self._peak_bucket >= 0] += k
+        self._dirty_from = 0
+
+    def add(self, buckets, columns, values):
+        """Menambahkan `values` ke sel (`buckets`, `columns`) sekaligus (duplikat dijumlahkan)."""
+        buckets = np.asarray(buckets, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        if not len(buckets):
+            return
+        self._reserve(int(buckets.max()) + 1, int(columns.max()) + 1)
+        np.add.at(self._increments, (buckets, columns), values)
+        self._dirty_from = min(self._dirty_from, int(buckets.min()))
+
+        # Puncak kenaikan: cukup bandingkan sel yang tersentuh dengan puncak saat ini
+        cells = np.unique(np.stack([columns, buckets], axis=1), axis=0)
+        cols, rows = cells[:, 0], cells[:, 1]
+        current = self._increments[rows, cols]
+        # Koreksi negatif pada bucket puncak: puncak kolom itu dihitung ulang saat dibaca
+        lowered = (rows == self._peak_bucket[cols]) & (current < self._peak_value[cols])
+        self._peak_dirty[cols[lowered]] = True
+        order = np.lexsort((current, cols))
+        last = np.r_[cols[order][1:] != cols[order][:-1], True]
+        best_cols, best_rows, best_vals = cols[order][last], rows[order][last], current[order][last]
+        better = (best_vals > self._peak_value[best_cols]) | (self._peak_bucket[best_cols] < 0)
+        self._peak_value[best_cols[better]] = best_vals[better]
+        self._peak_bucket[best_cols[better]] = best_rows[better]
+        # Puncak negatif: bucket tanpa data (nol) bisa lebih tinggi, dihitung ulang saat dibaca
+        self._peak_dirty[best_cols[self._peak_value[best_cols] < 0]] = True
+
+    def increments(self):
+        return self._increments[:self.n_buckets, :self.n_columns]
+
+    def cumulative(self):
+        """Kumulatif [bucket x kolom]; hanya bagian sejak perubahan tertua yang dihitung ulang."""
+        n, start = self.n_buckets, self._dirty_from
+        if start < n:
+            block = np.cumsum(self._increments[start:n], axis=0)
+            if start > 0:
+                block += self._cumulative[start - 1]
+            self._cumulative[start:n] = block
+            self._dirty_from = n
+            for window, valid in self._growth_from.items():
+                self._growth_from[window] = min(valid, start)
+        return self._cumulative[:n, :self.n_columns]
+
+    def growth(self, window):
+        """Pertumbuhan bergulir [bucket x kolom] (lihat `rolling_growth`), dihitung ulang sejak perubahan tertua."""
+        cumulative = self.cumulative()
+        n = self.n_buckets
+        growth = self._growth.get(window)
+        if growth is None or growth.shape != self._cumulative.shape:
+            # Bucket/kolom baru bernilai NaN; bucket lama yang berubah sudah ditandai lewat `cumulative()`
+            grown = np.full(self._cumulative.shape, np.nan)
+            if growth is not None:
+                rows, cols = min(len(growth), len(grown)), min(growth.shape[1], grown.shape[1])
+                grown[:rows, :cols] = growth[:rows, :cols]
+            growth = self._growth[window] = grown
+        start = self._growth_from.get(window, 0)
+        if start < n:
+            lo = max(start - window, 0)
+            growth[start:n, :self.n_columns] = rolling_growth(cumulative[lo:n], window)[start - lo:]
+            self._growth_from[window] = n
+        return growth[:n, :self.n_columns]
+
+    def peaks(self):
+        """`(bucket, kenaikan)` terbesar per kolom; bucket -1 jika kolom belum berisi data."""
+        dirty = np.flatnonzero(self._peak_dirty[:self.n_columns])
+        if len(dirty):
+            block = self._increments[:self.n_buckets, dirty]
+            self._peak_bucket[dirty] = block.argmax(axis=0)
+            self._peak_value[dirty] = block.max(axis=0)
+            self._peak_dirty[dirty] = False
+        return self._peak_bucket[:self.n_columns].copy(), self._peak_value[:self.n_columns].copy()
+
+    def state(self):
+        return self.increments().copy()
+
+    @classmethod
+    def from_state(cls, increments):
+        buffer = cls(increments.shape[1], capacity=max(64, len(increments)))
+        rows, cols = np.nonzero(increments)
+        buffer.add(rows, cols, increments[rows, cols])
+        buffer._reserve(len(increments), increments.shape[1])
+        return buffer
+
+
+class TimeSeriesEngine:
+    """
+    Deret kumulatif provinsi (per hari & per jam) dan per kab/kota (per hari) dari feed.
+    Didaftarkan ke `IncrementalFeedReader.subscribe(engine.ingest, on_reset=engine.reset)`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.origin = None  # datetime64[h], awal hari observasi paling awal
+            self.metrics = {}   # Sub_Kategori -> kolom
+            self.regions = {}   # Kab/Kota -> indeks
+            self.pairs = {}     # (indeks wilayah, kolom metrik) -> kolom deret wilayah
+            self.province = {'D': SeriesBuffer(), 'h': SeriesBuffer()}
+            self.region_daily = SeriesBuffer()
+            self.observations = 0
+
+    def _codes(self, mapping, values):
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.array([mapping.setdefault(v, len(mapping)) for v in uniques.tolist()], dtype=np.int64)
+        return codes[inverse]
+
+    def ingest(self, frame):
+        """Menambahkan potongan feed baru (kolom `Waktu`, `Kabupaten_Kota`, `Sub_Kategori`, `Nilai`)."""
+        hours = np.array(frame['Waktu'].to_numpy(), dtype='datetime64[h]')
+        valid = ~np.isnat(hours)
+        if not valid.any():
+            return
+        hours = hours[valid]
+        values = frame['Nilai'].to_numpy(dtype=float)[valid]
+        with self._lock:
+            first_day = hours.min().astype('datetime64[D]').astype('datetime64[h]')
+            if self.origin is None:
+                self.origin = first_day
+            elif first_day < self.origin:
+                shift_days = int((self.origin - first_day) // np.timedelta64(24, 'h'))
+                self.province['D'].prepend(shift_days)
+                self.province['h'].prepend(shift_days * 24)
+                self.region_daily.prepend(shift_days)
+                self.origin = first_day
+
+            hour_idx = ((hours - self.origin) // np.timedelta64(1, 'h')).astype(np.int64)
+            day_idx = hour_idx // 24
+            metric = self._codes(self.metrics, frame['Sub_Kategori'].astype(str).to_numpy()[valid])
+            region = self._codes(self.regions, frame['Kabupaten_Kota'].astype(str).to_numpy()[valid])
+            pair_keys = (region << _REGION_SHIFT) | metric
+            pair = self._codes(self.pairs, pair_keys)
+
+            self.province['D'].add(day_idx, metric, values)
+            self.province['h'].add(hour_idx, metric, values)
+            self.region_daily.add(day_idx, pair, values)
+            self.observations += len(values)
+
+    def times(self, freq='D'):
+        buffer = self.province[freq]
+        return self.origin.astype(f'datetime64[{FREQ_UNITS[freq]}]') + np.arange(buffer.n_buckets)
+
+    def _series(self, sub_kategori, freq, growth_window):
+        if self.origin is None:
+            empty = np.array([], dtype=float)
+            return SeriesView(np.array([], dtype=f'datetime64[{FREQ_UNITS[freq]}]'), empty, empty, empty, None, 0.0)
+        buffer = self.province[freq]
+        times = self.times(freq)
+        col = self.metrics.get(sub_kategori)
+        if col is None:
+            # Sub_Kategori belum pernah dilaporkan: deret nol pada sumbu waktu yang sama
+            zeros = np.zeros(len(times))
+            return SeriesView(times, zeros, zeros.copy(), rolling_growth(zeros, growth_window), None, 0.0)
+        peak_bucket, peak_value = buffer.peaks()
+        peak_time = times[peak_bucket[col]] if peak_bucket[col] >= 0 else None
+        return SeriesView(
+            times, buffer.cumulative()[:, col].copy(), buffer.increments()[:, col].copy(),
+            buffer.growth(growth_window)[:, col].copy(), peak_time, float(peak_value[col])
+        )
+
+    def series(self, sub_kategori, freq='D', growth_window=1):
+        """Deret provinsi satu `Sub_Kategori`: waktu, kumulatif, tambahan, pertumbuhan, dan puncak kenaikan."""
+        with self._lock:
+            return self._series(sub_kategori, freq, growth_window)
+
+    def snapshot(self, sub_kategori, freq='D', growth_window=1):
+        """
+        `{Sub_Kategori: SeriesView}` untuk beberapa deret sekaligus dari state yang sama
+        (satu kunci), sehingga semua deret berakhir pada observasi yang sama.
+        """
+        with self._lock:
+            return {name: self._series(name, freq, growth_window) for name in sub_kategori}
+
+    def region_cumulative(self, sub_kategori):
+        """`(nama_wilayah, kumulatif [hari x wilayah])` per kab/kota untuk satu `Sub_Kategori`."""
+        with self._lock:
+            names = np.array(list(self.regions), dtype=object)
+            result = np.zeros((self.region_daily.n_buckets, len(names)))
+            col = self.metrics.get(sub_kategori)
+            if col is not None and self.region_daily.n_buckets:
+                keys = np.fromiter(self.pairs.keys(), dtype=np.int64, count=len(self.pairs))
+                pair_cols = np.fromiter(self.pairs.values(), dtype=np.int64, count=len(self.pairs))
+                selected = (keys & _METRIC_MASK) == col
+                result[:, keys[selected] >> _REGION_SHIFT] = self.region_daily.cumulative()[:, pair_cols[selected]]
+            return names, result
+
+    def state(self):
+        """Array & metadata untuk checkpoint (lihat `from_state`)."""
+        with self._lock:
+            arrays = {
+                'province_d': self.province['D'].state(),
+                'province_h': self.province['h'].state(),
+                'region_daily': self.region_daily.state(),
+            }
+            meta = {
+                'origin': None if self.origin is None else str(self.origin),
+                'metrics': list(self.metrics),
+                'regions': list(self.regions),
+                'pairs': [int(k) for k in self.pairs],
+                'observations': self.observations,
+            }
+            return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        """Engine dari `state()`; None untuk checkpoint lama tanpa buffer per jam & per wilayah."""
+        if 'province_h' not in arrays or 'region_daily' not in arrays or 'regions' not in meta:
+            return None
+        engine = cls()
+        engine.origin = None if meta['origin'] is None else np.datetime64(meta['origin'], 'h')
+        engine.metrics = {m: i for i, m in enumerate(meta['metrics'])}
+        engine.regions = {r: i for i, r in enumerate(meta['regions'])}
+        engine.pairs = {k: i for i, k in enumerate(meta['pairs'])}
+        engine.observations = meta['observations']
+        engine.province = {'D': SeriesBuffer.from_state(arrays['province_d']), 'h': SeriesBuffer.from_state(arrays['province_h'])}
+        engine.region_daily = SeriesBuffer.from_state(arrays['region_daily'])
+        return engine